@@ -1,3 +1,9 @@
+from .analytics import (
+    ActivityRollupAdmin as ActivityRollupAdmin,
+)
+from .analytics import (
+    CohortSummaryAdmin as CohortSummaryAdmin,
+)
 from .analytics import (
     ContributionAdmin as ContributionAdmin,
 )
@@ -7,6 +13,9 @@ from .analytics import (
 from .analytics import (
     LeaderBoardAdmin as LeaderBoardAdmin,
 )
+from .analytics import (
+    LeaderBoardSnapshotAdmin as LeaderBoardSnapshotAdmin,
+)
 from .app_settings import AppSettingsAdmin as AppSettingsAdmin
 from .attempt_answer import (
     UserAnswerInline as UserAnswerInline,
@@ -30,6 +39,12 @@ from .mocktest import (
     MockTestQuestionInline as MockTestQuestionInline,
 )
 from .notification import NotificationAdmin as NotificationAdmin
+from .notification import (
+    NotificationArchiveAdmin as NotificationArchiveAdmin,
+)
+from .notification import (
+    NotificationOutboxAdmin as NotificationOutboxAdmin,
+)
 from .note import NoteAdmin as NoteAdmin
 from .platform_stats import PlatformStatsAdmin as PlatformStatsAdmin
 from .question_answer import (
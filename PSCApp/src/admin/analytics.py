@@ -1,6 +1,14 @@
 from django.contrib import admin
 
-from src.models.analytics import Contribution, DailyActivity, LeaderBoard
+from src.models.analytics import (
+    ActivityRollup,
+    CohortSummary,
+    Contribution,
+    DailyActivity,
+    LeaderBoard,
+    LeaderBoardSnapshot,
+)
+from src.services import dashboard_counts
 
 
 @admin.register(Contribution)
@@ -44,12 +52,16 @@ class ContributionAdmin(admin.ModelAdmin):
     def approve_contribution(self, request, queryset):
         for contribution in queryset:
             contribution.approve_contribution()
+        dashboard_counts.invalidate(dashboard_counts.CONTRIBUTIONS)
         self.message_user(request, f"{queryset.count()} contributions approved.")
 
     @admin.action(description="Make selected contributions Public")
     def make_public(self, request, queryset):
         for contribution in queryset:
             contribution.make_public()
+        dashboard_counts.invalidate(
+            dashboard_counts.CONTRIBUTIONS, dashboard_counts.QUESTIONS
+        )
         self.message_user(request, f"{queryset.count()} contributions made public.")
 
 
@@ -141,3 +153,71 @@ class DailyActivityAdmin(admin.ModelAdmin):
             },
         ),
     )
+
+
+@admin.register(LeaderBoardSnapshot)
+class LeaderBoardSnapshotAdmin(admin.ModelAdmin):
+    list_display = (
+        "period_start",
+        "time_period",
+        "branch",
+        "sub_branch",
+        "entry_count",
+        "updated_at",
+    )
+    list_filter = ("time_period", "branch")
+    ordering = ("-period_start",)
+    exclude = ("entries",)
+    readonly_fields = (
+        "time_period",
+        "branch",
+        "sub_branch",
+        "period_start",
+        "entry_count",
+        "updated_at",
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(ActivityRollup)
+class ActivityRollupAdmin(admin.ModelAdmin):
+    list_display = (
+        "period",
+        "period_start",
+        "days",
+        "new_users",
+        "mock_tests_taken",
+        "active_users",
+        "peak_active_users",
+    )
+    list_filter = ("period",)
+    ordering = ("period", "-period_start")
+    date_hierarchy = "period_start"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(CohortSummary)
+class CohortSummaryAdmin(admin.ModelAdmin):
+    list_display = (
+        "cohort_week",
+        "users",
+        "first_attempt",
+        "completed_mock_test",
+        "reached_streak_7",
+        "updated_at",
+    )
+    ordering = ("-cohort_week",)
+    date_hierarchy = "cohort_week"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
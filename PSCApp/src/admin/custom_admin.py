@@ -17,15 +17,23 @@ class CustomAdminSite(admin.AdminSite):
             "Question Bank": ["Question", "Answer", "QuestionReport", "Note"],
             "Exam & Tests": ["MockTest", "UserAttempt"],
             "Analytics & Activity": [
+                "ActivityRollup",
+                "CohortSummary",
                 "Contribution",
                 "DailyActivity",
                 "LeaderBoard",
+                "LeaderBoardSnapshot",
                 "PlatformStats",
                 "StudyCollection",
                 "UserProgress",
                 "UserStatistics",
             ],
-            "Communication": ["Notification"],
+            "Communication": [
+                "Notification",
+                "NotificationCampaign",
+                "NotificationOutbox",
+                "NotificationArchive",
+            ],
             "Settings": ["AppSettings", "TimeConfiguration"],
         }
 
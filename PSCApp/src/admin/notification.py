@@ -1,6 +1,12 @@
 from django.contrib import admin
+from django.utils import timezone
 
-from src.models.notification import Notification
+from src.models.notification import (
+    Notification,
+    NotificationArchive,
+    NotificationCampaign,
+    NotificationOutbox,
+)
 
 
 @admin.register(Notification)
@@ -53,3 +59,128 @@ class NotificationAdmin(admin.ModelAdmin):
             },
         ),
     )
+
+
+@admin.register(NotificationCampaign)
+class NotificationCampaignAdmin(admin.ModelAdmin):
+    list_display = (
+        "title_en",
+        "status",
+        "send_at",
+        "rate_per_minute",
+        "sent_count",
+        "deferred_count",
+        "completed_at",
+    )
+    list_filter = ("status", "notification_type", "branch")
+    search_fields = ("title_en", "message_en")
+    date_hierarchy = "send_at"
+    autocomplete_fields = ["branch", "sub_branch"]
+    readonly_fields = (
+        "status",
+        "cursor",
+        "sent_count",
+        "deferred_count",
+        "last_tick_at",
+        "created_by",
+        "created_at",
+        "started_at",
+        "completed_at",
+    )
+    actions = ["cancel"]
+
+    fieldsets = (
+        (
+            "Content",
+            {
+                "fields": (
+                    "notification_type",
+                    ("title_en", "title_np"),
+                    ("message_en", "message_np"),
+                    "action_url",
+                ),
+            },
+        ),
+        (
+            "Audience",
+            {
+                "fields": ("user_ids", "branch", "sub_branch", "active_within_days"),
+            },
+        ),
+        (
+            "Delivery",
+            {
+                "fields": ("send_at", "rate_per_minute"),
+            },
+        ),
+        (
+            "Progress",
+            {
+                "fields": readonly_fields,
+                "classes": ("collapse",),
+            },
+        ),
+    )
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            obj.created_by = request.user
+        super().save_model(request, obj, form, change)
+        if obj.status == "SCHEDULED":
+            obj.schedule()
+
+    @admin.action(description="Cancel selected campaigns")
+    def cancel(self, request, queryset):
+        count = queryset.filter(status__in=["SCHEDULED", "RUNNING"]).update(
+            status="CANCELLED"
+        )
+        self.message_user(request, f"{count} campaigns cancelled.")
+
+
+@admin.register(NotificationOutbox)
+class NotificationOutboxAdmin(admin.ModelAdmin):
+    list_display = (
+        "notification",
+        "status",
+        "realtime_done",
+        "push_done",
+        "attempts",
+        "next_attempt_at",
+        "sent_at",
+    )
+    list_filter = ("status", "realtime_done", "push_done")
+    search_fields = ("notification__user__email", "last_error")
+    readonly_fields = (
+        "notification",
+        "realtime_done",
+        "push_done",
+        "attempts",
+        "last_error",
+        "created_at",
+        "sent_at",
+    )
+    list_select_related = ("notification__user",)
+    actions = ["retry_now"]
+
+    @admin.action(description="Retry selected entries now")
+    def retry_now(self, request, queryset):
+        count = queryset.exclude(status="SENT").update(
+            status="PENDING", attempts=0, next_attempt_at=timezone.now()
+        )
+        NotificationOutbox.schedule_dispatch()
+        self.message_user(request, f"{count} outbox entries queued for retry.")
+
+
+@admin.register(NotificationArchive)
+class NotificationArchiveAdmin(admin.ModelAdmin):
+    list_display = ("user_id", "notification_type", "title_en", "created_at")
+    list_filter = ("notification_type",)
+    search_fields = ("title_en", "message_en")
+    date_hierarchy = "created_at"
+    list_per_page = 50
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
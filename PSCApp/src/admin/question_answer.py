@@ -1,13 +1,16 @@
 from django.contrib import admin
 from django.utils.html import format_html
 
+from src.models.platform_stats import PlatformStats
 from src.models.question_answer import Answer, Question, QuestionReport
+from src.services import dashboard_counts
 
 
 class AnswerInline(admin.TabularInline):
     model = Answer
     extra = 4
     max_num = 4
+    readonly_fields = ("selection_count",)
 
 
 @admin.register(Question)
@@ -26,6 +29,7 @@ class QuestionAdmin(admin.ModelAdmin):
         "is_public",
         "question_type",
         "difficulty_level",
+        "distractor_flag",
         "created_at",
         "category",
     )
@@ -36,6 +40,9 @@ class QuestionAdmin(admin.ModelAdmin):
         "updated_at",
         "times_attempted",
         "times_correct",
+        "calibrated_difficulty",
+        "discrimination",
+        "distractor_flag",
         "reported_count",
     )
     inlines = [AnswerInline]
@@ -63,6 +70,9 @@ class QuestionAdmin(admin.ModelAdmin):
                 "fields": (
                     "times_attempted",
                     "times_correct",
+                    "calibrated_difficulty",
+                    "discrimination",
+                    "distractor_flag",
                     "reported_count",
                 ),
                 "classes": ("collapse",),
@@ -100,12 +110,16 @@ class QuestionAdmin(admin.ModelAdmin):
 
     @admin.action(description="Mark selected questions as Public")
     def make_public(self, request, queryset):
+        PlatformStats.record_bulk_status_change(queryset, "PUBLIC")
         updated = queryset.update(status="PUBLIC", is_public=True)
+        dashboard_counts.invalidate(dashboard_counts.QUESTIONS)
         self.message_user(request, f"{updated} questions marked as public.")
 
     @admin.action(description="Mark selected questions as Draft")
     def make_draft(self, request, queryset):
+        PlatformStats.record_bulk_status_change(queryset, "DRAFT")
         updated = queryset.update(status="DRAFT", is_public=False)
+        dashboard_counts.invalidate(dashboard_counts.QUESTIONS)
         self.message_user(request, f"{updated} questions marked as draft.")
 
 
@@ -13,7 +13,14 @@ class UserStatisticsAdmin(admin.ModelAdmin):
         "accuracy_rank",
     )
     search_fields = ("user__email",)
-    readonly_fields = ("badges_earned", "last_updated")
+    readonly_fields = (
+        "badges_earned",
+        "contribution_rank",
+        "answers_rank",
+        "accuracy_rank",
+        "ability_estimate",
+        "last_updated",
+    )
     autocomplete_fields = ["user"]
 
     fieldsets = (
@@ -45,7 +52,13 @@ class UserStatisticsAdmin(admin.ModelAdmin):
         (
             "Rankings & Achievements",
             {
-                "fields": ("contribution_rank", "accuracy_rank", "badges_earned"),
+                "fields": (
+                    "contribution_rank",
+                    "answers_rank",
+                    "accuracy_rank",
+                    "ability_estimate",
+                    "badges_earned",
+                ),
             },
         ),
         (
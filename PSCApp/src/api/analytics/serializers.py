@@ -1,6 +1,6 @@
 from rest_framework import serializers
 
-from src.models.analytics import Contribution, DailyActivity
+from src.models.analytics import CohortSummary, Contribution, DailyActivity
 
 
 class ContributionSerializer(serializers.ModelSerializer):
@@ -39,3 +39,20 @@ class DailyActivitySerializer(serializers.ModelSerializer):
     class Meta:
         model = DailyActivity
         fields = "__all__"
+
+
+class CohortSummarySerializer(serializers.ModelSerializer):
+    retention_rates = serializers.ListField(read_only=True)
+
+    class Meta:
+        model = CohortSummary
+        fields = [
+            "cohort_week",
+            "users",
+            "first_attempt",
+            "completed_mock_test",
+            "reached_streak_7",
+            "retention",
+            "retention_rates",
+            "updated_at",
+        ]
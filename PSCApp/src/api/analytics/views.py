@@ -1,13 +1,15 @@
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import permissions, viewsets
+from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
 from src.api.analytics.serializers import (
+    CohortSummarySerializer,
     ContributionSerializer,
     DailyActivitySerializer,
 )
-from src.models.analytics import Contribution, DailyActivity
+from src.models.analytics import CohortSummary, Contribution, DailyActivity
+from src.services import dashboard_counts
 
 
 class ContributionViewSet(viewsets.ReadOnlyModelViewSet):
@@ -33,6 +35,7 @@ class ContributionViewSet(viewsets.ReadOnlyModelViewSet):
     def approve(self, request, pk=None):
         contribution = self.get_object()
         contribution.approve_contribution()
+        dashboard_counts.invalidate(dashboard_counts.CONTRIBUTIONS)
         return Response({"status": "approved"})
 
     @action(detail=True, methods=["post"], permission_classes=[permissions.IsAdminUser])
@@ -40,6 +43,7 @@ class ContributionViewSet(viewsets.ReadOnlyModelViewSet):
         contribution = self.get_object()
         reason = request.data.get("reason", "No reason provided")
         contribution.reject_contribution(reason)
+        dashboard_counts.invalidate(dashboard_counts.CONTRIBUTIONS)
         return Response({"status": "rejected"})
 
 
@@ -54,3 +58,60 @@ class DailyActivityViewSet(viewsets.ReadOnlyModelViewSet):
         permissions.IsAdminUser
     ]  # Only admins should see raw stats? Or public?
     # PlatformStats is public aggregated. DailyActivity is detailed. Let's keep Admin.
+
+    # Ten years of monthly points
+    TREND_MAX_DAYS = 3660
+
+    @action(detail=False, methods=["get"], url_path="active-users")
+    def active_users(self, request):
+        """
+        Live DAU / WAU / MAU from the activity sketches, optionally for one
+        target branch (?branch=<id>). Values are null without Redis.
+        """
+        from src.services import activity
+
+        try:
+            branch_id = int(request.query_params.get("branch") or 0) or None
+        except ValueError:
+            return Response(
+                {"error": "branch must be an integer"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(
+            {
+                "branch": branch_id,
+                "dau": activity.unique_users(days=1, branch_id=branch_id),
+                "wau": activity.unique_users(days=7, branch_id=branch_id),
+                "mau": activity.unique_users(days=30, branch_id=branch_id),
+            }
+        )
+
+    @action(detail=False, methods=["get"])
+    def trend(self, request):
+        """
+        Activity over the last ?days=<n> days (default 30, at most
+        TREND_MAX_DAYS). Ranges up to ~3 months are daily, up to 2 years
+        weekly and longer ones monthly.
+        """
+        try:
+            days = int(request.query_params.get("days", 30))
+        except ValueError:
+            days = 0
+        if not 1 <= days <= self.TREND_MAX_DAYS:
+            return Response(
+                {"error": f"days must be between 1 and {self.TREND_MAX_DAYS}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(DailyActivity.get_trend_data(days))
+
+
+class CohortSummaryViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Signup-week cohorts with funnel and retention (Admin Dashboard).
+    Precomputed nightly; newest cohorts first.
+    """
+
+    queryset = CohortSummary.objects.all()
+    serializer_class = CohortSummarySerializer
+    permission_classes = [permissions.IsAdminUser]
+    lookup_field = "cohort_week"
@@ -1,9 +1,12 @@
 from rest_framework import serializers
 
 from src.models.branch import Branch, Category, SubBranch
+from src.services.images import build_srcset
 
 
 class SubBranchSerializer(serializers.ModelSerializer):
+    icon_srcset = serializers.SerializerMethodField()
+
     class Meta:
         model = SubBranch
         fields = [
@@ -15,11 +18,15 @@ class SubBranchSerializer(serializers.ModelSerializer):
             "description_en",
             "description_np",
             "icon",
+            "icon_srcset",
             "display_order",
             "is_active",
         ]
         read_only_fields = ["slug"]
 
+    def get_icon_srcset(self, obj):
+        return build_srcset(obj.icon, obj.icon_variants, self.context.get("request"))
+
 
 class BranchSerializer(serializers.ModelSerializer):
     sub_branches = SubBranchSerializer(many=True, read_only=True)
@@ -49,6 +56,7 @@ class CategorySerializer(serializers.ModelSerializer):
     target_sub_branch_name = serializers.CharField(
         source="target_sub_branch.name_en", read_only=True
     )
+    icon_srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = Category
@@ -68,12 +76,16 @@ class CategorySerializer(serializers.ModelSerializer):
             "is_public",
             "created_by",
             "icon",
+            "icon_srcset",
             "color_code",
             "display_order",
             "is_active",
         ]
         read_only_fields = ["slug", "created_by"]
 
+    def get_icon_srcset(self, obj):
+        return build_srcset(obj.icon, obj.icon_variants, self.context.get("request"))
+
     def validate(self, data):
         # Call model's clean method or replicate logic
         instance = Category(**data)
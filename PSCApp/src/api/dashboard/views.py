@@ -6,7 +6,6 @@ Provides a custom admin-like interface for moderation and monitoring.
 import csv
 import json
 import logging
-from datetime import timedelta
 
 from django.contrib import messages
 from django.contrib.admin.views.decorators import staff_member_required
@@ -22,6 +21,7 @@ from django.views.decorators.http import require_POST
 from src.models import (
     Branch,
     Category,
+    CohortSummary,
     Contribution,
     DailyActivity,
     MockTest,
@@ -33,13 +33,13 @@ from src.models import (
     QuestionReport,
     SubBranch,
 )
+from src.services import dashboard_counts
 
 logger = logging.getLogger(__name__)
 NOTE_STREAM_MAX_AGE_SECONDS = 15 * 60
 NOTE_STREAM_SIGNING_SALT = "note-stream-access"
-
-# PlatformStats uses singleton pattern with ID 1
-PLATFORM_STATS_SINGLETON_ID = 1
+# Chart ranges (days) offered on the dashboard index
+ACTIVITY_RANGES = (7, 30, 90, 365)
 
 # CSV export string length limits
 CSV_QUESTION_TEXT_LIMIT = 200
@@ -49,8 +49,8 @@ CSV_SHORT_TEXT_LIMIT = 100
 @staff_member_required
 def dashboard_index(request):
     """Main dashboard view with platform statistics and recent activity."""
-    # Get or create platform stats (singleton pattern)
-    stats, _ = PlatformStats.objects.get_or_create(id=PLATFORM_STATS_SINGLETON_ID)
+    # Platform stats singleton (fully counted on first use)
+    stats = PlatformStats.get_solo()
 
     # Recent contributions
     recent_contributions = Contribution.objects.select_related(
@@ -62,40 +62,24 @@ def dashboard_index(request):
         "question", "reported_by"
     ).order_by("-created_at")[:5]
 
-    # Activity data for chart (last 7 days)
-    end_date = timezone.now().date()
-    start_date = end_date - timedelta(days=6)
-    activities = DailyActivity.objects.filter(
-        date__range=[start_date, end_date]
-    ).order_by("date")
-
+    # Activity chart; longer ranges read weekly / monthly rollups
+    try:
+        activity_days = int(request.GET.get("days", 7))
+    except ValueError:
+        activity_days = 7
+    if activity_days not in ACTIVITY_RANGES:
+        activity_days = 7
+    trend = DailyActivity.get_trend_data(activity_days)
+    label_format = "%b %Y" if trend["resolution"] == "MONTH" else "%b %d"
     activity_data = {
-        "labels": [],
-        "new_users": [],
-        "questions_added": [],
-        "tests_taken": [],
+        "labels": [p["period_start"].strftime(label_format) for p in trend["points"]],
+        "new_users": [p["new_users"] for p in trend["points"]],
+        "questions_added": [p["questions_added"] for p in trend["points"]],
+        "tests_taken": [p["mock_tests_taken"] for p in trend["points"]],
     }
 
-    # Build date range with zeros for missing days
-    all_dates = []
-    current = start_date
-    while current <= end_date:
-        all_dates.append(current)
-        current += timedelta(days=1)
-
-    existing_dates = {a.date: a for a in activities}
-
-    for d in all_dates:
-        activity_data["labels"].append(d.strftime("%b %d"))
-        if d in existing_dates:
-            a = existing_dates[d]
-            activity_data["new_users"].append(a.new_users)
-            activity_data["questions_added"].append(a.questions_added)
-            activity_data["tests_taken"].append(a.mock_tests_taken)
-        else:
-            activity_data["new_users"].append(0)
-            activity_data["questions_added"].append(0)
-            activity_data["tests_taken"].append(0)
+    # Precomputed nightly by the cohort analytics task
+    cohorts = CohortSummary.objects.all()[:8]
 
     return render(
         request,
@@ -105,6 +89,11 @@ def dashboard_index(request):
             "recent_contributions": recent_contributions,
             "recent_reports": recent_reports,
             "activity_data": json.dumps(activity_data),
+            "activity_days": activity_days,
+            "activity_ranges": ACTIVITY_RANGES,
+            "activity_resolution": trend["resolution"],
+            "cohorts": cohorts,
+            "cohort_weeks": range(8),
         },
     )
 
@@ -128,11 +117,8 @@ def contributions_list(request):
     if year:
         contributions = contributions.filter(contribution_year=int(year))
 
-    # Get counts for stats
-    pending_count = Contribution.objects.filter(status="PENDING").count()
-    approved_count = Contribution.objects.filter(status="APPROVED").count()
-    rejected_count = Contribution.objects.filter(status="REJECTED").count()
-    public_count = Contribution.objects.filter(status="MADE_PUBLIC").count()
+    # Tab counters (one cached aggregate)
+    counts = dashboard_counts.tab_counts(dashboard_counts.CONTRIBUTIONS)
 
     # Pagination
     paginator = Paginator(contributions, 20)
@@ -149,10 +135,7 @@ def contributions_list(request):
         "dashboard/contributions.html",
         {
             "contributions": contributions,
-            "pending_count": pending_count,
-            "approved_count": approved_count,
-            "rejected_count": rejected_count,
-            "public_count": public_count,
+            **counts,
             "year_choices": year_choices,
             "month_choices": month_choices,
         },
@@ -194,9 +177,7 @@ def notes_list(request):
             | Q(description_np__icontains=search)
         )
 
-    pending_count = Note.objects.filter(status="PENDING_REVIEW").count()
-    approved_count = Note.objects.filter(status="APPROVED").count()
-    rejected_count = Note.objects.filter(status="REJECTED").count()
+    counts = dashboard_counts.tab_counts(dashboard_counts.NOTES)
     categories = Category.objects.filter(is_active=True).order_by("name_en")
 
     paginator = Paginator(notes, 20)
@@ -208,9 +189,7 @@ def notes_list(request):
         "dashboard/notes.html",
         {
             "notes": notes,
-            "pending_count": pending_count,
-            "approved_count": approved_count,
-            "rejected_count": rejected_count,
+            **counts,
             "categories": categories,
         },
     )
@@ -269,6 +248,7 @@ def approve_note(request, pk):
             message_np=f'"{note.title_np or note.title_en}" शीर्षकको नोट स्वीकृत भयो।',
         )
 
+    dashboard_counts.invalidate(dashboard_counts.NOTES)
     messages.success(request, f'Note "{note.title_en}" approved.')
     return redirect("dashboard:note_detail", pk=pk)
 
@@ -305,6 +285,7 @@ def reject_note(request, pk):
             message_np=f'"{note.title_np or note.title_en}" नोट अस्वीकार भयो। कारण: {reason or "उल्लेख छैन"}',
         )
 
+    dashboard_counts.invalidate(dashboard_counts.NOTES)
     messages.warning(request, f'Note "{note.title_en}" rejected.')
     return redirect("dashboard:note_detail", pk=pk)
 
@@ -327,6 +308,7 @@ def approve_contribution(request, pk):
         related_question=contribution.question,
     )
 
+    dashboard_counts.invalidate(dashboard_counts.CONTRIBUTIONS)
     messages.success(request, f"Contribution #{pk} has been approved.")
     return redirect("dashboard:contribution_detail", pk=pk)
 
@@ -352,6 +334,7 @@ def reject_contribution(request):
         related_question=contribution.question,
     )
 
+    dashboard_counts.invalidate(dashboard_counts.CONTRIBUTIONS)
     messages.warning(request, f"Contribution #{contribution_id} has been rejected.")
     return redirect("dashboard:contributions")
 
@@ -374,6 +357,9 @@ def make_public(request, pk):
         related_question=contribution.question,
     )
 
+    dashboard_counts.invalidate(
+        dashboard_counts.CONTRIBUTIONS, dashboard_counts.QUESTIONS
+    )
     messages.success(request, f"Contribution #{pk} has been made public.")
     return redirect("dashboard:contribution_detail", pk=pk)
 
@@ -413,11 +399,8 @@ def questions_list(request):
             | Q(question_text_np__icontains=search)
         )
 
-    # Get counts
-    public_count = Question.objects.filter(status="PUBLIC").count()
-    pending_count = Question.objects.filter(status="PENDING_REVIEW").count()
-    draft_count = Question.objects.filter(status="DRAFT").count()
-    reported_count = Question.objects.filter(reported_count__gt=0).count()
+    # Tab counters (one cached aggregate)
+    counts = dashboard_counts.tab_counts(dashboard_counts.QUESTIONS)
 
     # Get categories for filter dropdown
     categories = Category.objects.filter(is_active=True).order_by("name_en")
@@ -433,10 +416,7 @@ def questions_list(request):
         {
             "questions": questions,
             "categories": categories,
-            "public_count": public_count,
-            "pending_count": pending_count,
-            "draft_count": draft_count,
-            "reported_count": reported_count,
+            **counts,
         },
     )
 
@@ -455,7 +435,11 @@ def question_detail(request, pk):
     return render(
         request,
         "dashboard/question_detail.html",
-        {"question": question, "reports": reports},
+        {
+            "question": question,
+            "reports": reports,
+            "answer_distribution": question.get_answer_distribution(),
+        },
     )
 
 
@@ -468,6 +452,7 @@ def publish_question(request, pk):
     question.is_public = True
     question.save(update_fields=["status", "is_public"])
 
+    dashboard_counts.invalidate(dashboard_counts.QUESTIONS)
     messages.success(request, f"Question #{pk} is now public.")
     return redirect("dashboard:question_detail", pk=pk)
 
@@ -560,11 +545,8 @@ def reports_list(request):
             | Q(question__question_text_en__icontains=search)
         )
 
-    # Get counts
-    pending_count = QuestionReport.objects.filter(status="PENDING").count()
-    under_review_count = QuestionReport.objects.filter(status="UNDER_REVIEW").count()
-    resolved_count = QuestionReport.objects.filter(status="RESOLVED").count()
-    high_priority_count = Question.objects.filter(reported_count__gte=3).count()
+    # Tab counters (one cached aggregate per table)
+    counts = dashboard_counts.tab_counts(dashboard_counts.REPORTS)
 
     # Pagination
     paginator = Paginator(reports, 20)
@@ -576,10 +558,7 @@ def reports_list(request):
         "dashboard/reports.html",
         {
             "reports": reports,
-            "pending_count": pending_count,
-            "under_review_count": under_review_count,
-            "resolved_count": resolved_count,
-            "high_priority_count": high_priority_count,
+            **counts,
         },
     )
 
@@ -594,6 +573,7 @@ def resolve_report(request, pk):
     report.resolve_report(request.user, admin_notes)
     report.notify_creator()
 
+    dashboard_counts.invalidate(dashboard_counts.REPORTS)
     messages.success(request, f"Report #{pk} has been resolved.")
 
     # Redirect back to referring page or reports list
@@ -650,8 +630,9 @@ def bulk_approve_contributions(request):
 
     # Bulk create notifications
     if notifications_to_create:
-        Notification.objects.bulk_create(notifications_to_create)
+        Notification.enqueue_bulk(notifications_to_create)
 
+    dashboard_counts.invalidate(dashboard_counts.CONTRIBUTIONS)
     messages.success(request, f"{approved_count} contributions have been approved.")
     return redirect("dashboard:contributions")
 
@@ -702,8 +683,9 @@ def bulk_reject_contributions(request):
 
     # Bulk create notifications
     if notifications_to_create:
-        Notification.objects.bulk_create(notifications_to_create)
+        Notification.enqueue_bulk(notifications_to_create)
 
+    dashboard_counts.invalidate(dashboard_counts.CONTRIBUTIONS)
     messages.warning(request, f"{rejected_count} contributions have been rejected.")
     return redirect("dashboard:contributions")
 
@@ -751,8 +733,11 @@ def bulk_make_public(request):
 
     # Bulk create notifications
     if notifications_to_create:
-        Notification.objects.bulk_create(notifications_to_create)
+        Notification.enqueue_bulk(notifications_to_create)
 
+    dashboard_counts.invalidate(
+        dashboard_counts.CONTRIBUTIONS, dashboard_counts.QUESTIONS
+    )
     messages.success(request, f"{public_count} contributions have been made public.")
     return redirect("dashboard:contributions")
 
@@ -787,6 +772,7 @@ def bulk_resolve_reports(request):
         report.notify_creator()
         resolved_count += 1
 
+    dashboard_counts.invalidate(dashboard_counts.REPORTS)
     messages.success(request, f"{resolved_count} reports have been resolved.")
     return redirect("dashboard:reports")
 
@@ -810,10 +796,11 @@ def bulk_publish_questions(request):
             logger.warning("Invalid question ID: %s", qid)
 
     # Use bulk update for better performance
-    published_count = Question.objects.filter(pk__in=valid_ids).exclude(
-        status="PUBLIC"
-    ).update(status="PUBLIC", is_public=True)
+    questions = Question.objects.filter(pk__in=valid_ids).exclude(status="PUBLIC")
+    PlatformStats.record_bulk_status_change(questions, "PUBLIC")
+    published_count = questions.update(status="PUBLIC", is_public=True)
 
+    dashboard_counts.invalidate(dashboard_counts.QUESTIONS)
     messages.success(request, f"{published_count} questions have been published.")
     return redirect("dashboard:questions")
 
@@ -844,10 +831,8 @@ def mock_tests_list(request):
             Q(title_en__icontains=search) | Q(title_np__icontains=search)
         )
 
-    # Get counts
-    official_count = MockTest.objects.filter(test_type="OFFICIAL").count()
-    community_count = MockTest.objects.filter(test_type="COMMUNITY").count()
-    custom_count = MockTest.objects.filter(test_type="CUSTOM").count()
+    # Tab counters (one cached aggregate)
+    counts = dashboard_counts.tab_counts(dashboard_counts.MOCK_TESTS)
 
     branches = Branch.objects.filter(is_active=True).order_by("name_en")
 
@@ -862,9 +847,7 @@ def mock_tests_list(request):
         {
             "tests": tests,
             "branches": branches,
-            "official_count": official_count,
-            "community_count": community_count,
-            "custom_count": custom_count,
+            **counts,
         },
     )
 
@@ -972,6 +955,7 @@ def create_mock_test(request):
                 test.total_questions = len(mtq_list)
                 test.save(update_fields=["total_questions"])
 
+        dashboard_counts.invalidate(dashboard_counts.MOCK_TESTS)
         messages.success(
             request, f"Mock test '{title_en}' created with {test.total_questions} questions."
         )
@@ -1023,11 +1007,7 @@ def users_list(request):
     elif role == "inactive":
         users = users.filter(is_active=False)
 
-    total_count = User.objects.count()
-    staff_count = User.objects.filter(is_staff=True).count()
-    active_count = User.objects.filter(
-        is_active=True, last_login__gte=timezone.now() - timedelta(days=30)
-    ).count()
+    counts = dashboard_counts.tab_counts(dashboard_counts.USERS)
 
     # Pagination
     paginator = Paginator(users, 20)
@@ -1039,9 +1019,7 @@ def users_list(request):
         "dashboard/users.html",
         {
             "users": users,
-            "total_count": total_count,
-            "staff_count": staff_count,
-            "active_count": active_count,
+            **counts,
         },
     )
 
@@ -1077,6 +1055,7 @@ def toggle_user_staff(request, pk):
 
     user_obj.is_staff = not user_obj.is_staff
     user_obj.save(update_fields=["is_staff"])
+    dashboard_counts.invalidate(dashboard_counts.USERS)
 
     status_text = "granted staff access" if user_obj.is_staff else "removed staff access"
     messages.success(request, f"User {user_obj.username} has been {status_text}.")
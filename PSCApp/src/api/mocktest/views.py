@@ -47,6 +47,7 @@ class MockTestViewSet(viewsets.ModelViewSet):
             "test_type": "CUSTOM" | "COMMUNITY",  # optional, default CUSTOM
             "duration_minutes": 30,  # optional
             "sub_branch_id": 1,  # optional
+            "difficulty_range": [-1.0, 1.0],  # optional, calibrated logits
         }
         """
         data = request.data
@@ -56,6 +57,7 @@ class MockTestViewSet(viewsets.ModelViewSet):
         test_type = data.get("test_type", "CUSTOM")
         duration_minutes = data.get("duration_minutes")
         sub_branch_id = data.get("sub_branch_id")
+        difficulty_range = data.get("difficulty_range")
 
         if not branch_id or not category_dist:
             return Response(
@@ -63,6 +65,19 @@ class MockTestViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        if difficulty_range is not None:
+            try:
+                # A string is iterable too: "12" would unpack as (1.0, 2.0)
+                if not isinstance(difficulty_range, (list, tuple)):
+                    raise TypeError
+                low, high = (float(value) for value in difficulty_range)
+            except (TypeError, ValueError):
+                return Response(
+                    {"detail": "difficulty_range must be a [min, max] pair."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            difficulty_range = (min(low, high), max(low, high))
+
         # Validate test_type — only CUSTOM and COMMUNITY allowed for user generation
         if test_type not in ("CUSTOM", "COMMUNITY"):
             test_type = "CUSTOM"
@@ -84,7 +99,7 @@ class MockTestViewSet(viewsets.ModelViewSet):
         )
 
         # Generate questions
-        test.generate_from_categories(category_dist)
+        test.generate_from_categories(category_dist, difficulty_range=difficulty_range)
 
         serializer = self.get_serializer(test)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
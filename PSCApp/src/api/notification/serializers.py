@@ -1,6 +1,6 @@
 from rest_framework import serializers
 
-from src.models.notification import Notification
+from src.models.notification import Notification, NotificationCampaign
 
 
 class NotificationSerializer(serializers.ModelSerializer):
@@ -29,3 +29,37 @@ class NotificationSerializer(serializers.ModelSerializer):
             "related_mock_test",
             "created_at",
         ]
+
+
+class NotificationCampaignSerializer(serializers.ModelSerializer):
+    user_ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, default=list
+    )
+
+    class Meta:
+        model = NotificationCampaign
+        fields = [
+            "id",
+            "notification_type",
+            "title_en",
+            "title_np",
+            "message_en",
+            "message_np",
+            "action_url",
+            "user_ids",
+            "branch",
+            "sub_branch",
+            "active_within_days",
+            "send_at",
+            "rate_per_minute",
+            "status",
+            "sent_count",
+            "deferred_count",
+            "created_at",
+        ]
+        read_only_fields = [
+            "status",
+            "sent_count",
+            "deferred_count",
+            "created_at",
+        ]
@@ -1,12 +1,27 @@
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
 
-from src.api.notification.serializers import NotificationSerializer
+from src.api.notification.serializers import (
+    NotificationCampaignSerializer,
+    NotificationSerializer,
+)
 from src.models.notification import Notification
 from src.models.user import UserProfile
 
 
+class NotificationCursorPagination(CursorPagination):
+    """
+    Keyset paging on (user, -created_at): every page is an index range
+    scan, however long the user's history.
+    """
+
+    ordering = ("-created_at", "-id")
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
 class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for Notifications.
@@ -14,6 +29,7 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
 
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = NotificationCursorPagination
 
     def get_queryset(self):
         return Notification.objects.filter(user=self.request.user).order_by(
@@ -28,9 +44,7 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
 
     @action(detail=False, methods=["post"], url_path="read-all")
     def mark_all_as_read(self, request):
-        Notification.objects.filter(user=request.user, is_read=False).update(
-            is_read=True
-        )
+        Notification.mark_all_as_read(request.user)
         return Response({"status": "all read"})
 
     @action(detail=False, methods=["get"], url_path="unread")
@@ -75,15 +89,20 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=False, methods=["post"], url_path="send-push")
     def send_push(self, request):
         """
-        Admin-only: Send a push notification to specific users or all users.
+        Admin-only: Schedule a notification campaign (in-app + push) and
+        return at once; the campaign worker sends it at a capped rate.
 
         Body:
           - title_en: str (required)
           - title_np: str (optional)
           - message_en: str (required)
           - message_np: str (optional)
-          - user_ids: list[int] (optional, if omitted sends to all)
           - notification_type: str (optional, default "GENERAL")
+          - user_ids: list[int] (optional, if omitted sends to all)
+          - branch / sub_branch: int (optional audience filters)
+          - active_within_days: int (optional, only recently active users)
+          - send_at: datetime (optional, default now)
+          - rate_per_minute: int (optional, default 1000)
         """
         if not request.user.is_staff:
             return Response(
@@ -91,61 +110,13 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        title_en = request.data.get("title_en", "")
-        title_np = request.data.get("title_np", "")
-        message_en = request.data.get("message_en", "")
-        message_np = request.data.get("message_np", "")
-        notification_type = request.data.get("notification_type", "GENERAL")
-        user_ids = request.data.get("user_ids")
-
-        if not title_en or not message_en:
-            return Response(
-                {"error": "title_en and message_en are required"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        from django.contrib.auth.models import User
-
-        if user_ids:
-            users = User.objects.filter(id__in=user_ids)
-        else:
-            users = User.objects.filter(is_active=True)
-
-        # Create in-app notifications
-        Notification.create_bulk_notifications(
-            users=list(users),
-            notification_type=notification_type,
-            title_en=title_en,
-            title_np=title_np or title_en,
-            message_en=message_en,
-            message_np=message_np or message_en,
-        )
-
-        # Send push notifications
-        from src.services.push import send_bulk_push_notifications
-
-        tokens = list(
-            UserProfile.objects.filter(
-                google_auth_user__in=users,
-                push_notifications_enabled=True,
-                expo_push_token__isnull=False,
-            )
-            .exclude(expo_push_token="")
-            .values_list("expo_push_token", flat=True)
-        )
-
-        push_result = send_bulk_push_notifications(
-            tokens=tokens,
-            title=title_en,
-            body=message_en,
-            data={"type": notification_type},
-        )
+        serializer = NotificationCampaignSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        campaign = serializer.save(created_by=request.user)
+        campaign.schedule()
 
         return Response(
-            {
-                "status": "sent",
-                "in_app_count": users.count(),
-                "push_sent": push_result["sent"],
-                "push_failed": push_result["failed"],
-            }
+            {"status": "queued", "campaign": serializer.data},
+            status=status.HTTP_202_ACCEPTED,
         )
@@ -1,3 +1,4 @@
+from django.core.cache import cache
 from rest_framework import permissions, viewsets
 from rest_framework.response import Response
 
@@ -8,12 +9,17 @@ from src.models.platform_stats import PlatformStats
 class PlatformStatsViewSet(viewsets.ViewSet):
     """
     ViewSet for Platform Statistics.
-    Publicly accessible.
+    Publicly accessible; served from cache for PlatformStats.CACHE_TIMEOUT.
     """
 
     permission_classes = [permissions.AllowAny]
 
     def list(self, request):
-        stats, _ = PlatformStats.objects.get_or_create(id=1)
-        serializer = PlatformStatsSerializer(stats)
-        return Response(serializer.data)
+        data = cache.get(PlatformStats.CACHE_KEY)
+        if data is None:
+            stats = PlatformStats.objects.select_related(
+                "top_contributor_this_month__profile", "most_attempted_category"
+            ).get(id=PlatformStats.get_solo().id)
+            data = dict(PlatformStatsSerializer(stats).data)
+            cache.set(PlatformStats.CACHE_KEY, data, PlatformStats.CACHE_TIMEOUT)
+        return Response(data)
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 
 from src.models.question_answer import Answer, Question, QuestionReport
+from src.services.images import build_srcset
 
 
 class AnswerSerializer(serializers.ModelSerializer):
@@ -21,6 +22,7 @@ class QuestionSerializer(serializers.ModelSerializer):
         source="created_by.username", read_only=True
     )
     category_name = serializers.CharField(source="category.name_en", read_only=True)
+    image_srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = Question
@@ -35,6 +37,7 @@ class QuestionSerializer(serializers.ModelSerializer):
             "explanation_en",
             "explanation_np",
             "image",
+            "image_srcset",
             "status",
             "created_by",
             "created_by_name",
@@ -44,6 +47,8 @@ class QuestionSerializer(serializers.ModelSerializer):
             "source_reference",
             "times_attempted",
             "times_correct",
+            "calibrated_difficulty",
+            "discrimination",
             "answers",
             "created_at",
         ]
@@ -54,9 +59,14 @@ class QuestionSerializer(serializers.ModelSerializer):
             "scheduled_public_date",
             "times_attempted",
             "times_correct",
+            "calibrated_difficulty",
+            "discrimination",
             "created_at",
         ]
 
+    def get_image_srcset(self, obj):
+        return build_srcset(obj.image, obj.image_variants, self.context.get("request"))
+
     def create(self, validated_data):
         answers_data = validated_data.pop("answers", [])
         question = Question.objects.create(**validated_data)
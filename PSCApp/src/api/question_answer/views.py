@@ -40,7 +40,12 @@ class QuestionViewSet(viewsets.ModelViewSet):
     ]
     filterset_fields = ["category", "difficulty_level", "question_type"]
     search_fields = ["question_text_en", "question_text_np"]
-    ordering_fields = ["created_at", "times_attempted", "times_correct"]
+    ordering_fields = [
+        "created_at",
+        "times_attempted",
+        "times_correct",
+        "calibrated_difficulty",
+    ]
 
     @staticmethod
     def _create_or_refresh_contribution(question, user):
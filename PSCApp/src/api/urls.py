@@ -1,7 +1,8 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from src.api.analytics.views import ContributionViewSet, DailyActivityViewSet
+from src.api.analytics.views import (CohortSummaryViewSet, ContributionViewSet,
+                                     DailyActivityViewSet)
 from src.api.app_settings.views import AppSettingsViewSet
 from src.api.attempt_answer.views import UserAnswerViewSet, UserAttemptViewSet
 from src.api.branch.views import (BranchViewSet, CategoryViewSet,
@@ -13,7 +14,8 @@ from src.api.platform_stats.views import PlatformStatsViewSet
 from src.api.question_answer.views import (QuestionReportViewSet,
                                            QuestionViewSet)
 from src.api.time_config.views import TimeConfigurationViewSet
-from src.api.user_stats.views import (LeaderBoardViewSet, RankingsView,
+from src.api.user_stats.views import (LeaderBoardViewSet,
+                                      RankingsAroundMeView, RankingsView,
                                       StudyCollectionViewSet,
                                       UserProgressViewSet, UserStatisticsViewSet)
 
@@ -39,6 +41,7 @@ router.register(r"answers", UserAnswerViewSet)
 # Stats & Analytics
 router.register(r"platform-stats", PlatformStatsViewSet, basename="platform-stats")
 router.register(r"daily-activity", DailyActivityViewSet)
+router.register(r"cohorts", CohortSummaryViewSet)
 router.register(r"contributions", ContributionViewSet)
 
 # User Stats & Profile
@@ -54,5 +57,10 @@ router.register(r"time-configs", TimeConfigurationViewSet)
 
 urlpatterns = [
     path("rankings/", RankingsView.as_view(), name="rankings"),
+    path(
+        "rankings/around-me/",
+        RankingsAroundMeView.as_view(),
+        name="rankings-around-me",
+    ),
     path("", include(router.urls)),
 ]
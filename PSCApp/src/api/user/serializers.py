@@ -1,6 +1,7 @@
 from rest_framework import serializers
 
 from src.models.user import UserProfile
+from src.services.images import build_srcset
 
 
 class UserProfileSerializer(serializers.ModelSerializer):
@@ -10,6 +11,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
     total_contributions = serializers.IntegerField(read_only=True)
     branch_name = serializers.SerializerMethodField()
     sub_branch_name = serializers.SerializerMethodField()
+    profile_picture_srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = UserProfile
@@ -18,6 +20,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
             "full_name",
             "email",
             "profile_picture",
+            "profile_picture_srcset",
             "phone_number",
             "preferred_language",
             "target_branch",
@@ -31,6 +34,8 @@ class UserProfileSerializer(serializers.ModelSerializer):
             "sub_branch_name",
             "expo_push_token",
             "push_notifications_enabled",
+            "quiet_hours_start",
+            "quiet_hours_end",
         ]
         read_only_fields = [
             "id",
@@ -41,6 +46,13 @@ class UserProfileSerializer(serializers.ModelSerializer):
             "date_joined",
         ]
 
+    def get_profile_picture_srcset(self, obj):
+        return build_srcset(
+            obj.profile_picture,
+            obj.profile_picture_variants,
+            self.context.get("request"),
+        )
+
     def get_branch_name(self, obj):
         if obj.target_branch:
             return obj.target_branch.name_en
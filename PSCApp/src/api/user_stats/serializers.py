@@ -2,6 +2,7 @@ from rest_framework import serializers
 
 from src.models.analytics import LeaderBoard
 from src.models.user_stats import StudyCollection, UserProgress, UserStatistics
+from src.services.images import build_srcset
 
 
 class UserProgressSerializer(serializers.ModelSerializer):
@@ -53,6 +54,7 @@ class UserStatisticsSerializer(serializers.ModelSerializer):
             "contribution_rank",
             "answers_rank",
             "accuracy_percentage",
+            "ability_estimate",
             "last_updated",
         ]
         read_only_fields = [
@@ -69,6 +71,7 @@ class UserStatisticsSerializer(serializers.ModelSerializer):
             "contribution_rank",
             "answers_rank",
             "accuracy_percentage",
+            "ability_estimate",
             "last_updated",
         ]
 
@@ -78,22 +81,12 @@ class UserStatisticsSerializer(serializers.ModelSerializer):
     def get_contribution_rank(self, obj):
         if obj.questions_contributed <= 0:
             return None
-        return (
-            UserStatistics.objects.filter(
-                questions_contributed__gt=obj.questions_contributed
-            ).count()
-            + 1
-        )
+        return obj.contribution_rank
 
     def get_answers_rank(self, obj):
         if obj.questions_answered <= 0:
             return None
-        return (
-            UserStatistics.objects.filter(
-                questions_answered__gt=obj.questions_answered
-            ).count()
-            + 1
-        )
+        return obj.answers_rank
 
 
 class StudyCollectionSerializer(serializers.ModelSerializer):
@@ -121,6 +114,7 @@ class LeaderBoardSerializer(serializers.ModelSerializer):
     profile_picture = serializers.ImageField(
         source="user.profile.profile_picture", read_only=True
     )
+    profile_picture_srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = LeaderBoard
@@ -129,6 +123,7 @@ class LeaderBoardSerializer(serializers.ModelSerializer):
             "previous_rank",
             "user_name",
             "profile_picture",
+            "profile_picture_srcset",
             "total_score",
             "tests_completed",
             "accuracy_percentage",
@@ -136,3 +131,13 @@ class LeaderBoardSerializer(serializers.ModelSerializer):
             "branch",
             "sub_branch",
         ]
+
+    def get_profile_picture_srcset(self, obj):
+        profile = getattr(obj.user, "profile", None)
+        if not profile:
+            return None
+        return build_srcset(
+            profile.profile_picture,
+            profile.profile_picture_variants,
+            self.context.get("request"),
+        )
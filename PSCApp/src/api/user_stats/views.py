@@ -1,3 +1,6 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Q
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
@@ -11,8 +14,11 @@ from src.api.user_stats.serializers import (
     UserProgressSerializer,
     UserStatisticsSerializer,
 )
-from src.models.analytics import LeaderBoard
+from src.models.analytics import LeaderBoard, LeaderBoardSnapshot
 from src.models.user_stats import StudyCollection, UserProgress, UserStatistics
+from src.services import leaderboard as live_leaderboard
+from src.services import rankings
+from src.services.images import build_srcset
 
 
 class UserStatisticsViewSet(viewsets.ReadOnlyModelViewSet):
@@ -89,6 +95,29 @@ class StudyCollectionViewSet(viewsets.ModelViewSet):
         return Response({"status": "questions removed"})
 
 
+def rank_window(queryset, rank_field, me, n):
+    """
+    ``me`` plus up to n rows ranked above and below it. Rows are ordered by
+    the (rank, id) keyset, so ties with ``me`` land on one side or the other
+    by id, and both sides are LIMITed range scans on the rank index, which
+    keeps this constant-time wherever ``me`` sits.
+    """
+    my_rank = getattr(me, rank_field)
+    above = list(
+        queryset.filter(
+            Q(**{f"{rank_field}__lt": my_rank})
+            | Q(**{rank_field: my_rank, "id__lt": me.id})
+        ).order_by(f"-{rank_field}", "-id")[:n]
+    )
+    below = list(
+        queryset.filter(
+            Q(**{f"{rank_field}__gt": my_rank})
+            | Q(**{rank_field: my_rank, "id__gt": me.id})
+        ).order_by(rank_field, "id")[:n]
+    )
+    return [*reversed(above), me, *below]
+
+
 class LeaderBoardViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = LeaderBoard.objects.all().order_by("rank")
     serializer_class = LeaderBoardSerializer
@@ -96,6 +125,159 @@ class LeaderBoardViewSet(viewsets.ReadOnlyModelViewSet):
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["time_period", "branch", "sub_branch"]
 
+    def _live_rows(self, entries, time_period, branch_id, sub_branch_id):
+        users = User.objects.select_related("profile").in_bulk(
+            [entry["user_id"] for entry in entries]
+        )
+        return [
+            LeaderBoard(
+                user=users[entry["user_id"]],
+                time_period=time_period,
+                branch_id=branch_id,
+                sub_branch_id=sub_branch_id,
+                **{key: entry[key] for key in LeaderBoard.BOARD_FIELDS},
+            )
+            for entry in entries
+            if entry["user_id"] in users
+        ]
+
+    def _board_params(self, request, size_param, default, maximum):
+        """
+        Parse time_period / branch / sub_branch and a size parameter.
+        Returns (params, None) or (None, error_response).
+        """
+        time_period = request.query_params.get("time_period", "WEEKLY")
+        if time_period not in dict(LeaderBoard.TIME_PERIOD_CHOICES):
+            return None, Response(
+                {"detail": "Invalid time_period."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            branch_id = int(request.query_params["branch"])
+            sub_branch_id = int(request.query_params.get("sub_branch") or 0) or None
+            size = int(request.query_params.get(size_param, default))
+        except (KeyError, ValueError):
+            return None, Response(
+                {
+                    "detail": f"branch is required; branch, sub_branch and {size_param} must be integers."
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return (time_period, branch_id, sub_branch_id, min(max(size, 1), maximum)), None
+
+    @action(detail=False, methods=["get"])
+    def live(self, request):
+        """
+        GET /api/leaderboard/live/?branch=1&time_period=WEEKLY&sub_branch=2&limit=10
+
+        Reads the Redis live board for the current period; falls back to the
+        stored rankings when Redis is not configured.
+        """
+        params, error = self._board_params(request, "limit", 10, 100)
+        if error:
+            return error
+        time_period, branch_id, sub_branch_id, limit = params
+
+        entries = live_leaderboard.top(time_period, branch_id, sub_branch_id, limit)
+        me = None
+        if entries is None:
+            source = "database"
+            queryset = LeaderBoard.objects.filter(
+                time_period=time_period, branch_id=branch_id, sub_branch_id=sub_branch_id
+            ).select_related("user__profile")
+            rows = list(queryset.order_by("rank")[:limit])
+            if request.user.is_authenticated:
+                me = queryset.filter(user=request.user).first()
+        else:
+            source = "live"
+            rows = self._live_rows(entries, time_period, branch_id, sub_branch_id)
+            if request.user.is_authenticated:
+                mine = live_leaderboard.user_entry(
+                    request.user.id, time_period, branch_id, sub_branch_id
+                )
+                if mine:
+                    me = self._live_rows([mine], time_period, branch_id, sub_branch_id)[0]
+
+        context = self.get_serializer_context()
+        return Response(
+            {
+                "source": source,
+                "results": LeaderBoardSerializer(rows, many=True, context=context).data,
+                "me": LeaderBoardSerializer(me, context=context).data if me else None,
+            }
+        )
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="around-me",
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def around_me(self, request):
+        """
+        GET /api/leaderboard/around-me/?branch=1&time_period=WEEKLY&sub_branch=2&n=5
+
+        The current user's entry with up to n entries above and below it,
+        read from the live sorted set (ZREVRANK + ZREVRANGE) or from the
+        (board, rank) index, so cost does not depend on the user's position.
+        """
+        params, error = self._board_params(request, "n", 5, 25)
+        if error:
+            return error
+        time_period, branch_id, sub_branch_id, n = params
+
+        entries = live_leaderboard.around(
+            request.user.id, time_period, branch_id, sub_branch_id, n
+        )
+        if entries is not None:
+            source = "live"
+            rows = self._live_rows(entries, time_period, branch_id, sub_branch_id)
+        else:
+            source = "database"
+            board = LeaderBoard.objects.filter(
+                time_period=time_period, branch_id=branch_id, sub_branch_id=sub_branch_id
+            )
+            me = board.filter(user=request.user).first()
+            rows = (
+                rank_window(board.select_related("user__profile"), "rank", me, n)
+                if me
+                else []
+            )
+
+        return Response(
+            {
+                "source": source,
+                "results": LeaderBoardSerializer(
+                    rows, many=True, context=self.get_serializer_context()
+                ).data,
+            }
+        )
+
+    @action(
+        detail=False, methods=["get"], permission_classes=[permissions.IsAuthenticated]
+    )
+    def history(self, request):
+        """
+        GET /api/leaderboard/history/?branch=1&time_period=WEEKLY&sub_branch=2&periods=12
+
+        The current user's rank per period, oldest first, read from
+        LeaderBoardSnapshot blobs (one row per period).
+        """
+        params, error = self._board_params(
+            request, "periods", 12, LeaderBoardSnapshot.HISTORY_PERIODS
+        )
+        if error:
+            return error
+        time_period, branch_id, sub_branch_id, periods = params
+
+        return Response(
+            {
+                "time_period": time_period,
+                "results": LeaderBoardSnapshot.trajectory(
+                    request.user.id, time_period, branch_id, sub_branch_id, periods
+                ),
+            }
+        )
+
 
 class RankingsView(APIView):
     """
@@ -110,10 +292,12 @@ class RankingsView(APIView):
     RANKING_TYPES = {
         "answers": {
             "order_field": "questions_answered",
+            "rank_field": "answers_rank",
             "label": "Most Questions Answered",
         },
         "contributions": {
             "order_field": "questions_contributed",
+            "rank_field": "contribution_rank",
             "label": "Top Contributors",
         },
     }
@@ -121,14 +305,19 @@ class RankingsView(APIView):
     def _serialize_entry(self, stat, rank, request):
         profile = getattr(stat.user, "profile", None)
         profile_picture = None
+        profile_picture_srcset = None
         if profile and profile.profile_picture:
             profile_picture = request.build_absolute_uri(
                 profile.profile_picture.url
             )
+            profile_picture_srcset = build_srcset(
+                profile.profile_picture, profile.profile_picture_variants, request
+            )
         return {
             "rank": rank,
             "user_name": profile.full_name if profile else stat.user.username,
             "profile_picture": profile_picture,
+            "profile_picture_srcset": profile_picture_srcset,
             "questions_answered": stat.questions_answered,
             "correct_answers": stat.correct_answers,
             "accuracy_percentage": round(stat.get_accuracy_percentage(), 1),
@@ -147,18 +336,26 @@ class RankingsView(APIView):
             )
 
         field = self.RANKING_TYPES[ranking_type]["order_field"]
+        rank_field = self.RANKING_TYPES[ranking_type]["rank_field"]
 
-        # Top 100 users with at least 1 in the ranking field
-        top_stats = (
-            UserStatistics.objects.filter(**{f"{field}__gt": 0})
-            .select_related("user", "user__profile")
-            .order_by(f"-{field}")[:100]
-        )
-
-        top_users = [
-            self._serialize_entry(stat, rank, request)
-            for rank, stat in enumerate(top_stats, 1)
-        ]
+        # Top 100 users with at least 1 in the ranking field, ordered by the
+        # precomputed rank (see src.services.rankings) and cached per rank
+        # generation
+        cache_key = rankings.top_cache_key(ranking_type, request.get_host())
+        top_users = cache.get(cache_key)
+        if top_users is None:
+            top_stats = (
+                UserStatistics.objects.filter(
+                    **{f"{field}__gt": 0, f"{rank_field}__isnull": False}
+                )
+                .select_related("user", "user__profile")
+                .order_by(rank_field)[:100]
+            )
+            top_users = [
+                self._serialize_entry(stat, getattr(stat, rank_field), request)
+                for stat in top_stats
+            ]
+            cache.set(cache_key, top_users, rankings.top_cache_timeout())
 
         # Current user's rank
         my_entry = None
@@ -167,12 +364,7 @@ class RankingsView(APIView):
                 my_stat = UserStatistics.objects.select_related(
                     "user", "user__profile"
                 ).get(user=request.user)
-                my_value = getattr(my_stat, field)
-                # Count how many users have a higher value
-                my_rank = (
-                    UserStatistics.objects.filter(**{f"{field}__gt": my_value}).count()
-                    + 1
-                )
+                my_rank = getattr(my_stat, rank_field)
                 my_entry = self._serialize_entry(my_stat, my_rank, request)
             except UserStatistics.DoesNotExist:
                 pass
@@ -185,3 +377,47 @@ class RankingsView(APIView):
                 "top_users": top_users,
             }
         )
+
+
+class RankingsAroundMeView(RankingsView):
+    """
+    GET /api/rankings/around-me/?type=answers&n=5
+
+    The current user's global ranking entry with up to n users ranked above
+    and below, read from the precomputed rank columns.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        ranking_type = request.query_params.get("type", "answers")
+        if ranking_type not in self.RANKING_TYPES:
+            return Response(
+                {"detail": f"Invalid type. Choose from: {', '.join(self.RANKING_TYPES)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            n = min(max(int(request.query_params.get("n", 5)), 1), 25)
+        except ValueError:
+            return Response(
+                {"detail": "n must be an integer."}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        field = self.RANKING_TYPES[ranking_type]["order_field"]
+        rank_field = self.RANKING_TYPES[ranking_type]["rank_field"]
+        ranked = UserStatistics.objects.filter(
+            **{f"{field}__gt": 0, f"{rank_field}__isnull": False}
+        ).select_related("user", "user__profile")
+
+        me = ranked.filter(user=request.user).first()
+        rows = rank_window(ranked, rank_field, me, n) if me else []
+        return Response(
+            {
+                "type": ranking_type,
+                "label": self.RANKING_TYPES[ranking_type]["label"],
+                "results": [
+                    self._serialize_entry(stat, getattr(stat, rank_field), request)
+                    for stat in rows
+                ],
+            }
+        )
@@ -1,7 +1,11 @@
+import asyncio
 import json
 
+from asgiref.sync import sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 
+from src.services import presence
+
 
 class NotificationConsumer(AsyncWebsocketConsumer):
     async def connect(self):
@@ -18,11 +22,24 @@ class NotificationConsumer(AsyncWebsocketConsumer):
 
         await self.accept()
 
+        # Advertise this socket so senders know the user is online
+        await sync_to_async(presence.touch)(self.user.id, self.channel_name)
+        self.heartbeat = asyncio.ensure_future(self.keep_alive())
+
     async def disconnect(self, close_code):
+        if hasattr(self, "heartbeat"):
+            self.heartbeat.cancel()
+            await sync_to_async(presence.leave)(self.user.id, self.channel_name)
+
         # Leave room group
         if hasattr(self, "group_name"):
             await self.channel_layer.group_discard(self.group_name, self.channel_name)
 
+    async def keep_alive(self):
+        while True:
+            await asyncio.sleep(presence.HEARTBEAT_INTERVAL)
+            await sync_to_async(presence.touch)(self.user.id, self.channel_name)
+
     # Receive message from room group
     async def send_notification(self, event):
         # Send message to WebSocket
@@ -34,3 +51,8 @@ class NotificationConsumer(AsyncWebsocketConsumer):
                 }
             )
         )
+
+    async def send_unread_count(self, event):
+        await self.send(
+            text_data=json.dumps({"type": "unread_count", "data": event["data"]})
+        )
@@ -0,0 +1,48 @@
+"""
+Management command to flag questions with weak distractors.
+Run nightly via Celery or cron.
+"""
+
+from django.core.management.base import BaseCommand
+
+from src.services.distractors import (
+    MIN_SELECTIONS,
+    flag_questions,
+    rebuild_selection_counts,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Flags questions whose distractors are never picked or beat the correct answer"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-selections",
+            type=int,
+            default=MIN_SELECTIONS,
+            help=f"Selections required before a question is judged (default: {MIN_SELECTIONS})",
+        )
+        parser.add_argument(
+            "--rebuild-counts",
+            action="store_true",
+            help="Recount Answer.selection_count from user answers first",
+        )
+
+    def handle(self, *args, **options):
+        if options["rebuild_counts"]:
+            self.stdout.write("Rebuilding answer selection counts...")
+            corrected = rebuild_selection_counts()
+            self.stdout.write(f"  - {corrected} answers corrected")
+
+        self.stdout.write("Analyzing distractors...")
+        summary = flag_questions(min_selections=options["min_selections"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Distractor analysis complete:\n"
+                f"  - Wrong option beats key: {summary['DISTRACTOR_BEATS_KEY']}\n"
+                f"  - Unused distractor: {summary['UNUSED_DISTRACTOR']}"
+            )
+        )
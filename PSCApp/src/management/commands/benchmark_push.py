@@ -0,0 +1,111 @@
+"""
+Management command to benchmark push throughput against a fake Expo service.
+Run before big broadcasts (e.g. exam announcements) to size push workers.
+"""
+
+import time
+
+import httpx
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand
+
+from src.services.fake_expo import FakeExpo
+from src.services.push import ExpoPushClient
+
+
+class Command(BaseCommand):
+    help = "Measures pushes/second for a broadcast to N synthetic users (never contacts exp.host)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--users", type=int, default=10000, help="Synthetic recipients"
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=None,
+            help="Batches in flight (default: EXPO_PUSH_CONCURRENCY)",
+        )
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=0.05,
+            help="Seconds the fake service takes per request",
+        )
+        parser.add_argument("--throttle-rate", type=float, default=0.0)
+        parser.add_argument("--error-rate", type=float, default=0.0)
+        parser.add_argument("--unregistered-rate", type=float, default=0.0)
+        parser.add_argument(
+            "--url",
+            default=None,
+            help="Base URL of an already running fake (e.g. FakeExpo served by an "
+            "ASGI server) instead of the in-process one",
+        )
+        parser.add_argument("--http2", action="store_true")
+
+    def handle(self, *args, **options):
+        users = options["users"]
+        fake = None
+        client_kwargs = {
+            "concurrency": options["concurrency"],
+            "http2": options["http2"],
+        }
+        if options["url"]:
+            client_kwargs["base_url"] = options["url"]
+        else:
+            fake = FakeExpo(
+                latency=options["latency"],
+                throttle_rate=options["throttle_rate"],
+                error_rate=options["error_rate"],
+                unregistered_rate=options["unregistered_rate"],
+            )
+            client_kwargs["base_url"] = "http://fake-expo/--/api/v2"
+            client_kwargs["transport"] = httpx.ASGITransport(app=fake)
+
+        messages = [
+            {
+                "to": f"ExponentPushToken[bench-{i}]",
+                "title": "Benchmark",
+                "body": "Synthetic broadcast",
+                "data": {"type": "GENERAL"},
+            }
+            for i in range(users)
+        ]
+
+        async def run():
+            async with ExpoPushClient(**client_kwargs) as client:
+                started = time.perf_counter()
+                tickets = await client.send(messages)
+                sent_at = time.perf_counter()
+                ids = [t["id"] for t in tickets if t.get("status") == "ok"]
+                receipts = await client.get_receipts(ids)
+                return (
+                    tickets,
+                    receipts,
+                    sent_at - started,
+                    time.perf_counter() - sent_at,
+                )
+
+        self.stdout.write(f"Pushing to {users} synthetic users...")
+        tickets, receipts, send_seconds, receipt_seconds = async_to_sync(run)()
+
+        ok = sum(1 for t in tickets if t.get("status") == "ok")
+        unregistered = sum(
+            1
+            for r in receipts.values()
+            if r.get("details", {}).get("error") == "DeviceNotRegistered"
+        )
+        lines = [
+            "Push benchmark complete:",
+            f"  - Messages: {len(tickets)} in {send_seconds:.2f}s "
+            f"({len(tickets) / send_seconds:.0f} pushes/s)",
+            f"  - Tickets ok: {ok}, errors: {len(tickets) - ok}",
+            f"  - Receipts: {len(receipts)} in {receipt_seconds:.2f}s "
+            f"({unregistered} DeviceNotRegistered)",
+        ]
+        if fake:
+            lines.append(
+                f"  - Fake Expo: {fake.stats['requests']} requests, "
+                f"{fake.stats['throttled']} throttled"
+            )
+        self.stdout.write(self.style.SUCCESS("\n".join(lines)))
@@ -0,0 +1,55 @@
+"""
+Management command to calibrate question difficulty from response data.
+Run nightly via Celery or cron.
+"""
+
+from django.core.management.base import BaseCommand
+
+from src.services.calibration import (
+    DEFAULT_CHUNK_SIZE,
+    MIN_ITEM_RESPONSES,
+    MIN_USER_RESPONSES,
+    calibrate,
+)
+
+
+class Command(BaseCommand):
+    help = "Fits a Rasch model to user answers and stores calibrated difficulty, discrimination and user ability"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f"Responses held in memory per pass (default: {DEFAULT_CHUNK_SIZE})",
+        )
+        parser.add_argument(
+            "--min-item-responses",
+            type=int,
+            default=MIN_ITEM_RESPONSES,
+            help="Responses required before a question is calibrated",
+        )
+        parser.add_argument(
+            "--min-user-responses",
+            type=int,
+            default=MIN_USER_RESPONSES,
+            help="Responses required before a user gets an ability estimate",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Calibrating question difficulty...")
+
+        summary = calibrate(
+            chunk_size=options["chunk_size"],
+            min_item_responses=options["min_item_responses"],
+            min_user_responses=options["min_user_responses"],
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Calibration complete:\n"
+                f"  - Responses: {summary['responses']}\n"
+                f"  - Questions calibrated: {summary['questions']}\n"
+                f"  - Users estimated: {summary['users']}"
+            )
+        )
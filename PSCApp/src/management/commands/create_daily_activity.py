@@ -34,7 +34,7 @@ class Command(BaseCommand):
                 )
                 return
         else:
-            target_date = timezone.now().date()
+            target_date = timezone.localdate()
 
         self.stdout.write(f"Recording daily activity for {target_date}...")
 
@@ -6,6 +6,7 @@ Run weekly via Celery or cron.
 from django.core.management.base import BaseCommand
 
 from src.models import Branch, LeaderBoard
+from src.services import leaderboard as live_leaderboard
 
 
 class Command(BaseCommand):
@@ -27,6 +28,15 @@ class Command(BaseCommand):
         )
 
     def handle(self, *args, **options):
+        if live_leaderboard.is_enabled():
+            self.stdout.write(
+                self.style.WARNING(
+                    "Live leaderboards are enabled (REDIS_URL); use "
+                    "sync_live_leaderboards --rebuild instead."
+                )
+            )
+            return
+
         period = options["period"]
         branch_id = options["branch"]
 
@@ -49,18 +59,17 @@ class Command(BaseCommand):
         total_recalculated = 0
 
         for branch in branches:
-            for time_period in periods:
-                self.stdout.write(
-                    f"Recalculating {time_period} leaderboard for {branch.name_en}..."
-                )
-                LeaderBoard.recalculate_rankings(time_period, branch=branch)
-                total_recalculated += 1
+            self.stdout.write(
+                f"Recalculating {', '.join(periods)} leaderboards for {branch.name_en}..."
+            )
+            boards = LeaderBoard.recalculate_branch(branch.id, periods)
+            total_recalculated += boards
 
-                # Count entries
-                count = LeaderBoard.objects.filter(
-                    time_period=time_period, branch=branch
-                ).count()
-                self.stdout.write(f"  - {count} entries created/updated")
+            # Count entries
+            count = LeaderBoard.objects.filter(
+                time_period__in=periods, branch=branch
+            ).count()
+            self.stdout.write(f"  - {boards} boards, {count} entries created/updated")
 
         self.stdout.write(
             self.style.SUCCESS(
@@ -0,0 +1,19 @@
+"""
+Management command to recompute global user ranks.
+Runs every 15 minutes via Celery or cron.
+"""
+
+from django.core.management.base import BaseCommand
+
+from src.services.rankings import refresh_global_ranks
+
+
+class Command(BaseCommand):
+    help = "Recomputes answers, contribution and accuracy ranks on user statistics"
+
+    def handle(self, *args, **options):
+        self.stdout.write("Refreshing global ranks...")
+        updated = refresh_global_ranks()
+        self.stdout.write(
+            self.style.SUCCESS(f"Global ranks refreshed: {updated} users updated.")
+        )
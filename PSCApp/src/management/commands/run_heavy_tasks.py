@@ -4,6 +4,7 @@ from django.utils import timezone
 from src.models.analytics import DailyActivity, LeaderBoard
 from src.models.branch import Branch
 from src.models.platform_stats import PlatformStats
+from src.services import leaderboard as live_leaderboard
 
 
 class Command(BaseCommand):
@@ -50,7 +51,7 @@ class Command(BaseCommand):
     def run_stats_tasks(self):
         self.stdout.write("Refreshing Platform Stats...")
         try:
-            PlatformStats.scheduled_update()
+            PlatformStats.reconcile()
             self.stdout.write(self.style.SUCCESS("Platform stats refreshed"))
         except Exception as e:
             self.stdout.write(
@@ -67,21 +68,20 @@ class Command(BaseCommand):
     def run_rankings_tasks(self):
         self.stdout.write("Recalculating Rankings...")
 
-        # We need to iterate over branches for accurate leaderboards
+        # Live boards own the LeaderBoard table; just persist them
+        if live_leaderboard.is_enabled():
+            count = live_leaderboard.sync_to_database()
+            self.stdout.write(self.style.SUCCESS(f"Synced {count} live leaderboards"))
+            return
+
+        # One pass per branch covers every period and sub-branch board
         branches = Branch.objects.filter(is_active=True)
-        periods = [
-            "WEEKLY",
-            "MONTHLY",
-        ]  # ALL_TIME might be too heavy or run less frequently
 
         for branch in branches:
-            for period in periods:
-                self.stdout.write(f"Processing {period} for {branch.name_en}...")
-                try:
-                    LeaderBoard.recalculate_rankings(time_period=period, branch=branch)
-                except Exception as e:
-                    self.stdout.write(
-                        self.style.ERROR(f"Error for {branch.name_en} {period}: {e}")
-                    )
+            self.stdout.write(f"Processing {branch.name_en}...")
+            try:
+                LeaderBoard.recalculate_branch(branch.id)
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f"Error for {branch.name_en}: {e}"))
 
         self.stdout.write(self.style.SUCCESS("Rankings recalculation complete"))
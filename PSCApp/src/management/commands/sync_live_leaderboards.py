@@ -0,0 +1,36 @@
+"""
+Management command to persist live (Redis) leaderboards to the database.
+Runs every few minutes via Celery; use --rebuild to re-seed Redis first.
+"""
+
+from django.core.management.base import BaseCommand
+
+from src.services import leaderboard as live_leaderboard
+
+
+class Command(BaseCommand):
+    help = "Writes the Redis live leaderboards to the LeaderBoard table"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Re-seed the current live boards from completed attempts first",
+        )
+
+    def handle(self, *args, **options):
+        if not live_leaderboard.is_enabled():
+            self.stdout.write(
+                self.style.WARNING(
+                    "Redis is not configured (REDIS_URL); nothing to sync."
+                )
+            )
+            return
+
+        if options["rebuild"]:
+            self.stdout.write("Rebuilding live leaderboards from the database...")
+            loaded = live_leaderboard.rebuild_from_database()
+            self.stdout.write(f"  - {loaded} user entries loaded")
+
+        count = live_leaderboard.sync_to_database()
+        self.stdout.write(self.style.SUCCESS(f"Synced {count} live leaderboards."))
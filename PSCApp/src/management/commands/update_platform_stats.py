@@ -1,6 +1,6 @@
 """
 Management command to update platform statistics.
-Run hourly via Celery or cron.
+Run hourly via Celery or cron; --reconcile recounts every counter.
 """
 
 from django.core.management.base import BaseCommand
@@ -11,10 +11,20 @@ from src.models import PlatformStats
 class Command(BaseCommand):
     help = "Updates platform-wide statistics counters"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reconcile",
+            action="store_true",
+            help="Recount the all-time counters from the source tables",
+        )
+
     def handle(self, *args, **options):
         self.stdout.write("Updating platform statistics...")
 
-        PlatformStats.scheduled_update()
+        if options["reconcile"]:
+            PlatformStats.reconcile()
+        else:
+            PlatformStats.scheduled_update()
 
         stats = PlatformStats.objects.first()
         if stats:
@@ -0,0 +1,23 @@
+"""
+Project middleware.
+"""
+
+from src.services import activity
+
+
+class ActivityMiddleware:
+    """
+    Count authenticated requests towards daily active users (see
+    src.services.activity). Runs after the response so DRF's JWT
+    authentication has already set request.user.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            activity.record_once(user)
+        return response
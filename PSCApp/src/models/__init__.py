@@ -1,9 +1,22 @@
-from .analytics import Contribution, DailyActivity, LeaderBoard
+from .analytics import (
+    ActivityRollup,
+    CohortSummary,
+    Contribution,
+    DailyActivity,
+    LeaderBoard,
+    LeaderBoardSnapshot,
+)
 from .app_settings import AppSettings
 from .attempt_answer import UserAnswer, UserAttempt
 from .branch import Branch, Category, SubBranch
 from .mocktest import MockTest, MockTestQuestion
-from .notification import Notification
+from .notification import (
+    Notification,
+    NotificationArchive,
+    NotificationCampaign,
+    NotificationOutbox,
+    PushTicket,
+)
 from .note import Note
 from .platform_stats import PlatformStats
 from .question_answer import Answer, Question, QuestionReport
@@ -12,9 +25,12 @@ from .user import UserProfile
 from .user_stats import StudyCollection, UserProgress, UserStatistics
 
 __all__ = [
+    "ActivityRollup",
+    "CohortSummary",
     "Contribution",
     "DailyActivity",
     "LeaderBoard",
+    "LeaderBoardSnapshot",
     "AppSettings",
     "UserAnswer",
     "UserAttempt",
@@ -24,6 +40,10 @@ __all__ = [
     "MockTest",
     "MockTestQuestion",
     "Notification",
+    "NotificationArchive",
+    "NotificationCampaign",
+    "NotificationOutbox",
+    "PushTicket",
     "Note",
     "PlatformStats",
     "Answer",
@@ -1,5 +1,7 @@
-from datetime import timedelta
+from datetime import datetime, time, timedelta
+from decimal import Decimal
 
+import numpy as np
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.db.models import Count
@@ -144,18 +146,66 @@ class DailyActivity(models.Model):
             date__range=[start_date, end_date]
         ).order_by("date")
 
+    # Longest ranges served from daily rows and from weekly rollups; anything
+    # longer reads monthly rollups, so a chart is at most a few hundred rows
+    DAILY_TREND_MAX_DAYS = 92
+    WEEKLY_TREND_MAX_DAYS = 731
+
     @staticmethod
-    def get_trend_data(last_n_days=7):
-        # Simplified to return last N days instead of aggregation logic
+    def trend_resolution(days):
+        if days <= DailyActivity.DAILY_TREND_MAX_DAYS:
+            return "DAY"
+        if days <= DailyActivity.WEEKLY_TREND_MAX_DAYS:
+            return "WEEK"
+        return "MONTH"
 
-        end_date = timezone.now().date()
-        start_date = end_date - timedelta(days=last_n_days)
-        return DailyActivity.get_activity_range(start_date, end_date)
+    @staticmethod
+    def get_trend_data(last_n_days=7, end_date=None):
+        """
+        Activity over the last ``last_n_days`` days (ending today) at a
+        resolution picked from the range: daily rows, or weekly / monthly
+        ActivityRollup rows for longer ranges. Periods with no data are
+        filled with zeros. For rollups, ``active_users`` is the average
+        daily active users in the period.
+        """
+        end_date = end_date or timezone.localdate()
+        start_date = end_date - timedelta(days=last_n_days - 1)
+        resolution = DailyActivity.trend_resolution(last_n_days)
+
+        if resolution == "DAY":
+            starts = []
+            day = start_date
+            while day <= end_date:
+                starts.append(day)
+                day += timedelta(days=1)
+            rows = DailyActivity.get_activity_range(start_date, end_date).values(
+                "date", *DailyActivity.METRIC_FIELDS
+            )
+            found = {row.pop("date"): row for row in rows}
+        else:
+            starts = ActivityRollup.period_starts(resolution, start_date, end_date)
+            rows = ActivityRollup.objects.filter(
+                period=resolution, period_start__range=[starts[0], starts[-1]]
+            ).values("period_start", *DailyActivity.METRIC_FIELDS)
+            found = {row.pop("period_start"): row for row in rows}
+
+        empty = dict.fromkeys(DailyActivity.METRIC_FIELDS, 0)
+        return {
+            "resolution": resolution,
+            "start_date": start_date,
+            "end_date": end_date,
+            "points": [
+                {"period_start": start, **found.get(start, empty)} for start in starts
+            ],
+        }
 
     @staticmethod
     def record_today_activity():
-        today = timezone.now().date()
-        date_start = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        from src.services import activity as activity_log
+
+        # Local day, bounded by local midnights as in rebuild()
+        today = timezone.localdate()
+        date_start = timezone.make_aware(datetime.combine(today, time.min))
 
         # Create or update record for today
         activity, created = DailyActivity.objects.get_or_create(date=today)
@@ -178,12 +228,212 @@ class DailyActivity(models.Model):
             created_at__gte=date_start
         ).count()
 
-        # Active users approximation (users who logged in today)
-        activity.active_users = CustomUser.objects.filter(
-            last_login__gte=date_start
-        ).count()
+        # Unique users seen today (HyperLogLog); without Redis, fall back to
+        # users who logged in today
+        active_users = activity_log.unique_users(today)
+        if active_users is None:
+            active_users = CustomUser.objects.filter(
+                last_login__gte=date_start
+            ).count()
+        activity.active_users = active_users
 
         activity.save()
+        ActivityRollup.refresh(today, today)
+
+    # Metrics that rebuild() computes, in model field order
+    METRIC_FIELDS = (
+        "new_users",
+        "questions_added",
+        "questions_approved",
+        "mock_tests_taken",
+        "total_answers_submitted",
+        "active_users",
+    )
+
+    @classmethod
+    def rebuild(cls, start_date, end_date):
+        """
+        Recompute every metric for each local date in [start_date, end_date]
+        with one date-truncated GROUP BY per source table, and upsert a row
+        per date (zero rows included, so trends have no gaps). Active users
+        are the larger of the day's activity sketch (when Redis still holds
+        it) and the distinct users who started an attempt. Returns the
+        number of rows written.
+        """
+        from django.db.models.functions import TruncDate
+
+        from src.services import activity as activity_log
+
+        tz = timezone.get_current_timezone()
+        window_start = timezone.make_aware(datetime.combine(start_date, time.min), tz)
+        window_end = timezone.make_aware(
+            datetime.combine(end_date + timedelta(days=1), time.min), tz
+        )
+
+        def per_day(queryset, field, metric=None):
+            return dict(
+                queryset.filter(
+                    **{f"{field}__gte": window_start, f"{field}__lt": window_end}
+                )
+                .annotate(day=TruncDate(field, tzinfo=tz))
+                .values("day")
+                .annotate(n=metric or Count("id"))
+                .values_list("day", "n")
+                .order_by()
+            )
+
+        metrics = {
+            "new_users": per_day(CustomUser.objects, "date_joined"),
+            "questions_added": per_day(Question.objects, "created_at"),
+            "questions_approved": per_day(
+                Question.objects.filter(status="PUBLIC"), "updated_at"
+            ),
+            "mock_tests_taken": per_day(UserAttempt.objects, "start_time"),
+            "total_answers_submitted": per_day(UserAnswer.objects, "created_at"),
+            "active_users": per_day(
+                UserAttempt.objects, "start_time", Count("user", distinct=True)
+            ),
+        }
+
+        rows = []
+        day = start_date
+        while day <= end_date:
+            row = cls(
+                date=day,
+                **{field: metrics[field].get(day, 0) for field in cls.METRIC_FIELDS},
+            )
+            row.active_users = max(
+                row.active_users, activity_log.unique_users(day) or 0
+            )
+            rows.append(row)
+            day += timedelta(days=1)
+
+        cls.objects.bulk_create(
+            rows,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["date"],
+            update_fields=list(cls.METRIC_FIELDS),
+        )
+        ActivityRollup.refresh(start_date, end_date)
+        return len(rows)
+
+
+class ActivityRollup(models.Model):
+    """
+    DailyActivity summed per week (starting Monday) or calendar month, for
+    long-range trend charts. Kept current by refresh() whenever daily rows
+    are written, so a year of activity is 53 weekly or 12 monthly rows.
+    """
+
+    PERIOD_CHOICES = [
+        ("WEEK", "Weekly"),
+        ("MONTH", "Monthly"),
+    ]
+    # Summed over the period's days
+    SUM_FIELDS = (
+        "new_users",
+        "questions_added",
+        "questions_approved",
+        "mock_tests_taken",
+        "total_answers_submitted",
+    )
+
+    period = models.CharField(max_length=10, choices=PERIOD_CHOICES)
+    period_start = models.DateField(help_text="Monday or first day of the month")
+    days = models.IntegerField(default=0, help_text="Daily rows in the period")
+    new_users = models.IntegerField(default=0)
+    questions_added = models.IntegerField(default=0)
+    questions_approved = models.IntegerField(default=0)
+    mock_tests_taken = models.IntegerField(default=0)
+    total_answers_submitted = models.IntegerField(default=0)
+    active_users = models.IntegerField(
+        default=0, help_text="Average daily active users"
+    )
+    peak_active_users = models.IntegerField(
+        default=0, help_text="Highest daily active users"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "activity_rollups"
+        verbose_name = "Activity Rollup"
+        verbose_name_plural = "Activity Rollups"
+        ordering = ["period", "-period_start"]
+        unique_together = [["period", "period_start"]]
+
+    def __str__(self):
+        return f"{self.get_period_display()} activity from {self.period_start}"
+
+    @staticmethod
+    def period_start_of(period, day):
+        if period == "WEEK":
+            return day - timedelta(days=day.weekday())
+        return day.replace(day=1)
+
+    @staticmethod
+    def next_period_start(period, start):
+        if period == "WEEK":
+            return start + timedelta(days=7)
+        return (start + timedelta(days=32)).replace(day=1)
+
+    @classmethod
+    def period_starts(cls, period, start_date, end_date):
+        """Starts of every ``period`` overlapping [start_date, end_date]."""
+        starts = [cls.period_start_of(period, start_date)]
+        while (nxt := cls.next_period_start(period, starts[-1])) <= end_date:
+            starts.append(nxt)
+        return starts
+
+    @classmethod
+    def refresh(cls, start_date, end_date):
+        """
+        Recompute the weekly and monthly rollups of every period overlapping
+        [start_date, end_date] from their daily rows, with one GROUP BY per
+        period type.
+        """
+        from django.db.models import Avg, Max, Sum
+        from django.db.models.functions import TruncMonth, TruncWeek
+
+        trunc = {"WEEK": TruncWeek, "MONTH": TruncMonth}
+        for period, func in trunc.items():
+            starts = cls.period_starts(period, start_date, end_date)
+            window_end = cls.next_period_start(period, starts[-1])
+            totals = (
+                DailyActivity.objects.filter(date__gte=starts[0], date__lt=window_end)
+                .annotate(start=func("date", output_field=models.DateField()))
+                .values("start")
+                .annotate(
+                    days=Count("id"),
+                    avg_active=Avg("active_users"),
+                    peak_active=Max("active_users"),
+                    **{field: Sum(field) for field in cls.SUM_FIELDS},
+                )
+                .order_by()
+            )
+            rows = [
+                cls(
+                    period=period,
+                    period_start=row["start"],
+                    days=row["days"],
+                    active_users=round(row["avg_active"] or 0),
+                    peak_active_users=row["peak_active"] or 0,
+                    **{field: row[field] or 0 for field in cls.SUM_FIELDS},
+                )
+                for row in totals
+            ]
+            cls.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=["period", "period_start"],
+                update_fields=[
+                    "days",
+                    "active_users",
+                    "peak_active_users",
+                    *cls.SUM_FIELDS,
+                    "updated_at",
+                ],
+            )
 
 
 class LeaderBoard(models.Model):
@@ -230,6 +480,8 @@ class LeaderBoard(models.Model):
     )
     last_updated = models.DateTimeField(auto_now=True)
 
+    BOARD_FIELDS = ("rank", "total_score", "tests_completed", "accuracy_percentage")
+
     class Meta:
         db_table = "leaderboards"
         verbose_name = "LeaderBoard Entry"
@@ -238,6 +490,7 @@ class LeaderBoard(models.Model):
         ordering = ["time_period", "branch", "rank"]
         indexes = [
             models.Index(fields=["time_period", "branch", "rank"]),
+            models.Index(fields=["time_period", "branch", "sub_branch", "rank"]),
             models.Index(fields=["user", "time_period"]),
         ]
 
@@ -265,94 +518,191 @@ class LeaderBoard(models.Model):
         item.save(update_fields=["total_score", "tests_completed"])
 
     @staticmethod
-    def recalculate_rankings(time_period, branch=None, sub_branch=None):
-        from django.db.models import Avg, Count, Sum
+    def period_start(time_period, when=None):
+        """
+        Start of the calendar week / month containing ``when`` (None for
+        ALL_TIME). Shared with the live Redis boards so both paths rank the
+        same attempts.
+        """
+        from src.services.leaderboard import period_start
 
-        from src.models.attempt_answer import UserAttempt
+        return period_start(time_period, when)
 
-        # 1. Determine Date Range
-        end_date = timezone.now()
-        start_date = None
+    def _matches(self, values):
+        cents = Decimal("0.01")
+        for key, value in values.items():
+            if key in ("total_score", "accuracy_percentage"):
+                value = Decimal(str(value)).quantize(cents)
+            if getattr(self, key) != value:
+                return False
+        return True
 
-        if time_period == "WEEKLY":
-            start_date = end_date - timedelta(days=7)
-        elif time_period == "MONTHLY":
-            start_date = end_date - timedelta(days=30)
-        # ALL_TIME implies no start_date (None)
+    @classmethod
+    def replace_board(cls, time_period, branch_id, sub_branch_id, entries):
+        """
+        Make the stored rows for one board match ``entries`` (dicts with
+        user_id, rank, total_score, tests_completed, accuracy_percentage),
+        updating changed rows in place, creating new ones and deleting users
+        that dropped off. previous_rank is the user's rank in the previous
+        period's snapshot, so it only moves when the period rolls over.
+        Unchanged boards cost two reads and no writes.
+        """
+        from django.db import transaction
+
+        board = {
+            "time_period": time_period,
+            "branch_id": branch_id,
+            "sub_branch_id": sub_branch_id,
+        }
+        existing = {row.user_id: row for row in cls.objects.filter(**board)}
+        new_user_ids = set(
+            CustomUser.objects.filter(
+                id__in=[e["user_id"] for e in entries if e["user_id"] not in existing]
+            ).values_list("id", flat=True)
+        )
+        previous = LeaderBoardSnapshot.previous_ranks(
+            time_period, branch_id, sub_branch_id, [e["user_id"] for e in entries]
+        )
 
-        # 2. Fetch current rankings to cache previous rank
-        params = {"time_period": time_period}
-        if branch:
-            params["branch"] = branch
-        if sub_branch:
-            params["sub_branch"] = sub_branch
-
-        old_entries = LeaderBoard.objects.filter(**params)
-        previous_ranks = {entry.user_id: entry.rank for entry in old_entries}
-
-        # Clear old entries for this specific period/context
-        old_entries.delete()
-
-        # 3. Aggregation
-        # Filter attempts — exclude attempts with zero answered questions
-        attempts = UserAttempt.objects.filter(
-            status="COMPLETED",
-            user_answers__is_skipped=False,
-        ).distinct()
-        if start_date:
-            attempts = attempts.filter(start_time__gte=start_date)
-
-        # Filter by branch via MockTest relation
-        # Note: Attempts filter by MockTest which is related to Branch
-        if branch:
-            attempts = attempts.filter(mock_test__branch=branch)
-        if sub_branch:
-            attempts = attempts.filter(mock_test__sub_branch=sub_branch)
-
-        # Group by user and annotate
-        user_scores = (
-            attempts.values("user")
-            .annotate(
-                total_score=Sum("score_obtained"),
-                tests_completed=Count("id"),
-                avg_accuracy=Avg("percentage"),
+        now = timezone.now()
+        to_update = []
+        to_create = []
+        for entry in entries:
+            values = {key: entry[key] for key in cls.BOARD_FIELDS}
+            values["previous_rank"] = previous.get(entry["user_id"])
+            row = existing.pop(entry["user_id"], None)
+            if row is None:
+                if entry["user_id"] not in new_user_ids:
+                    continue  # user deleted since the entry was computed
+                to_create.append(cls(user_id=entry["user_id"], **board, **values))
+                continue
+            if row._matches(values):
+                continue
+            for key, value in values.items():
+                setattr(row, key, value)
+            row.last_updated = now
+            to_update.append(row)
+
+        changed = bool(to_update or to_create or existing)
+        with transaction.atomic():
+            cls.objects.bulk_update(
+                to_update,
+                ["previous_rank", "last_updated", *cls.BOARD_FIELDS],
+                batch_size=1000,
             )
-            .order_by("-total_score", "-avg_accuracy")
+            cls.objects.bulk_create(to_create, batch_size=1000)
+            if existing:
+                cls.objects.filter(id__in=[row.id for row in existing.values()]).delete()
+            if changed or not LeaderBoardSnapshot.objects.filter(
+                **board, period_start=LeaderBoardSnapshot.period_key(time_period)
+            ).exists():
+                LeaderBoardSnapshot.record(time_period, branch_id, sub_branch_id, entries)
+
+    @staticmethod
+    def _ranked_attempts():
+        """
+        Completed attempts with at least one answered question, annotated
+        with ``finished_at`` (end time, falling back to start time), which
+        places them in a week / month.
+        """
+        from django.db.models import Exists, OuterRef
+        from django.db.models.functions import Coalesce
+
+        answered = UserAnswer.objects.filter(
+            user_attempt=OuterRef("pk"), is_skipped=False
         )
+        return UserAttempt.objects.filter(
+            Exists(answered), status="COMPLETED"
+        ).annotate(finished_at=Coalesce("end_time", "start_time"))
 
-        # 4. Bulk Create
-        new_entries = []
-        current_rank = 1
-
-        # We need a branch instance for the foreign key.
-        # If branch is None (e.g. Universal leaderboard not yet supported by schema fully, checking logic),
-        # schema says branch is mandatory. So we fallback or raise error.
-        # Assuming recalculate is called WITH a branch context as per schema constraint.
-        if not branch:
-            # If branch is None, we can't create LeaderBoard entries easily due to NOT NULL constraints
-            # unless we pick a default or loop through all branches.
-            # Ideally this method is called per branch.
-            return
-
-        for data in user_scores:
-            user_id = data["user"]
-            prev = previous_ranks.get(user_id)
-
-            entry = LeaderBoard(
-                user_id=user_id,
-                time_period=time_period,
-                branch=branch,
-                sub_branch=sub_branch,
-                rank=current_rank,
-                previous_rank=prev,
-                total_score=data["total_score"] or 0,
-                tests_completed=data["tests_completed"] or 0,
-                accuracy_percentage=data["avg_accuracy"] or 0,
+    @staticmethod
+    def _rank_totals(totals):
+        """
+        {user_id: [score, tests, percentage_sum]} -> board entries ranked by
+        score then accuracy with RANK() semantics: equal (score, accuracy)
+        share a rank. Ties compare the exact average; it is only rounded
+        for storage.
+        """
+        rows = sorted(
+            (
+                (user_id, score, tests, Decimal(percentage_sum) / tests)
+                for user_id, (score, tests, percentage_sum) in totals.items()
+            ),
+            key=lambda row: (-row[1], -row[3]),
+        )
+        entries = []
+        rank = previous = None
+        for position, (user_id, score, tests, accuracy) in enumerate(rows, 1):
+            if (score, accuracy) != previous:
+                rank, previous = position, (score, accuracy)
+            entries.append(
+                {
+                    "user_id": user_id,
+                    "rank": rank,
+                    "total_score": score,
+                    "tests_completed": tests,
+                    "accuracy_percentage": round(accuracy, 2),
+                }
             )
-            new_entries.append(entry)
-            current_rank += 1
+        return entries
 
-        LeaderBoard.objects.bulk_create(new_entries)
+    @classmethod
+    def recalculate_branch(cls, branch_id, periods=None):
+        """
+        Recompute every board of one branch (branch-wide and per sub-branch,
+        for each period) from a single grouped pass over its attempts, with
+        one conditional aggregate per period; each board is then upserted
+        in one transaction (see replace_board), so readers never see an
+        empty or partial board. Boards that no longer have any entries are
+        emptied. Returns the number of boards written.
+        """
+        from collections import defaultdict
+
+        from django.db.models import Q, Sum
+
+        periods = periods or [period for period, _ in cls.TIME_PERIOD_CHOICES]
+        starts = {period: cls.period_start(period) for period in periods}
+
+        aggregates = {}
+        for period in periods:
+            start = starts[period]
+            condition = Q(finished_at__gte=start) if start else None
+            aggregates[f"{period}_score"] = Sum("score_obtained", filter=condition)
+            aggregates[f"{period}_tests"] = Count("id", filter=condition)
+            aggregates[f"{period}_pct"] = Sum("percentage", filter=condition)
+
+        attempts = cls._ranked_attempts().filter(mock_test__branch_id=branch_id)
+        if all(starts.values()):
+            attempts = attempts.filter(finished_at__gte=min(starts.values()))
+
+        rows = (
+            attempts.values("user_id", "mock_test__sub_branch_id")
+            .annotate(**aggregates)
+            .order_by()
+        )
+
+        # (period, sub_branch_id or None) -> user_id -> [score, tests, pct_sum]
+        boards = defaultdict(lambda: defaultdict(lambda: [Decimal(0), 0, Decimal(0)]))
+        for row in rows.iterator(chunk_size=5000):
+            for period in periods:
+                tests = row[f"{period}_tests"]
+                if not tests:
+                    continue
+                for sub_branch_id in {None, row["mock_test__sub_branch_id"]}:
+                    totals = boards[(period, sub_branch_id)][row["user_id"]]
+                    totals[0] += row[f"{period}_score"] or 0
+                    totals[1] += tests
+                    totals[2] += row[f"{period}_pct"] or 0
+
+        stored = set(
+            cls.objects.filter(branch_id=branch_id, time_period__in=periods)
+            .values_list("time_period", "sub_branch_id")
+            .distinct()
+        )
+        for period, sub_branch_id in stored | set(boards):
+            entries = cls._rank_totals(boards.get((period, sub_branch_id), {}))
+            cls.replace_board(period, branch_id, sub_branch_id, entries)
+        return len(stored | set(boards))
 
     def get_rank_change(self):
         if self.previous_rank is None:
@@ -367,3 +717,217 @@ class LeaderBoard(models.Model):
         if branch:
             qs = qs.filter(branch=branch)
         return qs.order_by("rank")[:limit]
+
+
+class LeaderBoardSnapshot(models.Model):
+    """
+    One board's standings for one period, packed into a single blob.
+    Written whenever the board changes (the latest write in a period wins),
+    so rank history survives leaderboard cleanup; the last snapshot of a
+    period supplies the next period's previous_rank.
+    """
+
+    # Periods of history kept per board (the most the history API returns)
+    HISTORY_PERIODS = 52
+
+    # Sorted by user so a user's row is found with a binary search
+    ENTRY_DTYPE = np.dtype([("user", "<i4"), ("rank", "<i4"), ("score", "<f4")])
+
+    time_period = models.CharField(
+        max_length=20, choices=LeaderBoard.TIME_PERIOD_CHOICES
+    )
+    branch = models.ForeignKey(
+        "Branch", on_delete=models.CASCADE, related_name="leaderboard_snapshots"
+    )
+    sub_branch = models.ForeignKey(
+        "SubBranch",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="leaderboard_snapshots",
+    )
+    period_start = models.DateField(
+        help_text="First day of the week / month; the snapshot day for ALL_TIME"
+    )
+    entry_count = models.IntegerField(default=0)
+    entries = models.BinaryField(help_text="Packed (user_id, rank, score) records")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "leaderboard_snapshots"
+        verbose_name = "LeaderBoard Snapshot"
+        verbose_name_plural = "LeaderBoard Snapshots"
+        constraints = [
+            # NULLs never conflict, so branch-wide boards (no sub_branch)
+            # get their own partial constraint; record() relies on both
+            models.UniqueConstraint(
+                fields=["time_period", "branch", "sub_branch", "period_start"],
+                condition=models.Q(sub_branch__isnull=False),
+                name="leaderboard_snapshot_sub_branch_period",
+            ),
+            models.UniqueConstraint(
+                fields=["time_period", "branch", "period_start"],
+                condition=models.Q(sub_branch__isnull=True),
+                name="leaderboard_snapshot_branch_period",
+            ),
+        ]
+        ordering = ["-period_start"]
+        indexes = [
+            models.Index(
+                fields=["time_period", "branch", "sub_branch", "-period_start"]
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_time_period_display()} {self.period_start} ({self.entry_count} users)"
+
+    @staticmethod
+    def period_key(time_period, when=None):
+        when = timezone.localtime(when) if when else timezone.localtime()
+        start = LeaderBoard.period_start(time_period, when)
+        return (start or when).date()
+
+    @classmethod
+    def pack(cls, entries):
+        records = np.empty(len(entries), dtype=cls.ENTRY_DTYPE)
+        records["user"] = [entry["user_id"] for entry in entries]
+        records["rank"] = [entry["rank"] for entry in entries]
+        records["score"] = [float(entry["total_score"]) for entry in entries]
+        records.sort(order="user")
+        return records.tobytes()
+
+    def unpack(self):
+        return np.frombuffer(bytes(self.entries), dtype=self.ENTRY_DTYPE)
+
+    def ranks_of(self, user_ids):
+        """{user_id: rank} for those of ``user_ids`` in this snapshot."""
+        records = self.unpack()
+        ids = np.asarray(user_ids, dtype=np.int64)
+        pos = np.searchsorted(records["user"], ids)
+        found = pos < len(records)
+        found[found] = records["user"][pos[found]] == ids[found]
+        return dict(zip(ids[found].tolist(), records["rank"][pos[found]].tolist()))
+
+    @classmethod
+    def previous_ranks(cls, time_period, branch_id, sub_branch_id, user_ids):
+        """
+        Ranks from the latest snapshot before the current period (the
+        previous week / month; the previous day for ALL_TIME), or {}.
+        """
+        snapshot = (
+            cls.objects.filter(
+                time_period=time_period,
+                branch_id=branch_id,
+                sub_branch_id=sub_branch_id,
+                period_start__lt=cls.period_key(time_period),
+            )
+            .order_by("-period_start")
+            .first()
+        )
+        return snapshot.ranks_of(user_ids) if snapshot else {}
+
+    def lookup(self, user_id):
+        """(rank, score) of ``user_id`` in this snapshot, or None."""
+        records = self.unpack()
+        index = np.searchsorted(records["user"], user_id)
+        if index >= len(records) or records["user"][index] != user_id:
+            return None
+        return int(records["rank"][index]), round(float(records["score"][index]), 2)
+
+    @classmethod
+    def record(cls, time_period, branch_id, sub_branch_id, entries, when=None):
+        """
+        Upsert the board's snapshot for the current period. A concurrent
+        insert of the same snapshot surfaces as an IntegrityError, which
+        update_or_create resolves by updating the row that won.
+        """
+        cls.objects.update_or_create(
+            time_period=time_period,
+            branch_id=branch_id,
+            sub_branch_id=sub_branch_id,
+            period_start=cls.period_key(time_period, when),
+            defaults={"entry_count": len(entries), "entries": cls.pack(entries)},
+        )
+
+    @classmethod
+    def prune(cls):
+        """
+        Delete snapshots older than the last HISTORY_PERIODS periods of
+        their board (weeks, months, or days for ALL_TIME). Returns how many.
+        """
+        weekly = cls.period_key("WEEKLY") - timedelta(weeks=cls.HISTORY_PERIODS)
+        month = cls.period_key("MONTHLY")
+        months = month.year * 12 + month.month - 1 - cls.HISTORY_PERIODS
+        monthly = month.replace(year=months // 12, month=months % 12 + 1)
+        daily = cls.period_key("ALL_TIME") - timedelta(days=cls.HISTORY_PERIODS)
+
+        deleted, _ = cls.objects.filter(
+            models.Q(time_period="WEEKLY", period_start__lt=weekly)
+            | models.Q(time_period="MONTHLY", period_start__lt=monthly)
+            | models.Q(time_period="ALL_TIME", period_start__lt=daily)
+        ).delete()
+        return deleted
+
+    @classmethod
+    def trajectory(cls, user_id, time_period, branch_id, sub_branch_id=None, periods=12):
+        """
+        The user's rank over the last ``periods`` snapshots, oldest first.
+        Reads one blob per period; rank is None where the user was unranked.
+        """
+        snapshots = cls.objects.filter(
+            time_period=time_period, branch_id=branch_id, sub_branch_id=sub_branch_id
+        ).order_by("-period_start")[:periods]
+
+        points = []
+        for snapshot in reversed(snapshots):
+            found = snapshot.lookup(user_id)
+            points.append(
+                {
+                    "period_start": snapshot.period_start,
+                    "rank": found[0] if found else None,
+                    "total_score": found[1] if found else None,
+                    "board_size": snapshot.entry_count,
+                }
+            )
+        return points
+
+
+class CohortSummary(models.Model):
+    """
+    One signup-week cohort: its size, activation funnel and weekly
+    retention. Rebuilt nightly by src.services.cohorts so cohort charts
+    read a few dozen small rows instead of joining users to attempts.
+    """
+
+    cohort_week = models.DateField(unique=True, help_text="Monday of the signup week")
+    users = models.IntegerField(default=0, help_text="Users who signed up that week")
+    first_attempt = models.IntegerField(
+        default=0, help_text="...who went on to start an attempt"
+    )
+    completed_mock_test = models.IntegerField(
+        default=0, help_text="...and then completed a mock test"
+    )
+    reached_streak_7 = models.IntegerField(
+        default=0, help_text="...and then reached a 7-day study streak"
+    )
+    retention = models.JSONField(
+        default=list,
+        help_text="Users with an attempt in each week since signup (0 = signup week)",
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "cohort_summaries"
+        verbose_name = "Cohort Summary"
+        verbose_name_plural = "Cohort Summaries"
+        ordering = ["-cohort_week"]
+
+    def __str__(self):
+        return f"Cohort {self.cohort_week} ({self.users} users)"
+
+    @property
+    def retention_rates(self):
+        """Retention as percentages of the cohort size."""
+        if not self.users:
+            return [0.0 for _ in self.retention]
+        return [round(100 * n / self.users, 1) for n in self.retention]
@@ -1,5 +1,6 @@
 from django.contrib.auth.models import User
 from django.db import models
+from django.db.models import DEFERRED, F
 from django.utils import timezone
 
 from src.models.mocktest import MockTest
@@ -192,7 +193,23 @@ class UserAnswer(models.Model):
     def __str__(self):
         return f"Q{self.question.id} - {'Correct' if self.is_correct else 'Incorrect'}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored selection so save() can move selection counters
+        # (DEFERRED when loaded with .only() / .defer() without it)
+        instance._saved_selected_answer_id = instance.__dict__.get(
+            "selected_answer_id", DEFERRED
+        )
+        return instance
+
     def save(self, *args, **kwargs):
+        if getattr(self, "_saved_selected_answer_id", None) is DEFERRED:
+            self._saved_selected_answer_id = (
+                UserAnswer.objects.filter(pk=self.pk)
+                .values_list("selected_answer_id", flat=True)
+                .first()
+            )
         # Auto-check correctness if answer is selected
         if self.selected_answer:
             self.is_correct = self.selected_answer.is_correct
@@ -201,3 +218,15 @@ class UserAnswer(models.Model):
             self.is_skipped = True
             self.is_correct = False
         super().save(*args, **kwargs)
+
+        previous = getattr(self, "_saved_selected_answer_id", None)
+        if previous != self.selected_answer_id:
+            if previous:
+                Answer.objects.filter(pk=previous).update(
+                    selection_count=F("selection_count") - 1
+                )
+            if self.selected_answer_id:
+                Answer.objects.filter(pk=self.selected_answer_id).update(
+                    selection_count=F("selection_count") + 1
+                )
+            self._saved_selected_answer_id = self.selected_answer_id
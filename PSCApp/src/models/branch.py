@@ -117,6 +117,11 @@ class Category(models.Model):
         help_text="null for system/admin created categories",
     )
     icon = models.ImageField(upload_to="category_icons/", null=True, blank=True)
+    icon_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Generated WebP/JPEG derivatives of icon, keyed by format and width",
+    )
     color_code = models.CharField(
         max_length=7,
         null=True,
@@ -219,6 +224,11 @@ class SubBranch(models.Model):
     description_en = models.TextField(null=True, blank=True)
     description_np = models.TextField(null=True, blank=True)
     icon = models.ImageField(upload_to="subbranch_icons/", null=True, blank=True)
+    icon_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Generated WebP/JPEG derivatives of icon, keyed by format and width",
+    )
     display_order = models.IntegerField(default=0)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
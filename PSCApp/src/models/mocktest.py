@@ -84,8 +84,10 @@ class MockTest(models.Model):
             self.slug = slugify(self.title_en)
         super().save(*args, **kwargs)
 
-    def generate_from_categories(self, category_distribution):
+    def generate_from_categories(self, category_distribution, difficulty_range=None):
         # category_distribution: dict {category_id: count}
+        # difficulty_range: optional (min, max) calibrated difficulty in logits;
+        # uncalibrated questions are excluded when a range is given
         order_counter = 1
         created_questions = []
 
@@ -94,11 +96,15 @@ class MockTest(models.Model):
         # self.test_questions.all().delete() # Safer not to delete blindly in a vague method
 
         for category_id, count in category_distribution.items():
-            questions = list(
-                Question.objects.filter(
-                    category_id=category_id, status="PUBLIC"
-                ).order_by("?")[:count]
+            candidates = Question.objects.filter(
+                category_id=category_id, status="PUBLIC"
             )
+            if difficulty_range is not None:
+                low, high = difficulty_range
+                candidates = candidates.filter(
+                    calibrated_difficulty__gte=low, calibrated_difficulty__lte=high
+                )
+            questions = list(candidates.order_by("?")[:count])
 
             for q in questions:
                 created_questions.append(
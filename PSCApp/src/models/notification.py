@@ -1,12 +1,37 @@
 import logging
+from datetime import timedelta
 
-from django.db import models
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.validators import MinValueValidator
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
 
-from src.models.user import User
+from src.models.user import User, UserProfile
 
 logger = logging.getLogger(__name__)
 
 
+class NotificationQuerySet(models.QuerySet):
+    def delete(self):
+        """
+        Delete and release the unread counters of the deleted rows with one
+        UPDATE per distinct delta. Cascades from users, questions or mock
+        tests bypass this; reconcile_unread_counts() repairs those.
+        """
+        with transaction.atomic():
+            unread = dict(
+                self.filter(is_read=False)
+                .values_list("user_id")
+                .annotate(n=Count("id"))
+                .order_by()
+            )
+            deleted = super().delete()
+            Notification.adjust_unread({user_id: -n for user_id, n in unread.items()})
+        return deleted
+
+
 class Notification(models.Model):
     """
     User alerts for contributions, leaderboard changes, etc.
@@ -59,6 +84,10 @@ class Notification(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = NotificationQuerySet.as_manager()
+
+    BULK_CHUNK_SIZE = 1000
+
     class Meta:
         db_table = "notifications"
         verbose_name = "Notification"
@@ -68,15 +97,125 @@ class Notification(models.Model):
             models.Index(fields=["user", "is_read"]),
             models.Index(fields=["user", "notification_type"]),
             models.Index(fields=["created_at"]),
+            # Inbox pages (cursor on created_at) and the unread slice of it
+            models.Index(fields=["user", "-created_at"], name="notif_user_created_idx"),
+            models.Index(
+                fields=["user", "-created_at"],
+                condition=Q(is_read=False),
+                name="notif_user_unread_idx",
+            ),
         ]
 
     def __str__(self):
         return f"{self.user.username} - {self.title_en}"
 
     def mark_as_read(self):
-        if not self.is_read:
-            self.is_read = True
-            self.save(update_fields=["is_read"])
+        if self.is_read:
+            return
+        with transaction.atomic():
+            changed = Notification.objects.filter(pk=self.pk, is_read=False).update(
+                is_read=True
+            )
+            if changed:
+                Notification.adjust_unread({self.user_id: -1})
+        self.is_read = True
+
+    @staticmethod
+    def mark_all_as_read(user):
+        """Mark every unread notification of ``user`` read; returns how many."""
+        with transaction.atomic():
+            changed = Notification.objects.filter(user=user, is_read=False).update(
+                is_read=True
+            )
+            if changed:
+                Notification.adjust_unread({user.id: -changed})
+        return changed
+
+    @staticmethod
+    def adjust_unread(deltas, publish=True):
+        """
+        Apply {user_id: delta} to UserProfile.unread_notifications (one UPDATE
+        per distinct delta, clamped at 0). With ``publish``, the new counts
+        are pushed to open sockets after commit; new notifications skip
+        this because their realtime event already carries the count.
+        """
+        by_delta = {}
+        for user_id, delta in deltas.items():
+            if delta:
+                by_delta.setdefault(delta, []).append(user_id)
+        for delta, user_ids in by_delta.items():
+            # Uncounted (NULL) profiles are seeded from a COUNT on first read
+            UserProfile.objects.filter(
+                google_auth_user_id__in=user_ids, unread_notifications__isnull=False
+            ).update(
+                unread_notifications=Greatest(
+                    F("unread_notifications") + delta, Value(0)
+                )
+            )
+        if publish and deltas:
+            user_ids = list(deltas)
+
+            def kick():
+                from src.tasks import publish_unread_counts
+
+                try:
+                    publish_unread_counts.delay(user_ids)
+                except Exception as e:
+                    logger.warning("Failed to schedule unread count update: %s", e)
+
+            transaction.on_commit(kick)
+
+    @staticmethod
+    def seed_unread_counts(user_ids):
+        """
+        Count the unread notifications of listed profiles whose counter is
+        still NULL (profiles that predate it, or new ones never read), in
+        one UPDATE, so reads and later deltas work from a real count.
+        """
+        unread = (
+            Notification.objects.filter(
+                user_id=OuterRef("google_auth_user_id"), is_read=False
+            )
+            .values("user_id")
+            .annotate(n=Count("id"))
+            .values("n")
+            .order_by()
+        )
+        UserProfile.objects.filter(
+            google_auth_user_id__in=user_ids, unread_notifications__isnull=True
+        ).update(
+            unread_notifications=Coalesce(
+                Subquery(unread, output_field=models.IntegerField()), Value(0)
+            )
+        )
+
+    @staticmethod
+    def reconcile_unread_counts():
+        """
+        Repair drift in UserProfile.unread_notifications (admin edits, raw
+        SQL, cascaded deletes) from one GROUP BY. Returns profiles fixed.
+        """
+        actual = dict(
+            Notification.objects.filter(is_read=False)
+            .values_list("user_id")
+            .annotate(n=Count("id"))
+            .order_by()
+        )
+        changed = []
+        for profile_id, user_id, stored in UserProfile.objects.values_list(
+            "id", "google_auth_user_id", "unread_notifications"
+        ).iterator(chunk_size=5000):
+            if stored != actual.get(user_id, 0):
+                changed.append(
+                    UserProfile(
+                        id=profile_id, unread_notifications=actual.get(user_id, 0)
+                    )
+                )
+        UserProfile.objects.bulk_update(
+            changed, ["unread_notifications"], batch_size=1000
+        )
+        logger.info("Reconciled unread counters: %d profiles corrected", len(changed))
+        return len(changed)
 
     @staticmethod
     def create_bulk_notifications(
@@ -89,7 +228,14 @@ class Notification(models.Model):
         related_question=None,
         related_mock_test=None,
     ):
-        notifications = [
+        """
+        Send the same notification to every user in ``users`` (a list or a
+        queryset, streamed). Delivery goes through the outbox exactly like a
+        single create. Returns the number of notifications created.
+        """
+        if hasattr(users, "iterator"):
+            users = users.iterator(chunk_size=Notification.BULK_CHUNK_SIZE)
+        return Notification.enqueue_bulk(
             Notification(
                 user=user,
                 notification_type=notification_type,
@@ -101,24 +247,68 @@ class Notification(models.Model):
                 related_mock_test=related_mock_test,
             )
             for user in users
-        ]
-        Notification.objects.bulk_create(notifications)
+        )
+
+    @staticmethod
+    def enqueue_bulk(notifications, chunk_size=None, deliver_at=None):
+        """
+        Insert unsaved notifications (any iterable) in chunks, each chunk in
+        one transaction with its outbox rows, then start enough dispatchers
+        to drain them in parallel. ``deliver_at`` maps user ids to the time
+        their delivery may start (e.g. the end of their quiet hours).
+        Returns the number created.
+        """
+        from itertools import islice
+
+        chunk_size = chunk_size or Notification.BULK_CHUNK_SIZE
+        deliver_at = deliver_at or {}
+        notifications = iter(notifications)
+        created = 0
+        while chunk := list(islice(notifications, chunk_size)):
+            now = timezone.now()
+            with transaction.atomic():
+                Notification.objects.bulk_create(chunk)
+                NotificationOutbox.objects.bulk_create(
+                    NotificationOutbox(
+                        notification=notification,
+                        next_attempt_at=deliver_at.get(notification.user_id, now),
+                    )
+                    for notification in chunk
+                )
+                unread = {}
+                for notification in chunk:
+                    if not notification.is_read:
+                        unread[notification.user_id] = (
+                            unread.get(notification.user_id, 0) + 1
+                        )
+                Notification.adjust_unread(unread, publish=False)
+            created += len(chunk)
+        if created:
+            NotificationOutbox.schedule_dispatch(
+                parallel=-(-created // NotificationOutbox.DISPATCH_BATCH)
+            )
+        return created
 
     def save(self, *args, **kwargs):
         is_new = self.pk is None
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if is_new:
+                NotificationOutbox.objects.create(notification=self)
+                if not self.is_read:
+                    Notification.adjust_unread({self.user_id: 1}, publish=False)
         if is_new:
-            self.send_realtime()
-            self.send_push()
-
-    def send_realtime(self):
-        from asgiref.sync import async_to_sync
-        from channels.layers import get_channel_layer
+            NotificationOutbox.schedule_dispatch()
 
-        channel_layer = get_channel_layer()
-        group_name = f"user_{self.user.id}"
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            deleted = super().delete(*args, **kwargs)
+            if not self.is_read:
+                Notification.adjust_unread({self.user_id: -1})
+        return deleted
 
-        data = {
+    def realtime_payload(self):
+        return {
             "id": self.id,
             "type": self.notification_type,
             "title": self.title_en,  # Sending English title as default
@@ -126,38 +316,288 @@ class Notification(models.Model):
             "action_url": self.action_url,
             "created_at": self.created_at.isoformat(),
             "is_read": self.is_read,
+            "unread_count": self.cached_unread_count(),
         }
 
+    def cached_unread_count(self):
+        """The recipient's unread count, or None if they have no profile."""
         try:
-            async_to_sync(channel_layer.group_send)(
-                group_name, {"type": "send_notification", "data": data}
-            )
-        except Exception as e:
-            # Log error, don't crash main thread
-            logger.warning("Failed to send realtime notification: %s", e)
+            count = self.user.profile.unread_notifications
+        except ObjectDoesNotExist:
+            return None
+        if count is None:
+            count = Notification.get_unread_count(self.user)
+        return count
 
-    def send_push(self):
-        """Send a device push notification via Expo Push API."""
-        from src.services.push import send_push_to_user
-
-        try:
-            data = {"notification_id": self.id, "type": self.notification_type}
-            if self.action_url:
-                data["action_url"] = self.action_url
-            if self.related_question_id:
-                data["related_question"] = self.related_question_id
-            if self.related_mock_test_id:
-                data["related_mock_test"] = self.related_mock_test_id
-
-            send_push_to_user(
-                user=self.user,
-                title_en=self.title_en,
-                body_en=self.message_en,
-                data=data,
-            )
-        except Exception as e:
-            logger.warning("Failed to send push notification: %s", e)
+    def push_data(self):
+        data = {"notification_id": self.id, "type": self.notification_type}
+        if self.action_url:
+            data["action_url"] = self.action_url
+        if self.related_question_id:
+            data["related_question"] = self.related_question_id
+        if self.related_mock_test_id:
+            data["related_mock_test"] = self.related_mock_test_id
+        return data
 
     @staticmethod
     def get_unread_count(user):
-        return Notification.objects.filter(user=user, is_read=False).count()
+        cached = UserProfile.objects.filter(google_auth_user=user).values_list(
+            "unread_notifications", flat=True
+        )
+        count = cached.first()
+        if count is None:
+            Notification.seed_unread_counts([user.id])
+            count = cached.first()
+        if count is None:  # no profile
+            return Notification.objects.filter(user=user, is_read=False).count()
+        return count
+
+
+class NotificationOutbox(models.Model):
+    """
+    Delivery queue for notifications. A row is written in the same
+    transaction as its Notification and drained by the dispatcher
+    (src.services.notifications), which sends realtime events and Expo
+    pushes in batches, so creating a notification never waits on either.
+    """
+
+    STATUS_CHOICES = [
+        ("PENDING", "Pending"),
+        ("SENT", "Sent"),
+        ("FAILED", "Failed"),
+    ]
+
+    MAX_ATTEMPTS = 6
+    # Entries one dispatcher pass claims, and the most dispatchers one
+    # fan-out starts (the notifications worker's concurrency caps the rest)
+    DISPATCH_BATCH = 500
+    MAX_PARALLEL_DISPATCHES = 4
+
+    notification = models.OneToOneField(
+        Notification, on_delete=models.CASCADE, related_name="outbox"
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="PENDING")
+    realtime_done = models.BooleanField(default=False)
+    push_done = models.BooleanField(default=False)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "notification_outbox"
+        verbose_name = "Notification Outbox Entry"
+        verbose_name_plural = "Notification Outbox"
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.notification_id} ({self.status})"
+
+    @staticmethod
+    def backoff(attempts):
+        """Delay before retry number ``attempts``: 1, 2, 4 ... minutes, capped at 1 hour."""
+        return timedelta(minutes=min(2 ** (attempts - 1), 60))
+
+    def record_failure(self, error, now=None):
+        now = now or timezone.now()
+        self.attempts += 1
+        self.last_error = str(error)[:1000]
+        if self.attempts >= self.MAX_ATTEMPTS:
+            self.status = "FAILED"
+        else:
+            self.next_attempt_at = now + self.backoff(self.attempts)
+
+    @classmethod
+    def schedule_dispatch(cls, parallel=1):
+        """Ask the dispatcher to drain the outbox once the transaction commits."""
+        parallel = max(1, min(parallel, cls.MAX_PARALLEL_DISPATCHES))
+
+        def kick():
+            from src.tasks import dispatch_notifications
+
+            try:
+                for _ in range(parallel):
+                    dispatch_notifications.delay()
+            except Exception as e:
+                # The periodic dispatcher run picks the entries up instead
+                logger.warning("Failed to schedule notification dispatch: %s", e)
+
+        transaction.on_commit(kick)
+
+
+class NotificationCampaign(models.Model):
+    """
+    A scheduled broadcast. Admins set the audience (explicit users, or
+    branch / sub-branch / recent activity), a send time and a cap on
+    recipients per minute; src.services.campaigns walks the audience in
+    user id order at that rate, and recipients inside their quiet hours get
+    the in-app notification at once but its realtime event and push only
+    when the quiet window ends.
+    """
+
+    STATUS_CHOICES = [
+        ("SCHEDULED", "Scheduled"),
+        ("RUNNING", "Running"),
+        ("COMPLETED", "Completed"),
+        ("CANCELLED", "Cancelled"),
+    ]
+
+    DEFAULT_RATE = 1000
+
+    notification_type = models.CharField(
+        max_length=30, choices=Notification.TYPE_CHOICES, default="GENERAL"
+    )
+    title_en = models.CharField(max_length=255)
+    title_np = models.CharField(max_length=255, blank=True, default="")
+    message_en = models.TextField()
+    message_np = models.TextField(blank=True, default="")
+    action_url = models.CharField(max_length=500, null=True, blank=True)
+
+    user_ids = models.JSONField(
+        default=list, blank=True, help_text="Explicit recipients; empty means everyone"
+    )
+    branch = models.ForeignKey(
+        "Branch",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="notification_campaigns",
+        help_text="Only users targeting this branch",
+    )
+    sub_branch = models.ForeignKey(
+        "SubBranch",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="notification_campaigns",
+        help_text="Only users targeting this sub-branch",
+    )
+    active_within_days = models.PositiveIntegerField(
+        null=True, blank=True, help_text="Only users active in the last N days"
+    )
+
+    send_at = models.DateTimeField(default=timezone.now)
+    rate_per_minute = models.PositiveIntegerField(
+        default=DEFAULT_RATE,
+        validators=[MinValueValidator(1)],
+        help_text="Most recipients notified per minute",
+    )
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default="SCHEDULED"
+    )
+    cursor = models.IntegerField(default=0, help_text="Last user id processed")
+    sent_count = models.PositiveIntegerField(default=0)
+    deferred_count = models.PositiveIntegerField(
+        default=0, help_text="Recipients held back by quiet hours"
+    )
+    last_tick_at = models.DateTimeField(null=True, blank=True)
+    created_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "notification_campaigns"
+        verbose_name = "Notification Campaign"
+        verbose_name_plural = "Notification Campaigns"
+        ordering = ["-send_at"]
+        indexes = [
+            models.Index(fields=["status", "send_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.title_en} ({self.status})"
+
+    def build_notification(self, user_id):
+        return Notification(
+            user_id=user_id,
+            notification_type=self.notification_type,
+            title_en=self.title_en,
+            title_np=self.title_np or self.title_en,
+            message_en=self.message_en,
+            message_np=self.message_np or self.message_en,
+            action_url=self.action_url,
+        )
+
+    def schedule(self):
+        """Start the campaign right away if it is due, once the transaction commits."""
+
+        def kick():
+            from src.tasks import start_due_campaigns
+
+            try:
+                start_due_campaigns.delay()
+            except Exception as e:
+                # The periodic run starts it instead
+                logger.warning("Failed to schedule campaign %s: %s", self.pk, e)
+
+        if self.send_at <= timezone.now():
+            transaction.on_commit(kick)
+
+
+class NotificationArchive(models.Model):
+    """
+    Read notifications past the retention age, moved out of the inbox table
+    by src.services.notifications.apply_retention. Kept flat (no foreign
+    keys) so the archive never blocks deletes elsewhere.
+    """
+
+    original_id = models.BigIntegerField(unique=True)
+    user_id = models.IntegerField(db_index=True)
+    notification_type = models.CharField(max_length=30)
+    title_en = models.CharField(max_length=255)
+    title_np = models.CharField(max_length=255)
+    message_en = models.TextField()
+    message_np = models.TextField()
+    related_question_id = models.IntegerField(null=True, blank=True)
+    related_mock_test_id = models.IntegerField(null=True, blank=True)
+    action_url = models.CharField(max_length=500, null=True, blank=True)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    ARCHIVED_FIELDS = (
+        "user_id",
+        "notification_type",
+        "title_en",
+        "title_np",
+        "message_en",
+        "message_np",
+        "related_question_id",
+        "related_mock_test_id",
+        "action_url",
+        "created_at",
+    )
+
+    class Meta:
+        db_table = "notification_archive"
+        verbose_name = "Archived Notification"
+        verbose_name_plural = "Archived Notifications"
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.title_en}"
+
+
+class PushTicket(models.Model):
+    """
+    An Expo push ticket awaiting its delivery receipt. Checked and removed
+    by src.services.push.check_receipts; dropped after a day either way.
+    """
+
+    ticket_id = models.CharField(max_length=64, unique=True)
+    token = models.CharField(max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        db_table = "push_tickets"
+        verbose_name = "Push Ticket"
+        verbose_name_plural = "Push Tickets"
+
+    def __str__(self):
+        return self.ticket_id
@@ -1,4 +1,6 @@
-from django.db import models
+from django.core.cache import cache
+from django.db import connection, models, transaction
+from django.db.models import F
 
 from src.models.user import User
 
@@ -8,8 +10,20 @@ class PlatformStats(models.Model):
     Global platform statistics for public dashboard
     Shows community activity and engagement
     Singleton model - only one active record
+
+    The all-time counters are kept current by deltas from the write sites
+    (see adjust); the hourly update only recomputes the range-bounded
+    fields, and reconcile() recounts everything once a day to repair drift.
     """
 
+    # Question status -> counter holding questions in that status
+    QUESTION_STATUS_FIELDS = {
+        "PUBLIC": "total_questions_public",
+        "PENDING_REVIEW": "total_questions_pending",
+    }
+    CACHE_KEY = "platform_stats:payload"
+    CACHE_TIMEOUT = 60
+
     total_questions_public = models.IntegerField(
         default=0, help_text="All approved public questions"
     )
@@ -55,34 +69,102 @@ class PlatformStats(models.Model):
     def __str__(self):
         return f"Platform Stats (Updated: {self.last_updated})"
 
-    def refresh_stats(self):
+    @staticmethod
+    def get_solo():
+        """The singleton row, fully counted the first time it is created."""
+        obj, created = PlatformStats.objects.get_or_create(id=1)
+        if created:
+            obj.refresh_stats()
+        return obj
+
+    @staticmethod
+    def adjust(**deltas):
+        """
+        Add ``deltas`` (field=amount) to the counters once the current
+        transaction commits, as one UPDATE, so the singleton row is never
+        held locked for the length of a request.
+        """
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if not deltas:
+            return
+
+        def apply():
+            PlatformStats.objects.filter(id=1).update(
+                **{field: F(field) + delta for field, delta in deltas.items()}
+            )
+
+        transaction.on_commit(apply)
+
+    @staticmethod
+    def question_status_changed(old_status, new_status, count=1):
+        """Move ``count`` questions between the per-status counters."""
+        deltas = {}
+        for status, delta in ((old_status, -count), (new_status, count)):
+            field = PlatformStats.QUESTION_STATUS_FIELDS.get(status)
+            if field:
+                deltas[field] = deltas.get(field, 0) + delta
+        PlatformStats.adjust(**deltas)
+
+    @staticmethod
+    def record_bulk_status_change(questions, new_status):
+        """
+        Account for ``questions.update(status=new_status)``, which sends no
+        signals. Call it just before the update.
+        """
+        from django.db.models import Count
+
+        moved = (
+            questions.exclude(status=new_status)
+            .values("status")
+            .annotate(count=Count("id"))
+            .order_by()
+        )
+        for row in moved:
+            PlatformStats.question_status_changed(
+                row["status"], new_status, row["count"]
+            )
+
+    @staticmethod
+    def estimated_count(model):
+        """
+        Planner row estimate (pg_class.reltuples, as of the last ANALYZE)
+        on PostgreSQL, avoiding a full scan; an exact COUNT elsewhere or
+        when the table has not been analysed yet.
+        """
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            if row and row[0] >= 0:
+                return row[0]
+        return model.objects.count()
+
+    def refresh_recent(self):
+        """
+        Recompute the fields bounded by a time window (cheap range scans);
+        the all-time counters are left to the deltas.
+        """
         from datetime import timedelta
 
         from django.db.models import Count
         from django.utils import timezone
 
-        from src.models.attempt_answer import UserAnswer, UserAttempt
         from src.models.question_answer import Question
+        from src.services import activity
 
         now = timezone.now()
         thirty_days_ago = now - timedelta(days=30)
         one_day_ago = now - timedelta(hours=24)
 
-        self.total_questions_public = Question.objects.filter(status="PUBLIC").count()
-        self.total_questions_pending = Question.objects.filter(
-            status="PENDING_REVIEW"
-        ).count()
-
-        self.total_contributions_this_month = Question.objects.filter(
-            created_at__year=now.year, created_at__month=now.month
-        ).count()
-
-        self.total_users_active = User.objects.filter(
-            last_login__gte=thirty_days_ago
-        ).count()
-        self.total_mock_tests_taken = UserAttempt.objects.count()
-        self.total_answers_submitted = UserAnswer.objects.count()
-
+        # Monthly uniques from the activity sketches when Redis is available
+        self.total_users_active = activity.unique_users(days=30)
+        if self.total_users_active is None:
+            self.total_users_active = User.objects.filter(
+                last_login__gte=thirty_days_ago
+            ).count()
         self.questions_added_today = Question.objects.filter(
             created_at__gte=one_day_ago
         ).count()
@@ -99,15 +181,75 @@ class PlatformStats(models.Model):
         )
         self.top_contributor_this_month = top_contributor
 
-        self.save()
+        self.save(
+            update_fields=[
+                "total_users_active",
+                "questions_added_today",
+                "top_contributor_this_month",
+                "last_updated",
+            ]
+        )
+        cache.delete(self.CACHE_KEY)
+
+    def refresh_stats(self, estimate=None):
+        """
+        Recount every counter from the source tables. With ``estimate``
+        (default: settings.PLATFORM_STATS_ESTIMATE) the attempt and answer
+        totals come from planner estimates instead of COUNT(*).
+        """
+        from django.conf import settings
+        from django.utils import timezone
+
+        from src.models.attempt_answer import UserAnswer, UserAttempt
+        from src.models.question_answer import Question
+
+        if estimate is None:
+            estimate = getattr(settings, "PLATFORM_STATS_ESTIMATE", False)
+        count = self.estimated_count if estimate else (lambda m: m.objects.count())
+
+        now = timezone.now()
+        self.total_questions_public = Question.objects.filter(status="PUBLIC").count()
+        self.total_questions_pending = Question.objects.filter(
+            status="PENDING_REVIEW"
+        ).count()
+
+        self.total_contributions_this_month = Question.objects.filter(
+            created_at__year=now.year, created_at__month=now.month
+        ).count()
+
+        self.total_mock_tests_taken = count(UserAttempt)
+        self.total_answers_submitted = count(UserAnswer)
+
+        self.save(
+            update_fields=[
+                "total_questions_public",
+                "total_questions_pending",
+                "total_contributions_this_month",
+                "total_mock_tests_taken",
+                "total_answers_submitted",
+                "last_updated",
+            ]
+        )
+        self.refresh_recent()
 
     def reset_monthly_stats(self):
         self.total_contributions_this_month = 0
         self.questions_added_today = 0
         self.top_contributor_this_month = None
-        self.save()
+        self.save(
+            update_fields=[
+                "total_contributions_this_month",
+                "questions_added_today",
+                "top_contributor_this_month",
+                "last_updated",
+            ]
+        )
+        cache.delete(self.CACHE_KEY)
 
     @staticmethod
     def scheduled_update():
-        obj, _ = PlatformStats.objects.get_or_create(id=1)
-        obj.refresh_stats()
+        PlatformStats.get_solo().refresh_recent()
+
+    @staticmethod
+    def reconcile():
+        PlatformStats.get_solo().refresh_stats()
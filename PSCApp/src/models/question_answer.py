@@ -28,6 +28,12 @@ class Question(models.Model):
         ("PRIVATE", "Private"),
     ]
 
+    DISTRACTOR_FLAG_CHOICES = [
+        ("", "No issues"),
+        ("UNUSED_DISTRACTOR", "A distractor is never picked"),
+        ("DISTRACTOR_BEATS_KEY", "A wrong option is picked more than the correct one"),
+    ]
+
     question_text_en = models.TextField(help_text="Question in English")
     question_text_np = models.TextField(help_text="Question in Nepali")
     category = models.ForeignKey(
@@ -54,6 +60,11 @@ class Question(models.Model):
         blank=True,
         help_text="Optional diagram or chart",
     )
+    image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Generated WebP/JPEG derivatives of image, keyed by format and width",
+    )
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="DRAFT")
     created_by = models.ForeignKey(
         User,
@@ -78,6 +89,23 @@ class Question(models.Model):
     times_correct = models.IntegerField(
         default=0, help_text="How many times answered correctly"
     )
+    calibrated_difficulty = models.FloatField(
+        null=True,
+        blank=True,
+        help_text="Rasch difficulty in logits fitted from responses (0 = average)",
+    )
+    discrimination = models.FloatField(
+        null=True,
+        blank=True,
+        help_text="Point-biserial correlation of correctness with user ability",
+    )
+    distractor_flag = models.CharField(
+        max_length=30,
+        choices=DISTRACTOR_FLAG_CHOICES,
+        blank=True,
+        default="",
+        help_text="Set nightly from answer selection counts",
+    )
     reported_count = models.IntegerField(
         default=0, help_text="Number of quality reports filed"
     )
@@ -94,16 +122,42 @@ class Question(models.Model):
             models.Index(fields=["is_public", "status"]),
             models.Index(fields=["created_by", "status"]),
             models.Index(fields=["scheduled_public_date"]),
+            models.Index(fields=["category", "calibrated_difficulty"]),
+            models.Index(fields=["distractor_flag"]),
+            models.Index(fields=["created_at"]),
         ]
 
     def __str__(self):
         return f"Q{self.id}: {self.question_text_en[:50]}..."
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored status so post_save can tell transitions apart
+        instance._saved_status = instance.__dict__.get("status")
+        return instance
+
     def get_accuracy_rate(self):
         if self.times_attempted == 0:
             return 0.0
         return (self.times_correct / self.times_attempted) * 100
 
+    def get_answer_distribution(self):
+        """
+        Share of selections per answer option, read from the materialized
+        Answer.selection_count counters (prefetch "answers" to avoid a query).
+        """
+        answers = list(self.answers.all())
+        total = sum(answer.selection_count for answer in answers)
+        return [
+            {
+                "answer": answer,
+                "count": answer.selection_count,
+                "percentage": (answer.selection_count / total) * 100 if total else 0,
+            }
+            for answer in answers
+        ]
+
     def get_attempt_history(self, user=None):
         qs = self.user_responses.select_related("user_attempt")
         if user:
@@ -145,6 +199,9 @@ class Answer(models.Model):
     display_order = models.IntegerField(
         default=0, help_text="Order for A, B, C, D display"
     )
+    selection_count = models.IntegerField(
+        default=0, help_text="How many user answers currently select this option"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
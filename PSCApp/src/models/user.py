@@ -19,6 +19,11 @@ class UserProfile(models.Model):
     profile_picture = models.ImageField(
         upload_to="profile_pictures/", null=True, blank=True
     )
+    profile_picture_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Generated WebP/JPEG derivatives of profile_picture",
+    )
     full_name = models.CharField(max_length=255)
     email = models.EmailField(unique=True)
     phone_number = models.CharField(
@@ -63,6 +68,24 @@ class UserProfile(models.Model):
         default=True,
         help_text="Whether the user wants to receive push notifications",
     )
+    quiet_hours_start = models.TimeField(
+        null=True,
+        blank=True,
+        help_text="Start of the daily window (local time) without campaign pushes",
+    )
+    quiet_hours_end = models.TimeField(
+        null=True,
+        blank=True,
+        help_text="End of the quiet window; may be past midnight",
+    )
+    unread_notifications = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text=(
+            "Cached count of unread notifications (reconciled nightly); "
+            "NULL until first counted"
+        ),
+    )
     is_active = models.BooleanField(default=True)
     date_joined = models.DateTimeField(auto_now_add=True)
     last_login = models.DateTimeField(auto_now=True)
@@ -199,6 +199,14 @@ class UserStatistics(models.Model):
     accuracy_rank = models.IntegerField(
         null=True, blank=True, help_text="Rank by overall accuracy"
     )
+    answers_rank = models.IntegerField(
+        null=True, blank=True, help_text="Rank by questions answered"
+    )
+    ability_estimate = models.FloatField(
+        null=True,
+        blank=True,
+        help_text="Rasch ability in logits fitted from responses",
+    )
     last_updated = models.DateTimeField(auto_now=True)
 
     class Meta:
@@ -208,6 +216,7 @@ class UserStatistics(models.Model):
         indexes = [
             models.Index(fields=["contribution_rank"]),
             models.Index(fields=["accuracy_rank"]),
+            models.Index(fields=["answers_rank"]),
             models.Index(fields=["study_streak_days"]),
         ]
 
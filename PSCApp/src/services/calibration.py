@@ -0,0 +1,313 @@
+"""
+Item difficulty calibration from response data.
+
+Fits a Rasch (1PL IRT) model to every answered (user, question, correct)
+triple in user_answers:
+
+    P(correct) = sigmoid(ability[user] - difficulty[question])
+
+Responses are streamed out of the database in keyset-ordered chunks and
+spilled to a flat binary file, which is then memory-mapped so every fitting
+pass walks it chunk by chunk. Peak memory is therefore bounded by
+``chunk_size`` plus a few float arrays per user and per question, regardless
+of how many responses exist.
+
+Parameters are estimated by joint maximum likelihood with a weak Gaussian
+prior (which keeps all-correct / all-wrong users and questions finite), using
+simultaneous Newton steps whose sufficient statistics are accumulated with
+``np.bincount``. Difficulties are centred on zero, so values are in logits:
+negative is easier than average, positive is harder.
+
+Discrimination is reported as the point-biserial correlation between a
+question's correctness and the respondents' fitted abilities.
+"""
+
+import logging
+import os
+import tempfile
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.db.models import Max
+
+from src.models.attempt_answer import UserAnswer
+from src.models.question_answer import Question
+from src.models.user_stats import UserStatistics
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_DTYPE = np.dtype([("user", "<i4"), ("item", "<i4"), ("correct", "u1")])
+
+DEFAULT_CHUNK_SIZE = 500_000
+MIN_ITEM_RESPONSES = 10
+MIN_USER_RESPONSES = 5
+PRIOR_VARIANCE = 4.0
+MAX_STEP = 1.0
+ABILITY_BOUND = 6.0
+
+
+def _sorted_ids(queryset):
+    return np.fromiter(
+        queryset.order_by("id").values_list("id", flat=True).iterator(), dtype=np.int64
+    )
+
+
+def _locate(sorted_ids, ids):
+    """Positions of ``ids`` in ``sorted_ids`` and a mask of those found."""
+    pos = np.searchsorted(sorted_ids, ids)
+    found = pos < len(sorted_ids)
+    found[found] = sorted_ids[pos[found]] == ids[found]
+    return pos, found
+
+
+def extract_responses(path, user_ids, item_ids, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Stream answered, non-skipped responses into ``path`` as RESPONSE_DTYPE
+    records, with user / question ids mapped to dense indexes into the sorted
+    ``user_ids`` / ``item_ids`` arrays; responses whose user or question is
+    not in those arrays are skipped. Returns the number of records written.
+    """
+    max_id = UserAnswer.objects.aggregate(max_id=Max("id"))["max_id"]
+    if max_id is None:
+        return 0
+
+    base = UserAnswer.objects.filter(
+        id__lte=max_id, is_skipped=False, selected_answer__isnull=False
+    ).order_by("id")
+
+    written = 0
+    last_id = 0
+    with open(path, "wb") as fh:
+        while True:
+            rows = list(
+                base.filter(id__gt=last_id).values_list(
+                    "id", "user_attempt__user_id", "question_id", "is_correct"
+                )[:chunk_size]
+            )
+            if not rows:
+                break
+            last_id = rows[-1][0]
+
+            chunk = np.array([row[1:] for row in rows], dtype=np.int64)
+            users, known_users = _locate(user_ids, chunk[:, 0])
+            items, known_items = _locate(item_ids, chunk[:, 1])
+            # Users / questions created after the id snapshot are left out
+            known = known_users & known_items
+            chunk, users, items = chunk[known], users[known], items[known]
+
+            records = np.empty(len(chunk), dtype=RESPONSE_DTYPE)
+            records["user"] = users
+            records["item"] = items
+            records["correct"] = chunk[:, 2]
+            records.tofile(fh)
+            written += len(records)
+
+    return written
+
+
+def _chunks(responses, chunk_size):
+    for start in range(0, len(responses), chunk_size):
+        chunk = responses[start : start + chunk_size]
+        yield chunk["user"], chunk["item"], chunk["correct"].astype(np.float64)
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def fit_rasch(
+    responses,
+    n_users,
+    n_items,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    max_iter=100,
+    tol=1e-3,
+    prior_variance=PRIOR_VARIANCE,
+):
+    """
+    Fit ability / difficulty vectors to a RESPONSE_DTYPE record array (or
+    memmap). Returns (ability, difficulty, user_counts, item_counts).
+    """
+    user_counts = np.zeros(n_users)
+    item_counts = np.zeros(n_items)
+    user_scores = np.zeros(n_users)
+    item_scores = np.zeros(n_items)
+    for users, items, correct in _chunks(responses, chunk_size):
+        user_counts += np.bincount(users, minlength=n_users)
+        item_counts += np.bincount(items, minlength=n_items)
+        user_scores += np.bincount(users, weights=correct, minlength=n_users)
+        item_scores += np.bincount(items, weights=correct, minlength=n_items)
+
+    ability = np.zeros(n_users)
+    difficulty = np.zeros(n_items)
+    precision = 1.0 / prior_variance
+    answered_users = user_counts > 0
+    answered_items = item_counts > 0
+
+    for iteration in range(max_iter):
+        user_expected = np.zeros(n_users)
+        item_expected = np.zeros(n_items)
+        user_info = np.zeros(n_users)
+        item_info = np.zeros(n_items)
+        for users, items, _correct in _chunks(responses, chunk_size):
+            p = _sigmoid(ability[users] - difficulty[items])
+            info = p * (1.0 - p)
+            user_expected += np.bincount(users, weights=p, minlength=n_users)
+            item_expected += np.bincount(items, weights=p, minlength=n_items)
+            user_info += np.bincount(users, weights=info, minlength=n_users)
+            item_info += np.bincount(items, weights=info, minlength=n_items)
+
+        ability_step = (user_scores - user_expected - ability * precision) / (
+            user_info + precision
+        )
+        difficulty_step = (item_expected - item_scores - difficulty * precision) / (
+            item_info + precision
+        )
+        ability_step = np.clip(ability_step, -MAX_STEP, MAX_STEP)
+        difficulty_step = np.clip(difficulty_step, -MAX_STEP, MAX_STEP)
+
+        ability = np.clip(ability + ability_step, -ABILITY_BOUND, ABILITY_BOUND)
+        difficulty += difficulty_step
+
+        # The likelihood is unchanged by shifting both scales together; only
+        # the prior pins that direction down, and per-coordinate Newton steps
+        # crawl along it. Jump straight to the prior-optimal shift instead.
+        shift = (ability[answered_users].sum() + difficulty[answered_items].sum()) / (
+            answered_users.sum() + answered_items.sum()
+        )
+        ability[answered_users] -= shift
+        difficulty[answered_items] -= shift
+
+        largest = max(
+            np.abs(ability_step).max(initial=0), np.abs(difficulty_step).max(initial=0)
+        )
+        if largest < tol:
+            logger.info("Rasch fit converged after %s iterations", iteration + 1)
+            break
+    else:
+        logger.warning(
+            "Rasch fit stopped after %s iterations without converging", max_iter
+        )
+
+    # Anchor the scale: average answered question has difficulty 0
+    if answered_items.any():
+        shift = difficulty[answered_items].mean()
+        difficulty[answered_items] -= shift
+        ability -= shift
+
+    return ability, difficulty, user_counts, item_counts
+
+
+def item_discrimination(responses, ability, n_items, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Point-biserial correlation of each question's correctness with ability."""
+    n = np.zeros(n_items)
+    sum_x = np.zeros(n_items)
+    sum_t = np.zeros(n_items)
+    sum_tt = np.zeros(n_items)
+    sum_xt = np.zeros(n_items)
+    for users, items, correct in _chunks(responses, chunk_size):
+        theta = ability[users]
+        n += np.bincount(items, minlength=n_items)
+        sum_x += np.bincount(items, weights=correct, minlength=n_items)
+        sum_t += np.bincount(items, weights=theta, minlength=n_items)
+        sum_tt += np.bincount(items, weights=theta * theta, minlength=n_items)
+        sum_xt += np.bincount(items, weights=correct * theta, minlength=n_items)
+
+    numerator = n * sum_xt - sum_x * sum_t
+    denominator = np.sqrt((n * sum_x - sum_x**2) * (n * sum_tt - sum_t**2))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = numerator / denominator
+    # No variance in either correctness or ability: undefined, report 0
+    return np.where(denominator > 0, r, 0.0)
+
+
+def _write_questions(item_ids, difficulty, discrimination, item_counts, min_responses):
+    batch = []
+    for index in np.flatnonzero(item_counts > 0):
+        question = Question(
+            id=int(item_ids[index]), calibrated_difficulty=None, discrimination=None
+        )
+        if item_counts[index] >= min_responses:
+            question.calibrated_difficulty = round(float(difficulty[index]), 4)
+            question.discrimination = round(float(discrimination[index]), 4)
+        batch.append(question)
+    Question.objects.bulk_update(
+        batch, ["calibrated_difficulty", "discrimination"], batch_size=1000
+    )
+    return sum(1 for q in batch if q.calibrated_difficulty is not None)
+
+
+def _write_abilities(user_ids, ability, user_counts, min_responses):
+    updated = 0
+    batch = []
+    stats = UserStatistics.objects.order_by("id").values_list("id", "user_id")
+    for stats_id, user_id in stats.iterator(chunk_size=5000):
+        index = np.searchsorted(user_ids, user_id)
+        if index >= len(user_ids) or user_ids[index] != user_id:
+            continue
+        if user_counts[index] == 0:
+            continue
+        enough = user_counts[index] >= min_responses
+        batch.append(
+            UserStatistics(
+                id=stats_id,
+                ability_estimate=round(float(ability[index]), 4) if enough else None,
+            )
+        )
+        updated += enough
+        if len(batch) >= 1000:
+            UserStatistics.objects.bulk_update(batch, ["ability_estimate"])
+            batch = []
+    if batch:
+        UserStatistics.objects.bulk_update(batch, ["ability_estimate"])
+    return updated
+
+
+def calibrate(
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    min_item_responses=MIN_ITEM_RESPONSES,
+    min_user_responses=MIN_USER_RESPONSES,
+    max_iter=100,
+):
+    """
+    Run a full calibration and persist Question.calibrated_difficulty,
+    Question.discrimination and UserStatistics.ability_estimate.
+    Returns a summary dict.
+    """
+    user_ids = _sorted_ids(User.objects.all())
+    item_ids = _sorted_ids(Question.objects.all())
+
+    with tempfile.TemporaryDirectory(prefix="calibration-") as workdir:
+        path = os.path.join(workdir, "responses.bin")
+        total = extract_responses(path, user_ids, item_ids, chunk_size=chunk_size)
+        if total == 0:
+            logger.info("Calibration skipped: no responses recorded")
+            return {"responses": 0, "questions": 0, "users": 0}
+
+        responses = np.memmap(path, dtype=RESPONSE_DTYPE, mode="r", shape=(total,))
+        try:
+            ability, difficulty, user_counts, item_counts = fit_rasch(
+                responses,
+                len(user_ids),
+                len(item_ids),
+                chunk_size=chunk_size,
+                max_iter=max_iter,
+            )
+            discrimination = item_discrimination(
+                responses, ability, len(item_ids), chunk_size=chunk_size
+            )
+        finally:
+            del responses
+
+    questions = _write_questions(
+        item_ids, difficulty, discrimination, item_counts, min_item_responses
+    )
+    users = _write_abilities(user_ids, ability, user_counts, min_user_responses)
+
+    logger.info(
+        "Calibrated %s questions and %s users from %s responses",
+        questions,
+        users,
+        total,
+    )
+    return {"responses": total, "questions": questions, "users": users}
@@ -0,0 +1,163 @@
+"""
+Notification campaign engine.
+
+A NotificationCampaign is created SCHEDULED. Once its send time has passed,
+start_due() marks it RUNNING and the run_campaign task calls run_tick()
+once a minute. Each tick locks the campaign, takes the next
+``rate_per_minute`` recipients after the saved cursor (keyset on user id, so
+every tick is an index range scan however large the audience) and bulk
+inserts their notifications through the outbox. Delivery is therefore
+capped at the campaign rate instead of everyone's app opening at once.
+
+Recipients whose quiet hours (UserProfile.quiet_hours_start / _end, local
+time) cover the tick get the in-app notification immediately, with the
+outbox entry held until the window ends, so the realtime event and push
+arrive then.
+
+A tick refuses to run within MIN_TICK_INTERVAL of the previous one, which
+keeps the rate cap even if two run_campaign chains exist; start_due() also
+restarts RUNNING campaigns whose chain has stalled (e.g. a worker died).
+"""
+
+import logging
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from src.models.notification import Notification, NotificationCampaign
+
+logger = logging.getLogger(__name__)
+
+TICK_INTERVAL = timedelta(minutes=1)
+MIN_TICK_INTERVAL = timedelta(seconds=50)
+STALL_AFTER = timedelta(minutes=5)
+
+
+def audience(campaign, now=None):
+    """Active users matching the campaign's filters."""
+    users = User.objects.filter(is_active=True)
+    if campaign.user_ids:
+        users = users.filter(id__in=campaign.user_ids)
+    if campaign.branch_id:
+        users = users.filter(profile__target_branch_id=campaign.branch_id)
+    if campaign.sub_branch_id:
+        users = users.filter(profile__target_sub_branch_id=campaign.sub_branch_id)
+    if campaign.active_within_days is not None:
+        today = timezone.localdate(now)
+        users = users.filter(
+            statistics__last_activity_date__gte=today
+            - timedelta(days=campaign.active_within_days)
+        )
+    return users
+
+
+def quiet_until(start, end, now):
+    """
+    The end of the quiet window ``start``-``end`` (local times, wrapping past
+    midnight when start > end) if ``now`` falls inside it, else None.
+    """
+    if start is None or end is None or start == end:
+        return None
+    local = timezone.localtime(now)
+    current = local.time()
+    if start < end:
+        inside = start <= current < end
+    else:
+        inside = current >= start or current < end
+    if not inside:
+        return None
+    until = local.replace(
+        hour=end.hour, minute=end.minute, second=end.second, microsecond=0
+    )
+    if until <= local:
+        until += timedelta(days=1)
+    return until
+
+
+def start_due(now=None):
+    """
+    Mark SCHEDULED campaigns whose send time has passed as RUNNING, and
+    return their ids together with those of stalled RUNNING campaigns.
+    """
+    now = now or timezone.now()
+    due = list(
+        NotificationCampaign.objects.filter(
+            Q(status="SCHEDULED", send_at__lte=now)
+            | Q(status="RUNNING", last_tick_at__lt=now - STALL_AFTER)
+            | Q(
+                status="RUNNING",
+                last_tick_at__isnull=True,
+                started_at__lt=now - STALL_AFTER,
+            )
+        ).values_list("id", flat=True)
+    )
+    NotificationCampaign.objects.filter(id__in=due, status="SCHEDULED").update(
+        status="RUNNING", started_at=now
+    )
+    return due
+
+
+def run_tick(campaign_id, now=None):
+    """
+    Notify the next ``rate_per_minute`` recipients of a RUNNING campaign.
+    Returns a summary whose ``more`` is True while recipients may remain,
+    or None when the campaign is not running, is locked by another tick or
+    already ran within MIN_TICK_INTERVAL.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        campaign = (
+            NotificationCampaign.objects.select_for_update(skip_locked=True)
+            .filter(id=campaign_id, status="RUNNING")
+            .first()
+        )
+        if campaign is None:
+            return None
+        if campaign.last_tick_at and now - campaign.last_tick_at < MIN_TICK_INTERVAL:
+            return None
+
+        recipients = list(
+            audience(campaign, now)
+            .filter(id__gt=campaign.cursor)
+            .order_by("id")
+            .values_list(
+                "id", "profile__quiet_hours_start", "profile__quiet_hours_end"
+            )[: campaign.rate_per_minute]
+        )
+        deliver_at = {}
+        for user_id, start, end in recipients:
+            until = quiet_until(start, end, now)
+            if until is not None:
+                deliver_at[user_id] = until
+
+        created = Notification.enqueue_bulk(
+            (campaign.build_notification(user_id) for user_id, _, _ in recipients),
+            deliver_at=deliver_at,
+        )
+
+        more = len(recipients) == campaign.rate_per_minute
+        if recipients:
+            campaign.cursor = recipients[-1][0]
+        campaign.sent_count += created
+        campaign.deferred_count += len(deliver_at)
+        campaign.last_tick_at = now
+        if not more:
+            campaign.status = "COMPLETED"
+            campaign.completed_at = now
+        campaign.save(
+            update_fields=[
+                "cursor",
+                "sent_count",
+                "deferred_count",
+                "last_tick_at",
+                "status",
+                "completed_at",
+            ]
+        )
+
+    summary = {"sent": created, "deferred": len(deliver_at), "more": more}
+    logger.info("Campaign %s tick: %s", campaign_id, summary)
+    return summary
@@ -0,0 +1,176 @@
+"""
+Signup-week cohort analytics.
+
+build_cohorts() rebuilds CohortSummary from three streamed extracts:
+
+* users: (id, local signup date), ordered by id;
+* activity: distinct (user id, local attempt week) pairs, deduplicated by
+  the database so the extract is one row per user per active week;
+* funnel flags: user ids with a completed mock test, and with a longest
+  streak of at least 7 days.
+
+Each extract is read in CHUNK_SIZE batches into NumPy arrays; users are
+mapped to their cohort with searchsorted over the sorted id array, and the
+retention matrix and funnel counts are accumulated with bincount / add.at,
+so memory is bounded by the user count, not the attempt count.
+
+The funnel is strict: a user counts at a step only if they also reached
+every earlier step (signup -> first attempt -> completed mock test ->
+7-day streak).
+"""
+
+import logging
+from datetime import date
+from itertools import islice
+
+import numpy as np
+from django.db import transaction
+from django.db.models import DateField
+from django.db.models.functions import TruncDate, TruncWeek
+from django.utils import timezone
+
+from src.models.analytics import CohortSummary
+from src.models.attempt_answer import UserAttempt
+from src.models.user import User
+from src.models.user_stats import UserStatistics
+
+logger = logging.getLogger(__name__)
+
+MAX_WEEKS = 26
+CHUNK_SIZE = 50_000
+# A Monday, so whole-week offsets from it are ISO weeks
+EPOCH = np.datetime64(date(1970, 1, 5), "D")
+
+
+def _week_index(dates):
+    """Week numbers (since EPOCH) of a sequence of dates."""
+    return (np.asarray(dates, dtype="datetime64[D]") - EPOCH).astype(np.int64) // 7
+
+
+def _chunks(queryset):
+    """Stream ``values_list`` rows in CHUNK_SIZE lists of tuples."""
+    rows = queryset.iterator(chunk_size=CHUNK_SIZE)
+    while chunk := list(islice(rows, CHUNK_SIZE)):
+        yield chunk
+
+
+def _locate(sorted_ids, ids):
+    """Positions of ``ids`` in ``sorted_ids`` and a mask of those found."""
+    pos = np.searchsorted(sorted_ids, ids).clip(max=len(sorted_ids) - 1)
+    return pos, sorted_ids[pos] == ids
+
+
+def _user_ids(queryset):
+    ids = [np.asarray(chunk, dtype=np.int64) for chunk in _chunks(queryset)]
+    return np.concatenate(ids) if ids else np.empty(0, dtype=np.int64)
+
+
+def build_cohorts(max_weeks=MAX_WEEKS):
+    """Rebuild every CohortSummary row. Returns the number of cohorts."""
+    tz = timezone.get_current_timezone()
+
+    user_ids, signup_weeks = [], []
+    for chunk in _chunks(
+        User.objects.order_by("id").values_list(
+            "id", TruncDate("date_joined", tzinfo=tz)
+        )
+    ):
+        ids, days = zip(*chunk)
+        user_ids.append(np.asarray(ids, dtype=np.int64))
+        signup_weeks.append(_week_index(days))
+    if not user_ids:
+        CohortSummary.objects.all().delete()
+        return 0
+    user_ids = np.concatenate(user_ids)
+    signup_weeks = np.concatenate(signup_weeks)
+
+    weeks, cohort_of_user = np.unique(signup_weeks, return_inverse=True)
+    n_cohorts = len(weeks)
+
+    retention = np.zeros((n_cohorts, max_weeks), dtype=np.int64)
+    attempted = np.zeros(len(user_ids), dtype=bool)
+    for chunk in _chunks(
+        UserAttempt.objects.annotate(
+            week=TruncWeek("start_time", tzinfo=tz, output_field=DateField())
+        )
+        .values_list("user_id", "week")
+        .distinct()
+        .order_by()
+    ):
+        ids, active_weeks = zip(*chunk)
+        ids = np.asarray(ids, dtype=np.int64)
+        active_weeks = _week_index(active_weeks)
+        pos, known = _locate(user_ids, ids)
+        pos, active_weeks = pos[known], active_weeks[known]
+
+        attempted[pos] = True
+        offsets = active_weeks - signup_weeks[pos]
+        keep = (offsets >= 0) & (offsets < max_weeks)
+        np.add.at(retention, (cohort_of_user[pos[keep]], offsets[keep]), 1)
+
+    def flagged(ids):
+        pos, known = _locate(user_ids, ids)
+        flags = np.zeros(len(user_ids), dtype=bool)
+        flags[pos[known]] = True
+        return flags
+
+    completed_mock = attempted & flagged(
+        _user_ids(
+            UserAttempt.objects.filter(status="COMPLETED", mock_test__isnull=False)
+            .values_list("user_id", flat=True)
+            .distinct()
+            .order_by()
+        )
+    )
+    streak_7 = completed_mock & flagged(
+        _user_ids(
+            UserStatistics.objects.filter(longest_streak__gte=7).values_list(
+                "user_id", flat=True
+            )
+        )
+    )
+
+    def per_cohort(flags):
+        return np.bincount(cohort_of_user[flags], minlength=n_cohorts)
+
+    sizes = np.bincount(cohort_of_user, minlength=n_cohorts)
+    first_attempt = per_cohort(attempted)
+    mock_counts = per_cohort(completed_mock)
+    streak_counts = per_cohort(streak_7)
+
+    this_week = int(_week_index([timezone.localdate()])[0])
+    rows = []
+    for i, week in enumerate(weeks):
+        elapsed = min(max_weeks, this_week - int(week) + 1)
+        rows.append(
+            CohortSummary(
+                cohort_week=(EPOCH + int(week) * 7).item(),
+                users=int(sizes[i]),
+                first_attempt=int(first_attempt[i]),
+                completed_mock_test=int(mock_counts[i]),
+                reached_streak_7=int(streak_counts[i]),
+                retention=retention[i, : max(elapsed, 1)].tolist(),
+            )
+        )
+
+    with transaction.atomic():
+        CohortSummary.objects.bulk_create(
+            rows,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["cohort_week"],
+            update_fields=[
+                "users",
+                "first_attempt",
+                "completed_mock_test",
+                "reached_streak_7",
+                "retention",
+                "updated_at",
+            ],
+        )
+        CohortSummary.objects.exclude(
+            cohort_week__in=[row.cohort_week for row in rows]
+        ).delete()
+
+    logger.info("Cohort analytics rebuilt: %d cohorts", len(rows))
+    return len(rows)
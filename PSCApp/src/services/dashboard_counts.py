@@ -0,0 +1,125 @@
+"""
+Tab counters for the staff dashboard list pages.
+
+Each page's counters are one aggregate(Count(..., filter=Q(...))) per table
+instead of a COUNT query per tab, and the result is cached for
+CACHE_TIMEOUT seconds. Moderation actions call invalidate() for the pages
+they change, so staff see their own edits immediately; anything else
+(new contributions, reports) shows up once the entry expires.
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from src.models import Contribution, MockTest, Note, Question, QuestionReport
+
+CACHE_TIMEOUT = 60
+CACHE_KEY = "dashboard:tab_counts:{page}"
+
+CONTRIBUTIONS = "contributions"
+NOTES = "notes"
+QUESTIONS = "questions"
+REPORTS = "reports"
+MOCK_TESTS = "mock_tests"
+USERS = "users"
+
+
+def _counters(page):
+    """(model, {counter name: filter}) pairs for a page; None counts all rows."""
+    if page == CONTRIBUTIONS:
+        return [
+            (
+                Contribution,
+                {
+                    "pending_count": Q(status="PENDING"),
+                    "approved_count": Q(status="APPROVED"),
+                    "rejected_count": Q(status="REJECTED"),
+                    "public_count": Q(status="MADE_PUBLIC"),
+                },
+            )
+        ]
+    if page == NOTES:
+        return [
+            (
+                Note,
+                {
+                    "pending_count": Q(status="PENDING_REVIEW"),
+                    "approved_count": Q(status="APPROVED"),
+                    "rejected_count": Q(status="REJECTED"),
+                },
+            )
+        ]
+    if page == QUESTIONS:
+        return [
+            (
+                Question,
+                {
+                    "public_count": Q(status="PUBLIC"),
+                    "pending_count": Q(status="PENDING_REVIEW"),
+                    "draft_count": Q(status="DRAFT"),
+                    "reported_count": Q(reported_count__gt=0),
+                },
+            )
+        ]
+    if page == REPORTS:
+        return [
+            (
+                QuestionReport,
+                {
+                    "pending_count": Q(status="PENDING"),
+                    "under_review_count": Q(status="UNDER_REVIEW"),
+                    "resolved_count": Q(status="RESOLVED"),
+                },
+            ),
+            (Question, {"high_priority_count": Q(reported_count__gte=3)}),
+        ]
+    if page == MOCK_TESTS:
+        return [
+            (
+                MockTest,
+                {
+                    "official_count": Q(test_type="OFFICIAL"),
+                    "community_count": Q(test_type="COMMUNITY"),
+                    "custom_count": Q(test_type="CUSTOM"),
+                },
+            )
+        ]
+    if page == USERS:
+        return [
+            (
+                User,
+                {
+                    "total_count": None,
+                    "staff_count": Q(is_staff=True),
+                    "active_count": Q(
+                        is_active=True,
+                        last_login__gte=timezone.now() - timedelta(days=30),
+                    ),
+                },
+            )
+        ]
+    raise ValueError(f"Unknown dashboard page: {page}")
+
+
+def tab_counts(page):
+    """The page's counters as {name: count}, from the cache when fresh."""
+    key = CACHE_KEY.format(page=page)
+    counts = cache.get(key)
+    if counts is None:
+        counts = {}
+        for model, filters in _counters(page):
+            counts.update(
+                model.objects.aggregate(
+                    **{name: Count("pk", filter=q) for name, q in filters.items()}
+                )
+            )
+        cache.set(key, counts, CACHE_TIMEOUT)
+    return counts
+
+
+def invalidate(*pages):
+    cache.delete_many([CACHE_KEY.format(page=page) for page in pages])
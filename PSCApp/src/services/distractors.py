@@ -0,0 +1,97 @@
+"""
+Distractor analysis.
+
+Answer.selection_count is maintained incrementally by UserAnswer.save and the
+UserAnswer post_delete signal, so the per-option distribution is always
+available without grouping user_answers at request time. This module holds
+the nightly job that turns those counters into Question.distractor_flag, and
+a rebuild helper for repairing counter drift (e.g. after raw SQL imports).
+"""
+
+import logging
+from itertools import groupby
+
+from django.db import transaction
+from django.db.models import Count
+
+from src.models.attempt_answer import UserAnswer
+from src.models.question_answer import Answer, Question
+
+logger = logging.getLogger(__name__)
+
+# Selections a question needs before its distractors are judged
+MIN_SELECTIONS = 30
+BATCH_SIZE = 1000
+
+
+def classify(options, min_selections=MIN_SELECTIONS):
+    """
+    Flag for one question given [(is_correct, selection_count), ...].
+    A wrong option out-drawing the key is the stronger signal, so it wins.
+    """
+    total = sum(count for _, count in options)
+    correct = [count for is_correct, count in options if is_correct]
+    wrong = [count for is_correct, count in options if not is_correct]
+    if total < min_selections or len(correct) != 1 or not wrong:
+        return ""
+    if max(wrong) > correct[0]:
+        return "DISTRACTOR_BEATS_KEY"
+    if min(wrong) == 0:
+        return "UNUSED_DISTRACTOR"
+    return ""
+
+
+def flag_questions(min_selections=MIN_SELECTIONS):
+    """
+    Recompute Question.distractor_flag for every question with answer options,
+    streaming Answer counters in question order. Only questions whose flag
+    changes are written. Returns {flag: questions_now_carrying_it}.
+    """
+    current = dict(
+        Question.objects.exclude(distractor_flag="").values_list(
+            "id", "distractor_flag"
+        )
+    )
+    options = (
+        Answer.objects.order_by("question_id")
+        .values_list("question_id", "is_correct", "selection_count")
+        .iterator(chunk_size=5000)
+    )
+
+    changed = []
+    summary = {"DISTRACTOR_BEATS_KEY": 0, "UNUSED_DISTRACTOR": 0}
+    for question_id, rows in groupby(options, key=lambda row: row[0]):
+        flag = classify([(row[1], row[2]) for row in rows], min_selections)
+        if flag:
+            summary[flag] += 1
+        if current.get(question_id, "") != flag:
+            changed.append(Question(id=question_id, distractor_flag=flag))
+
+    Question.objects.bulk_update(changed, ["distractor_flag"], batch_size=BATCH_SIZE)
+    logger.info(
+        "Distractor analysis: %d questions changed flag (%s)", len(changed), summary
+    )
+    return summary
+
+
+def rebuild_selection_counts():
+    """Recount Answer.selection_count from user_answers in one GROUP BY."""
+    counts = dict(
+        UserAnswer.objects.filter(selected_answer__isnull=False)
+        .values_list("selected_answer_id")
+        .annotate(n=Count("id"))
+        .order_by()
+    )
+
+    changed = []
+    for answer_id, stored in Answer.objects.values_list(
+        "id", "selection_count"
+    ).iterator(chunk_size=5000):
+        actual = counts.get(answer_id, 0)
+        if stored != actual:
+            changed.append(Answer(id=answer_id, selection_count=actual))
+
+    with transaction.atomic():
+        Answer.objects.bulk_update(changed, ["selection_count"], batch_size=BATCH_SIZE)
+    logger.info("Rebuilt selection counts: %d answers corrected", len(changed))
+    return len(changed)
@@ -0,0 +1,151 @@
+"""
+In-process stand-in for the Expo push API, for tests and load benchmarks.
+
+FakeExpo is a plain ASGI app serving ``POST .../push/send`` and
+``POST .../push/getReceipts`` (any path prefix, so EXPO_API_URL can point at
+it when served by an ASGI server). Behaviour is configurable:
+
+* ``latency``: seconds added to every request;
+* ``throttle_rate``: fraction of requests answered with 429 + Retry-After;
+* ``error_rate``: fraction of messages given a MessageRateExceeded ticket;
+* ``unregistered_rate``: fraction of messages given a DeviceNotRegistered
+  receipt (tokens containing "unregistered" always are).
+
+Use it in-process through ``httpx.ASGITransport(app=FakeExpo(...))``, which
+ExpoPushClient accepts as ``transport``. ``stats`` counts what it served.
+"""
+
+import asyncio
+import json
+import random
+import uuid
+
+MAX_BATCH = 100
+
+
+class FakeExpo:
+    def __init__(
+        self,
+        latency=0.0,
+        throttle_rate=0.0,
+        error_rate=0.0,
+        unregistered_rate=0.0,
+        seed=None,
+    ):
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.unregistered_rate = unregistered_rate
+        self.random = random.Random(seed)
+        self.receipts = {}
+        self.stats = {
+            "requests": 0,
+            "throttled": 0,
+            "messages": 0,
+            "tickets_ok": 0,
+            "tickets_error": 0,
+            "receipt_requests": 0,
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+
+        status, payload, headers = await self.handle(
+            scope["method"], scope["path"], body
+        )
+        data = json.dumps(payload).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(data)).encode()),
+                    *headers,
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": data})
+
+    async def handle(self, method, path, body):
+        self.stats["requests"] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if method != "POST":
+            return 405, {"errors": [{"message": "Method not allowed"}]}, []
+        if self.random.random() < self.throttle_rate:
+            self.stats["throttled"] += 1
+            return (
+                429,
+                {"errors": [{"code": "TOO_MANY_REQUESTS"}]},
+                [(b"retry-after", b"0")],
+            )
+
+        try:
+            payload = json.loads(body or b"null")
+        except ValueError:
+            return 400, {"errors": [{"message": "Invalid JSON"}]}, []
+        if path.endswith("/push/send"):
+            return self.push_send(payload)
+        if path.endswith("/push/getReceipts"):
+            return self.get_receipts(payload)
+        return 404, {"errors": [{"message": "Not found"}]}, []
+
+    def push_send(self, payload):
+        messages = payload if isinstance(payload, list) else [payload]
+        if len(messages) > MAX_BATCH:
+            return 400, {"errors": [{"code": "PUSH_TOO_MANY_NOTIFICATIONS"}]}, []
+
+        tickets = []
+        for message in messages:
+            self.stats["messages"] += 1
+            token = message.get("to", "")
+            if not token.startswith("ExponentPushToken["):
+                tickets.append(self._error("DeviceNotRegistered", token))
+            elif self.random.random() < self.error_rate:
+                tickets.append(self._error("MessageRateExceeded", token))
+            else:
+                ticket_id = str(uuid.uuid4())
+                dead = (
+                    "unregistered" in token
+                    or self.random.random() < self.unregistered_rate
+                )
+                self.receipts[ticket_id] = (
+                    self._error("DeviceNotRegistered", token)
+                    if dead
+                    else {"status": "ok"}
+                )
+                tickets.append({"status": "ok", "id": ticket_id})
+                self.stats["tickets_ok"] += 1
+                continue
+            self.stats["tickets_error"] += 1
+
+        data = tickets if isinstance(payload, list) else tickets[0]
+        return 200, {"data": data}, []
+
+    def get_receipts(self, payload):
+        self.stats["receipt_requests"] += 1
+        ids = (payload or {}).get("ids", [])
+        return (
+            200,
+            {"data": {i: self.receipts[i] for i in ids if i in self.receipts}},
+            [],
+        )
+
+    @staticmethod
+    def _error(code, token):
+        return {
+            "status": "error",
+            "message": f"{token} failed with {code}",
+            "details": {"error": code},
+        }
+
+
+app = FakeExpo()
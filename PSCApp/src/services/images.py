@@ -0,0 +1,147 @@
+"""
+Image derivative generation.
+
+Produces fixed-width WebP/JPEG variants of uploaded images and stores them
+next to the original through the field's storage backend (local filesystem
+or S3 via django-storages). The generated storage names are recorded on the
+model in a ``<field>_variants`` JSON field so serializers can expose a
+srcset-style map without touching storage.
+"""
+
+import io
+import logging
+import posixpath
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVE_WIDTHS = (160, 320, 640)
+
+# format key -> (PIL format, file extension, save options)
+DERIVATIVE_FORMATS = {
+    "webp": ("WEBP", "webp", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", "jpg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+# (app_label.ModelName, image field) pairs that get derivatives on upload
+IMAGE_DERIVATIVE_FIELDS = {
+    "src.Question": ["image"],
+    "src.Category": ["icon"],
+    "src.SubBranch": ["icon"],
+    "src.UserProfile": ["profile_picture"],
+}
+
+
+def variants_field_name(field_name: str) -> str:
+    return f"{field_name}_variants"
+
+
+def derivative_name(source_name: str, width: int, extension: str) -> str:
+    """e.g. question_images/diagram.png -> question_images/diagram__w320.webp"""
+    directory, filename = posixpath.split(source_name)
+    stem = posixpath.splitext(filename)[0]
+    return posixpath.join(directory, f"{stem}__w{width}.{extension}")
+
+
+def needs_derivatives(instance, field_name: str) -> bool:
+    """True when the current file has not been processed yet."""
+    field_file = getattr(instance, field_name)
+    variants = getattr(instance, variants_field_name(field_name)) or {}
+    if not field_file:
+        return bool(variants)
+    return variants.get("source") != field_file.name
+
+
+def _render(image, width, pil_format, options):
+    if image.width > width:
+        height = max(1, round(image.height * width / image.width))
+        image = image.resize((width, height), Image.LANCZOS)
+
+    if pil_format == "JPEG" and image.mode != "RGB":
+        # JPEG has no alpha channel: flatten onto white
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        rgba = image.convert("RGBA")
+        background.paste(rgba, mask=rgba.split()[-1])
+        image = background
+    elif pil_format == "WEBP" and image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA")
+
+    buffer = io.BytesIO()
+    image.save(buffer, format=pil_format, **options)
+    return buffer.getvalue()
+
+
+def _variant_names(variants: dict) -> set:
+    return {
+        name
+        for key in DERIVATIVE_FORMATS
+        for name in (variants.get(key) or {}).values()
+    }
+
+
+def delete_derivatives(storage, variants: dict, keep: dict | None = None):
+    """Remove stale derivative files, sparing any reused by ``keep``."""
+    stale = _variant_names(variants) - _variant_names(keep or {})
+    for name in stale:
+        try:
+            storage.delete(name)
+        except Exception as e:
+            logger.warning("Failed to delete image derivative %s: %s", name, e)
+
+
+def generate_derivatives(field_file, widths=DERIVATIVE_WIDTHS) -> dict:
+    """
+    Render every (width, format) variant of ``field_file`` and save it next
+    to the original. Returns the variants map to store on the model:
+    {"source": name, "webp": {"160": name, ...}, "jpeg": {...}}
+    """
+    storage = field_file.storage
+    source_name = field_file.name
+
+    with storage.open(source_name, "rb") as fh:
+        image = Image.open(fh)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    variants = {"source": source_name}
+    for key, (pil_format, extension, options) in DERIVATIVE_FORMATS.items():
+        variants[key] = {}
+        for width in widths:
+            # Never upscale: widths beyond the original reuse its size once
+            target = min(width, image.width)
+            if target != width and str(image.width) in variants[key]:
+                continue
+            name = derivative_name(source_name, target, extension)
+            if storage.exists(name):
+                storage.delete(name)
+            content = ContentFile(_render(image, target, pil_format, options))
+            variants[key][str(target)] = storage.save(name, content)
+
+    return variants
+
+
+def build_srcset(field_file, variants, request=None):
+    """
+    Serialize a variants map into URLs:
+    {"webp": {"160": url, ...}, "jpeg": {...}}
+
+    Returns None when the file has no (current) derivatives yet, so clients
+    fall back to the original URL.
+    """
+    if not field_file or not variants or variants.get("source") != field_file.name:
+        return None
+
+    storage = field_file.storage
+    srcset = {}
+    for key in DERIVATIVE_FORMATS:
+        urls = {}
+        for width, name in (variants.get(key) or {}).items():
+            url = storage.url(name)
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            urls[width] = url
+        if urls:
+            srcset[key] = urls
+    return srcset or None
@@ -0,0 +1,325 @@
+"""
+Live leaderboards on Redis sorted sets.
+
+Every completed mock test attempt is added with ZINCRBY to one board per
+period for its branch, and another for its sub-branch when it has one:
+
+    lb:{period}:{bucket}:b{branch_id}:s{sub_branch_id or 0}
+
+``bucket`` is the ISO week (2026W42), the month (202610) or "all", so weekly
+and monthly boards roll over by name and expire through their TTL. Each board
+has a companion hash ({board}:stats) with per-user test counts and summed
+percentages for accuracy, and every board key is registered in
+``lb:boards`` so the periodic sync can find them.
+
+Rank and top-N reads are ZREVRANK / ZREVRANGE, i.e. O(log n). The SQL
+LeaderBoard table is updated from the current buckets by sync_to_database()
+for durability, admin and the regular list API; while live boards are on,
+this sync is the only writer (the SQL recalculation is skipped), and both
+use the same calendar week / month periods. Without Redis (REDIS_URL unset)
+every function here is a no-op returning None/False and the SQL path in
+LeaderBoard is used instead.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from src.services.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+PERIODS = ("WEEKLY", "MONTHLY", "ALL_TIME")
+
+# Keep a finished bucket around long enough for the final sync and for
+# "last week" style reads; ALL_TIME never expires.
+PERIOD_TTL = {
+    "WEEKLY": int(timedelta(days=15).total_seconds()),
+    "MONTHLY": int(timedelta(days=70).total_seconds()),
+    "ALL_TIME": None,
+}
+
+BOARD_REGISTRY = "lb:boards"
+ATTEMPT_MARKER_TTL = int(timedelta(days=90).total_seconds())
+
+
+def is_enabled():
+    return get_redis() is not None
+
+
+def period_bucket(period, when=None):
+    when = timezone.localtime(when) if when else timezone.localtime()
+    if period == "WEEKLY":
+        year, week, _ = when.isocalendar()
+        return f"{year}W{week:02d}"
+    if period == "MONTHLY":
+        return f"{when:%Y%m}"
+    return "all"
+
+
+def period_start(period, when=None):
+    """Start of the bucket containing ``when`` (None for ALL_TIME)."""
+    when = timezone.localtime(when) if when else timezone.localtime()
+    midnight = when.replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == "WEEKLY":
+        return midnight - timedelta(days=midnight.weekday())
+    if period == "MONTHLY":
+        return midnight.replace(day=1)
+    return None
+
+
+def board_key(period, branch_id, sub_branch_id=None, bucket=None):
+    bucket = bucket or period_bucket(period)
+    return f"lb:{period}:{bucket}:b{branch_id}:s{sub_branch_id or 0}"
+
+
+def parse_board_key(key):
+    """Inverse of board_key: (period, bucket, branch_id, sub_branch_id)."""
+    _, period, bucket, branch, sub_branch = key.split(":")
+    return period, bucket, int(branch[1:]), int(sub_branch[1:]) or None
+
+
+def _stats_key(key):
+    return f"{key}:stats"
+
+
+def _boards_for(period, branch_id, sub_branch_id, bucket):
+    keys = [board_key(period, branch_id, None, bucket)]
+    if sub_branch_id:
+        keys.append(board_key(period, branch_id, sub_branch_id, bucket))
+    return keys
+
+
+def _add(pipe, key, period, user_id, score, tests, percentage_sum):
+    stats = _stats_key(key)
+    pipe.zincrby(key, score, user_id)
+    pipe.hincrby(stats, f"{user_id}:tests", tests)
+    pipe.hincrbyfloat(stats, f"{user_id}:pct", percentage_sum)
+    if PERIOD_TTL[period]:
+        pipe.expire(key, PERIOD_TTL[period])
+        pipe.expire(stats, PERIOD_TTL[period])
+    pipe.sadd(BOARD_REGISTRY, key)
+
+
+def record_attempt(attempt):
+    """
+    Add a completed attempt to its live boards. Returns True when recorded;
+    False when Redis is unavailable, the attempt has no branch, or it was
+    already recorded (guarded by a per-attempt marker).
+    """
+    r = get_redis()
+    mock_test = attempt.mock_test
+    if r is None or mock_test is None or not mock_test.branch_id:
+        return False
+
+    marker = f"lb:attempt:{attempt.pk}"
+    try:
+        if not r.set(marker, 1, nx=True, ex=ATTEMPT_MARKER_TTL):
+            return False
+    except Exception as e:
+        logger.warning("Failed to record attempt %s on live boards: %s", attempt.pk, e)
+        return False
+
+    try:
+        when = attempt.end_time or attempt.start_time or timezone.now()
+        score = float(attempt.score_obtained or 0)
+        percentage = float(attempt.percentage or 0)
+        pipe = r.pipeline()
+        for period in PERIODS:
+            bucket = period_bucket(period, when)
+            for key in _boards_for(
+                period, mock_test.branch_id, mock_test.sub_branch_id, bucket
+            ):
+                _add(pipe, key, period, attempt.user_id, score, 1, percentage)
+        pipe.execute()
+        return True
+    except Exception as e:
+        # The MULTI did not run: release the marker so a retry can count it
+        try:
+            r.delete(marker)
+        except Exception:
+            pass
+        logger.warning("Failed to record attempt %s on live boards: %s", attempt.pk, e)
+        return False
+
+
+def _hydrate(r, key, members, start_rank):
+    if not members:
+        return []
+    fields = []
+    for member, _ in members:
+        user_id = int(member)
+        fields.extend([f"{user_id}:tests", f"{user_id}:pct"])
+    values = r.hmget(_stats_key(key), fields)
+
+    entries = []
+    for index, (member, score) in enumerate(members):
+        tests = int(values[2 * index] or 0)
+        percentage_sum = float(values[2 * index + 1] or 0)
+        entries.append(
+            {
+                "user_id": int(member),
+                "rank": start_rank + index,
+                "total_score": round(score, 2),
+                "tests_completed": tests,
+                "accuracy_percentage": round(percentage_sum / tests, 2) if tests else 0,
+            }
+        )
+    return entries
+
+
+def top(period, branch_id, sub_branch_id=None, limit=10, offset=0):
+    """Top ``limit`` entries of the current bucket, or None without Redis."""
+    r = get_redis()
+    if r is None:
+        return None
+    key = board_key(period, branch_id, sub_branch_id)
+    members = r.zrevrange(key, offset, offset + limit - 1, withscores=True)
+    return _hydrate(r, key, members, offset + 1)
+
+
+def user_entry(user_id, period, branch_id, sub_branch_id=None):
+    """A user's live entry, None if unranked or without Redis."""
+    r = get_redis()
+    if r is None:
+        return None
+    key = board_key(period, branch_id, sub_branch_id)
+    pipe = r.pipeline()
+    pipe.zrevrank(key, user_id)
+    pipe.zscore(key, user_id)
+    rank, score = pipe.execute()
+    if rank is None:
+        return None
+    return _hydrate(r, key, [(user_id, score)], rank + 1)[0]
+
+
+def around(user_id, period, branch_id, sub_branch_id=None, n=5):
+    """
+    The user's live entry with up to ``n`` neighbours on each side: one
+    ZREVRANK and one ZREVRANGE. [] if unranked, None without Redis.
+    """
+    r = get_redis()
+    if r is None:
+        return None
+    key = board_key(period, branch_id, sub_branch_id)
+    rank = r.zrevrank(key, user_id)
+    if rank is None:
+        return []
+    start = max(0, rank - n)
+    members = r.zrevrange(key, start, rank + n, withscores=True)
+    return _hydrate(r, key, members, start + 1)
+
+
+def _read_board(r, key, page_size):
+    entries = []
+    start = 0
+    while True:
+        members = r.zrevrange(key, start, start + page_size - 1, withscores=True)
+        if not members:
+            return entries
+        entries.extend(_hydrate(r, key, members, start + 1))
+        start += len(members)
+
+
+def sync_to_database(page_size=1000):
+    """
+    Bring SQL LeaderBoard rows in line with the current live buckets (only
+    changed rows are written). Boards whose period rolled over without a new
+    attempt yet are written empty, so last week's ranking does not linger.
+    Returns the number of boards synced.
+    """
+    from src.models.analytics import LeaderBoard
+
+    r = get_redis()
+    if r is None:
+        return 0
+
+    registered = {
+        key.decode() if isinstance(key, bytes) else key
+        for key in r.smembers(BOARD_REGISTRY)
+    }
+    current = {period: period_bucket(period) for period in PERIODS}
+    targets = {}
+    for key in registered:
+        period, bucket, branch_id, sub_branch_id = parse_board_key(key)
+        board = (period, branch_id, sub_branch_id)
+        if bucket == current[period]:
+            targets[board] = key
+        else:
+            targets.setdefault(board, None)
+            if not r.exists(key):
+                r.srem(BOARD_REGISTRY, key)
+
+    for (period, branch_id, sub_branch_id), key in targets.items():
+        entries = _read_board(r, key, page_size) if key else []
+        LeaderBoard.replace_board(period, branch_id, sub_branch_id, entries)
+
+    logger.info("Synced %d live leaderboards to the database", len(targets))
+    return len(targets)
+
+
+def rebuild_from_database(periods=PERIODS):
+    """
+    Re-seed the current buckets from completed attempts, e.g. after enabling
+    Redis or losing its data. Returns the number of (branch, sub-branch, user)
+    rows loaded.
+    """
+    from src.models.analytics import LeaderBoard
+
+    r = get_redis()
+    if r is None:
+        return 0
+
+    loaded = 0
+    for period in periods:
+        bucket = period_bucket(period)
+        for key in r.smembers(BOARD_REGISTRY):
+            key = key.decode() if isinstance(key, bytes) else key
+            if key.startswith(f"lb:{period}:{bucket}:"):
+                r.delete(key, _stats_key(key))
+
+        attempts = LeaderBoard._ranked_attempts().filter(
+            mock_test__branch__isnull=False
+        )
+        start = period_start(period)
+        if start is not None:
+            attempts = attempts.filter(finished_at__gte=start)
+
+        rows = (
+            attempts.values(
+                "mock_test__branch_id", "mock_test__sub_branch_id", "user_id"
+            )
+            .annotate(
+                score=Sum("score_obtained"),
+                tests=Count("id"),
+                percentage_sum=Sum("percentage"),
+            )
+            .order_by()
+        )
+
+        pipe = r.pipeline(transaction=False)
+        for row in rows.iterator(chunk_size=5000):
+            for key in _boards_for(
+                period,
+                row["mock_test__branch_id"],
+                row["mock_test__sub_branch_id"],
+                bucket,
+            ):
+                _add(
+                    pipe,
+                    key,
+                    period,
+                    row["user_id"],
+                    float(row["score"] or 0),
+                    row["tests"],
+                    float(row["percentage_sum"] or 0),
+                )
+            loaded += 1
+            if len(pipe) >= 5000:
+                pipe.execute()
+        pipe.execute()
+
+    logger.info("Rebuilt live leaderboards from %d database rows", loaded)
+    return loaded
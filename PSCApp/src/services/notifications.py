@@ -0,0 +1,363 @@
+"""
+Notification outbox dispatcher.
+
+Notification.save writes a NotificationOutbox row in the same transaction as
+the notification itself and returns; delivery happens here, on the
+notifications Celery queue. Each pass claims a batch of due entries (row
+locks with SKIP LOCKED plus a short lease, so concurrent workers never share
+an entry), then:
+
+* sends the batch's realtime events from one event loop entry, with at most
+  REALTIME_CONCURRENCY channel layer calls in flight, skipping users the
+  presence registry (src.services.presence) shows with no open socket;
+* posts Expo pushes through ExpoPushClient (pooled connection, concurrent
+  100-message batches), recording tickets for the receipt check.
+
+Bulk sends (Notification.enqueue_bulk) start several dispatchers at once;
+they share the outbox through the row locks, and a run that hits its batch
+cap re-queues itself, so large fan-outs drain without waiting for beat.
+
+Entries that fail are retried with exponential backoff (see
+NotificationOutbox.backoff) and marked FAILED after MAX_ATTEMPTS. Realtime
+and push progress are tracked separately so a retry never repeats a channel
+that already succeeded.
+"""
+
+import asyncio
+import logging
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.utils import timezone
+
+from src.models.notification import (
+    Notification,
+    NotificationArchive,
+    NotificationOutbox,
+)
+from src.models.user import UserProfile
+from src.services import presence
+from src.services.push import prune_tokens, record_tickets, send_push_messages
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = NotificationOutbox.DISPATCH_BATCH
+REALTIME_CONCURRENCY = 100
+CLAIM_LEASE = timedelta(minutes=5)
+
+# Expo ticket errors that a retry cannot fix
+PERMANENT_PUSH_ERRORS = {"DeviceNotRegistered", "MessageTooBig", "InvalidCredentials"}
+
+
+def claim_batch(limit=BATCH_SIZE):
+    """Lock and lease up to ``limit`` due entries; returns them hydrated."""
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            NotificationOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status="PENDING", next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")
+            .values_list("id", flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        NotificationOutbox.objects.filter(id__in=ids).update(
+            next_attempt_at=now + CLAIM_LEASE
+        )
+    return list(
+        NotificationOutbox.objects.filter(id__in=ids).select_related(
+            "notification__user__profile"
+        )
+    )
+
+
+def _send_realtime(entries):
+    """Returns {entry_id: error} for entries whose event could not be sent."""
+    channel_layer = get_channel_layer()
+    if channel_layer is None or not entries:
+        return {}
+
+    async def send(semaphore, entry):
+        async with semaphore:
+            await channel_layer.group_send(
+                f"user_{entry.notification.user_id}",
+                {
+                    "type": "send_notification",
+                    "data": entry.notification.realtime_payload(),
+                },
+            )
+
+    async def send_all():
+        semaphore = asyncio.Semaphore(REALTIME_CONCURRENCY)
+        return await asyncio.gather(
+            *(send(semaphore, entry) for entry in entries),
+            return_exceptions=True,
+        )
+
+    try:
+        results = async_to_sync(send_all)()
+    except Exception as e:
+        return {entry.id: e for entry in entries}
+    return {
+        entry.id: result
+        for entry, result in zip(entries, results)
+        if isinstance(result, Exception)
+    }
+
+
+def _push_message(notification):
+    """The Expo message for ``notification``, or None if nothing to push."""
+    try:
+        profile = notification.user.profile
+    except ObjectDoesNotExist:
+        return None
+    token = profile.expo_push_token
+    if not profile.push_notifications_enabled or not token:
+        return None
+    if not token.startswith("ExponentPushToken["):
+        return None
+    return {
+        "to": token,
+        "title": notification.title_en,
+        "body": notification.message_en,
+        "sound": "default",
+        "badge": notification.cached_unread_count(),
+        "data": notification.push_data(),
+    }
+
+
+def _send_push(entries, counts):
+    """Returns {entry_id: error} for pushes that should be retried."""
+    pending = []
+    for entry in entries:
+        message = _push_message(entry.notification)
+        if message is None:
+            entry.push_done = True
+            counts["push_skipped"] += 1
+        else:
+            pending.append((entry, message))
+    if not pending:
+        return {}
+
+    errors = {}
+    accepted = []
+    dead = set()
+    tickets = send_push_messages([message for _, message in pending])
+    for (entry, message), ticket in zip(pending, tickets):
+        if ticket.get("status") == "ok":
+            entry.push_done = True
+            counts["push_sent"] += 1
+            if ticket.get("id"):
+                accepted.append((ticket["id"], message["to"]))
+            continue
+        error = ticket.get("details", {}).get("error")
+        if error in PERMANENT_PUSH_ERRORS:
+            entry.push_done = True
+            entry.last_error = f"{error}: {ticket.get('message', '')}"
+            counts["push_rejected"] += 1
+            if error == "DeviceNotRegistered":
+                dead.add(message["to"])
+            continue
+        errors[entry.id] = ticket.get("message", "Unknown error")
+    counts["push_errors"] += len(errors)
+    record_tickets(accepted)
+    prune_tokens(dead)
+    return errors
+
+
+def _new_summary():
+    return dict.fromkeys(
+        [
+            "sent",
+            "retrying",
+            "failed",
+            "realtime_sent",
+            "realtime_skipped",
+            "realtime_errors",
+            "push_sent",
+            "push_skipped",
+            "push_rejected",
+            "push_errors",
+        ],
+        0,
+    )
+
+
+def process_batch(entries, summary=None):
+    """
+    Deliver claimed entries and record the outcome, adding entry and
+    per-channel counts to ``summary``. Returns the summary.
+    """
+    summary = summary if summary is not None else _new_summary()
+    realtime = [e for e in entries if not e.realtime_done]
+    online = presence.online_users(e.notification.user_id for e in realtime)
+    if online is not None:
+        # Nobody is listening: nothing to send, nothing to retry
+        offline = [e for e in realtime if e.notification.user_id not in online]
+        for entry in offline:
+            entry.realtime_done = True
+        summary["realtime_skipped"] += len(offline)
+        realtime = [e for e in realtime if e.notification.user_id in online]
+
+    realtime_errors = _send_realtime(realtime)
+    for entry in realtime:
+        if entry.id not in realtime_errors:
+            entry.realtime_done = True
+    summary["realtime_sent"] += len(realtime) - len(realtime_errors)
+    summary["realtime_errors"] += len(realtime_errors)
+    push_errors = _send_push([e for e in entries if not e.push_done], summary)
+
+    now = timezone.now()
+    for entry in entries:
+        if entry.realtime_done and entry.push_done:
+            entry.status = "SENT"
+            entry.sent_at = now
+            summary["sent"] += 1
+            continue
+        entry.record_failure(
+            push_errors.get(entry.id) or realtime_errors.get(entry.id), now
+        )
+        if entry.status != "FAILED":
+            summary["retrying"] += 1
+        else:
+            summary["failed"] += 1
+            logger.warning(
+                "Notification %s undeliverable after %s attempts: %s",
+                entry.notification_id,
+                entry.attempts,
+                entry.last_error,
+            )
+
+    NotificationOutbox.objects.bulk_update(
+        entries,
+        [
+            "status",
+            "realtime_done",
+            "push_done",
+            "attempts",
+            "next_attempt_at",
+            "last_error",
+            "sent_at",
+        ],
+    )
+    return summary
+
+
+def dispatch_pending(batch_size=BATCH_SIZE, max_batches=20):
+    """
+    Drain due outbox entries, at most ``max_batches`` batches per call so one
+    run cannot monopolise the worker. Returns the summary counts plus
+    ``more``: True when the cap was hit with entries possibly left.
+    """
+    summary = _new_summary()
+    more = True
+    for _ in range(max_batches):
+        entries = claim_batch(batch_size)
+        if not entries:
+            more = False
+            break
+        process_batch(entries, summary)
+    if summary["sent"] or summary["retrying"] or summary["failed"]:
+        logger.info("Notification dispatch: %s", summary)
+    return {**summary, "more": more}
+
+
+def publish_unread_counts(user_ids):
+    """
+    Send the cached unread count to every listed user with an open socket,
+    so app badges update without polling. Reads UserProfile only.
+    """
+    online = presence.online_users(user_ids)
+    targets = [u for u in user_ids if online is None or u in online]
+    channel_layer = get_channel_layer()
+    if not targets or channel_layer is None:
+        return 0
+
+    Notification.seed_unread_counts(targets)
+    counts = dict(
+        UserProfile.objects.filter(google_auth_user_id__in=targets).values_list(
+            "google_auth_user_id", "unread_notifications"
+        )
+    )
+
+    async def send_all():
+        semaphore = asyncio.Semaphore(REALTIME_CONCURRENCY)
+
+        async def send(user_id, count):
+            async with semaphore:
+                await channel_layer.group_send(
+                    f"user_{user_id}",
+                    {"type": "send_unread_count", "data": {"unread_count": count}},
+                )
+
+        await asyncio.gather(*(send(u, c) for u, c in counts.items()))
+
+    try:
+        async_to_sync(send_all)()
+    except Exception as e:
+        logger.warning("Failed to publish unread counts: %s", e)
+        return 0
+    return len(counts)
+
+
+def apply_retention(
+    days=None, policy=None, batch_size=1000, max_batches=100, outbox_days=7
+):
+    """
+    Move read notifications older than ``days`` into NotificationArchive
+    (policy "archive") or drop them (policy "delete"), in id-ordered
+    batches of ``batch_size``, each in its own short transaction. Delivered
+    outbox rows older than ``outbox_days`` are cleared too. Unread
+    notifications are never touched. Returns a summary dict whose ``more``
+    is True when the batch cap was hit with notifications possibly left.
+    """
+    days = settings.NOTIFICATION_RETENTION_DAYS if days is None else days
+    policy = policy or settings.NOTIFICATION_RETENTION_POLICY
+    if policy not in ("archive", "delete"):
+        raise ValueError(f"Unknown notification retention policy: {policy}")
+
+    now = timezone.now()
+    expired = Notification.objects.filter(
+        is_read=True, created_at__lt=now - timedelta(days=days)
+    ).order_by("id")
+
+    summary = {"policy": policy, "notifications": 0, "outbox": 0, "more": True}
+    for _ in range(max_batches):
+        rows = list(
+            expired.values("id", *NotificationArchive.ARCHIVED_FIELDS)[:batch_size]
+        )
+        if not rows:
+            summary["more"] = False
+            break
+        ids = [row["id"] for row in rows]
+        with transaction.atomic():
+            if policy == "archive":
+                NotificationArchive.objects.bulk_create(
+                    [
+                        NotificationArchive(original_id=row.pop("id"), **row)
+                        for row in rows
+                    ],
+                    ignore_conflicts=True,
+                )
+            # Cascades to outbox rows
+            Notification.objects.filter(id__in=ids).delete()
+        summary["notifications"] += len(ids)
+
+    sent_before = now - timedelta(days=outbox_days)
+    for _ in range(max_batches):
+        ids = list(
+            NotificationOutbox.objects.filter(status="SENT", sent_at__lt=sent_before)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        NotificationOutbox.objects.filter(id__in=ids).delete()
+        summary["outbox"] += len(ids)
+
+    logger.info("Notification retention: %s", summary)
+    return summary
@@ -0,0 +1,84 @@
+"""
+WebSocket presence registry.
+
+Each open NotificationConsumer socket is a member of a per-user sorted set
+scored by its expiry time:
+
+    presence:user:{user_id}  ->  {channel_name: expires_at}
+
+Consumers add themselves on connect, refresh the score every
+HEARTBEAT_INTERVAL and remove themselves on disconnect; a worker that dies
+without disconnecting simply stops refreshing, and its sockets age out after
+PRESENCE_TTL. Senders ask online_users() before group_send and skip users
+with no live socket.
+
+Presence needs the shared Redis (REDIS_URL). Without it online_users()
+returns None, meaning "unknown", and senders fall back to sending to everyone.
+"""
+
+import logging
+import time
+
+from src.services.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_INTERVAL = 30
+PRESENCE_TTL = 90
+
+
+def _key(user_id):
+    return f"presence:user:{user_id}"
+
+
+def is_enabled():
+    return get_redis() is not None
+
+
+def touch(user_id, channel_name):
+    """Register or refresh one socket. Safe to call on every heartbeat."""
+    r = get_redis()
+    if r is None:
+        return
+    try:
+        now = time.time()
+        pipe = r.pipeline()
+        pipe.zremrangebyscore(_key(user_id), "-inf", now)
+        pipe.zadd(_key(user_id), {channel_name: now + PRESENCE_TTL})
+        pipe.expire(_key(user_id), PRESENCE_TTL)
+        pipe.execute()
+    except Exception as e:
+        logger.warning("Failed to record presence for user %s: %s", user_id, e)
+
+
+def leave(user_id, channel_name):
+    r = get_redis()
+    if r is None:
+        return
+    try:
+        r.zrem(_key(user_id), channel_name)
+    except Exception as e:
+        logger.warning("Failed to clear presence for user %s: %s", user_id, e)
+
+
+def online_users(user_ids):
+    """
+    The subset of ``user_ids`` with at least one live socket, from one
+    pipelined round trip; None when presence is unavailable.
+    """
+    r = get_redis()
+    if r is None:
+        return None
+    user_ids = list(dict.fromkeys(user_ids))
+    if not user_ids:
+        return set()
+    try:
+        pipe = r.pipeline(transaction=False)
+        now = time.time()
+        for user_id in user_ids:
+            pipe.zcount(_key(user_id), now, "+inf")
+        counts = pipe.execute()
+    except Exception as e:
+        logger.warning("Presence lookup failed: %s", e)
+        return None
+    return {user_id for user_id, count in zip(user_ids, counts) if count}
@@ -3,16 +3,273 @@ Expo Push Notification Service.
 
 Uses the Expo Push API to send push notifications to mobile devices.
 Docs: https://docs.expo.dev/push-notifications/sending-notifications/
+
+All traffic goes through ExpoPushClient: one pooled httpx.AsyncClient per
+run (keep-alive, HTTP/2 when enabled and ``h2`` is installed), a bounded
+number of 100-message batches in flight, and jittered exponential backoff on
+429 / 5xx / network errors. Successful tickets are stored as PushTicket rows
+and checked against Expo's receipts later (check_receipts); tokens Expo
+reports as DeviceNotRegistered are cleared from UserProfile so they are not
+pushed to again. EXPO_API_URL can point the client at a local fake server.
 """
 
+import asyncio
 import logging
+import random
+from datetime import timedelta
 from typing import Optional
 
 import httpx
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.utils import timezone
 
 logger = logging.getLogger(__name__)
 
-EXPO_PUSH_URL = "https://exp.host/--/api/v2/push/send"
+BATCH_SIZE = 100
+RECEIPT_BATCH_SIZE = 1000
+
+# Expo recommends fetching receipts about 15 minutes after sending; they
+# are kept for a day
+RECEIPT_DELAY = timedelta(minutes=15)
+RECEIPT_TTL = timedelta(hours=24)
+
+
+def _h2_available():
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class ExpoPushClient:
+    """
+    Async Expo API client, used as ``async with ExpoPushClient() as client``.
+    ``transport`` is passed to httpx, e.g. to talk to an in-process fake.
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    BACKOFF_BASE = 0.5
+    BACKOFF_MAX = 30.0
+
+    def __init__(
+        self,
+        base_url=None,
+        concurrency=None,
+        http2=None,
+        timeout=30,
+        max_retries=3,
+        transport=None,
+    ):
+        self.concurrency = concurrency or settings.EXPO_PUSH_CONCURRENCY
+        self.max_retries = max_retries
+        http2 = settings.EXPO_PUSH_HTTP2 if http2 is None else http2
+        if http2 and not _h2_available():
+            logger.warning(
+                "EXPO_PUSH_HTTP2 is set but h2 is not installed; using HTTP/1.1"
+            )
+            http2 = False
+
+        headers = {
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+            "Content-Type": "application/json",
+        }
+        if settings.EXPO_ACCESS_TOKEN:
+            headers["Authorization"] = f"Bearer {settings.EXPO_ACCESS_TOKEN}"
+
+        self._client = httpx.AsyncClient(
+            base_url=(base_url or settings.EXPO_API_URL).rstrip("/") + "/",
+            headers=headers,
+            timeout=timeout,
+            http2=http2,
+            transport=transport,
+            limits=httpx.Limits(
+                max_connections=self.concurrency,
+                max_keepalive_connections=self.concurrency,
+            ),
+        )
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._client.aclose()
+
+    def _backoff(self, attempt, retry_after=None):
+        delay = min(self.BACKOFF_BASE * 2**attempt, self.BACKOFF_MAX)
+        delay = delay / 2 + random.uniform(0, delay / 2)
+        try:
+            return max(delay, float(retry_after)) if retry_after else delay
+        except ValueError:
+            return delay
+
+    async def _post(self, path, payload):
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                retry_after = None
+                try:
+                    response = await self._client.post(path, json=payload)
+                except httpx.TransportError as e:
+                    error = e
+                else:
+                    if response.status_code not in self.RETRY_STATUSES:
+                        response.raise_for_status()
+                        return response.json()
+                    retry_after = response.headers.get("Retry-After")
+                    error = httpx.HTTPStatusError(
+                        f"Expo returned {response.status_code}",
+                        request=response.request,
+                        response=response,
+                    )
+                if attempt == self.max_retries:
+                    raise error
+                await asyncio.sleep(self._backoff(attempt, retry_after))
+
+    async def _send_batch(self, offset, batch):
+        try:
+            data = (await self._post("push/send", batch)).get("data", [])
+            if len(data) != len(batch):
+                raise ValueError(f"expected {len(batch)} tickets, got {len(data)}")
+            return data
+        except Exception as e:
+            logger.error("Bulk push notification error for batch %d: %s", offset, e)
+            return [
+                {"status": "error", "message": str(e), "transport": True} for _ in batch
+            ]
+
+    async def send(self, messages):
+        """
+        One ticket per message, in order: Expo's ticket, or
+        {"status": "error", "message": ..., "transport": True} when its
+        batch could not be delivered after retries.
+        """
+        results = await asyncio.gather(
+            *(
+                self._send_batch(i, messages[i : i + BATCH_SIZE])
+                for i in range(0, len(messages), BATCH_SIZE)
+            )
+        )
+        return [ticket for batch in results for ticket in batch]
+
+    async def _receipt_batch(self, ids):
+        try:
+            return (await self._post("push/getReceipts", {"ids": ids})).get("data", {})
+        except Exception as e:
+            logger.warning("Failed to fetch %d push receipts: %s", len(ids), e)
+            return {}
+
+    async def get_receipts(self, ticket_ids):
+        """{ticket_id: receipt} for the receipts Expo has ready."""
+        results = await asyncio.gather(
+            *(
+                self._receipt_batch(ticket_ids[i : i + RECEIPT_BATCH_SIZE])
+                for i in range(0, len(ticket_ids), RECEIPT_BATCH_SIZE)
+            )
+        )
+        return {
+            ticket: receipt for batch in results for ticket, receipt in batch.items()
+        }
+
+
+def send_push_messages(messages: list[dict], **client_kwargs) -> list[dict]:
+    """Synchronous wrapper around ExpoPushClient.send."""
+    if not messages:
+        return []
+
+    async def run():
+        async with ExpoPushClient(**client_kwargs) as client:
+            return await client.send(messages)
+
+    return async_to_sync(run)()
+
+
+def get_push_receipts(ticket_ids: list[str], **client_kwargs) -> dict:
+    """Synchronous wrapper around ExpoPushClient.get_receipts."""
+    if not ticket_ids:
+        return {}
+
+    async def run():
+        async with ExpoPushClient(**client_kwargs) as client:
+            return await client.get_receipts(ticket_ids)
+
+    return async_to_sync(run)()
+
+
+def prune_tokens(tokens) -> int:
+    """Clear push tokens Expo reported as no longer registered."""
+    from src.models.user import UserProfile
+
+    tokens = set(tokens)
+    if not tokens:
+        return 0
+    cleared = UserProfile.objects.filter(expo_push_token__in=tokens).update(
+        expo_push_token=None
+    )
+    logger.info("Cleared %d unregistered push tokens", cleared)
+    return cleared
+
+
+def record_tickets(pairs) -> int:
+    """Store (ticket_id, token) pairs of accepted pushes for receipt checks."""
+    from src.models.notification import PushTicket
+
+    tickets = [
+        PushTicket(ticket_id=ticket_id, token=token) for ticket_id, token in pairs
+    ]
+    PushTicket.objects.bulk_create(tickets, batch_size=1000, ignore_conflicts=True)
+    return len(tickets)
+
+
+def check_receipts(**client_kwargs) -> dict:
+    """
+    Fetch receipts for tickets older than RECEIPT_DELAY, prune tokens whose
+    device is no longer registered and drop checked or expired tickets.
+    """
+    from src.models.notification import PushTicket
+
+    now = timezone.now()
+    expired, _ = PushTicket.objects.filter(created_at__lt=now - RECEIPT_TTL).delete()
+    due = PushTicket.objects.filter(created_at__lte=now - RECEIPT_DELAY).order_by("id")
+
+    summary = {"checked": 0, "errors": 0, "pruned": 0, "expired": expired}
+    last_id = 0
+    while True:
+        rows = due.filter(id__gt=last_id).values_list("id", "ticket_id", "token")
+        batch = list(rows[:RECEIPT_BATCH_SIZE])
+        if not batch:
+            break
+        last_id = batch[-1][0]
+        receipts = get_push_receipts(
+            [ticket_id for _, ticket_id, _ in batch], **client_kwargs
+        )
+
+        done = []
+        dead = set()
+        for pk, ticket_id, token in batch:
+            receipt = receipts.get(ticket_id)
+            if receipt is None:
+                continue  # not ready yet; retried until it expires
+            done.append(pk)
+            if receipt.get("status") == "error":
+                summary["errors"] += 1
+                error = receipt.get("details", {}).get("error")
+                if error == "DeviceNotRegistered":
+                    dead.add(token)
+                else:
+                    logger.warning(
+                        "Push receipt error for %s: %s",
+                        ticket_id,
+                        receipt.get("message"),
+                    )
+        summary["checked"] += len(done)
+        summary["pruned"] += prune_tokens(dead)
+        PushTicket.objects.filter(id__in=done).delete()
+
+    logger.info("Push receipts: %s", summary)
+    return summary
 
 
 def send_push_notification(
@@ -39,24 +296,14 @@ def send_push_notification(
     if badge is not None:
         message["badge"] = badge
 
-    try:
-        response = httpx.post(
-            EXPO_PUSH_URL,
-            json=message,
-            headers={
-                "Accept": "application/json",
-                "Content-Type": "application/json",
-            },
-            timeout=10,
-        )
-        result = response.json()
-        if response.status_code == 200 and result.get("data", {}).get("status") == "ok":
-            return True
-        logger.warning("Push notification failed: %s", result)
-        return False
-    except Exception as e:
-        logger.error("Push notification error: %s", e)
-        return False
+    ticket = send_push_messages([message], timeout=10)[0]
+    if ticket.get("status") == "ok":
+        record_tickets([(ticket.get("id"), token)] if ticket.get("id") else [])
+        return True
+    if ticket.get("details", {}).get("error") == "DeviceNotRegistered":
+        prune_tokens([token])
+    logger.warning("Push notification failed: %s", ticket)
+    return False
 
 
 def send_bulk_push_notifications(
@@ -89,36 +336,35 @@ def send_bulk_push_notifications(
             msg["badge"] = badge
         messages.append(msg)
 
+    result = deliver_messages(messages)
+    logger.info("Bulk push: sent=%d, failed=%d", result["sent"], result["failed"])
+    return result
+
+
+def deliver_messages(messages: list[dict]) -> dict:
+    """
+    Send pre-built Expo messages (each with its own ``to``, title and body)
+    in concurrent batches, recording tickets and pruning dead tokens.
+    Returns {"sent": count, "failed": count, "errors": [...]}.
+    """
     sent = 0
     failed = 0
     errors = []
-
-    # Expo recommends batches of 100
-    for i in range(0, len(messages), 100):
-        batch = messages[i : i + 100]
-        try:
-            response = httpx.post(
-                EXPO_PUSH_URL,
-                json=batch,
-                headers={
-                    "Accept": "application/json",
-                    "Content-Type": "application/json",
-                },
-                timeout=30,
-            )
-            result = response.json()
-            for item in result.get("data", []):
-                if item.get("status") == "ok":
-                    sent += 1
-                else:
-                    failed += 1
-                    errors.append(item.get("message", "Unknown error"))
-        except Exception as e:
-            logger.error("Bulk push notification error for batch %d: %s", i, e)
-            failed += len(batch)
-            errors.append(str(e))
-
-    logger.info("Bulk push: sent=%d, failed=%d", sent, failed)
+    accepted = []
+    dead = []
+    for message, ticket in zip(messages, send_push_messages(messages)):
+        token = message["to"]
+        if ticket.get("status") == "ok":
+            sent += 1
+            if ticket.get("id"):
+                accepted.append((ticket["id"], token))
+        else:
+            failed += 1
+            errors.append(ticket.get("message", "Unknown error"))
+            if ticket.get("details", {}).get("error") == "DeviceNotRegistered":
+                dead.append(token)
+    record_tickets(accepted)
+    prune_tokens(dead)
     return {"sent": sent, "failed": failed, "errors": errors[:10]}
 
 
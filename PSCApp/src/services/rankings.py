@@ -0,0 +1,112 @@
+"""
+Precomputed global rankings.
+
+UserStatistics.answers_rank / contribution_rank / accuracy_rank are filled by
+a periodic pass that computes RANK() windows for every row in one query and
+bulk-updates only the rows whose rank moved. Readers (RankingsView and the
+user statistics serializer) just read the stored columns, and the top-100
+rankings payload is cached under a generation number that the pass bumps, so
+serving the rankings screen costs no aggregate queries.
+
+The bump only reaches other processes through a shared cache. Without Redis
+(the per-process LocMem fallback) a bump made by a Celery worker is never
+seen by the web processes, so the payload is cached for a minute instead.
+"""
+
+import logging
+
+from django.core.cache import cache
+from django.db.models import Case, F, FloatField, Value, When, Window
+from django.db.models.functions import Cast, Rank
+
+from src.models.user_stats import UserStatistics
+from src.services.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+RANK_FIELDS = {
+    "answers_rank": "questions_answered",
+    "contribution_rank": "questions_contributed",
+}
+
+TOP_CACHE_TIMEOUT = 60 * 60
+LOCAL_TOP_CACHE_TIMEOUT = 60
+GENERATION_KEY = "rankings:generation"
+BATCH_SIZE = 1000
+
+
+def _rank_by(expression):
+    return Window(expression=Rank(), order_by=expression.desc())
+
+
+def refresh_global_ranks():
+    """
+    Recompute every user's global ranks and invalidate cached top lists.
+    Returns the number of rows updated.
+    """
+    accuracy = Case(
+        When(
+            questions_answered__gt=0,
+            then=Cast("correct_answers", FloatField())
+            / Cast("questions_answered", FloatField()),
+        ),
+        default=Value(-1.0),
+        output_field=FloatField(),
+    )
+    ranked = (
+        UserStatistics.objects.annotate(
+            new_answers_rank=_rank_by(F("questions_answered")),
+            new_contribution_rank=_rank_by(F("questions_contributed")),
+            new_accuracy_rank=_rank_by(accuracy),
+        )
+        .values_list(
+            "id",
+            "questions_answered",
+            "answers_rank",
+            "contribution_rank",
+            "accuracy_rank",
+            "new_answers_rank",
+            "new_contribution_rank",
+            "new_accuracy_rank",
+        )
+        .order_by()
+    )
+
+    fields = ["answers_rank", "contribution_rank", "accuracy_rank"]
+    changed = []
+    updated = 0
+    for row in ranked.iterator(chunk_size=5000):
+        stats_id, answered, *current = row[:5]
+        new = list(row[5:])
+        if not answered:
+            new[2] = None  # accuracy is undefined without answers
+        if current != new:
+            changed.append(UserStatistics(id=stats_id, **dict(zip(fields, new))))
+        if len(changed) >= BATCH_SIZE:
+            UserStatistics.objects.bulk_update(changed, fields)
+            updated += len(changed)
+            changed = []
+    if changed:
+        UserStatistics.objects.bulk_update(changed, fields)
+        updated += len(changed)
+
+    bump_generation()
+    logger.info("Global ranks refreshed: %d users changed rank", updated)
+    return updated
+
+
+def bump_generation():
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 1, timeout=None)
+
+
+def top_cache_key(ranking_type, host):
+    generation = cache.get(GENERATION_KEY, 0)
+    return f"rankings:top:{generation}:{ranking_type}:{host}"
+
+
+def top_cache_timeout():
+    """How long to cache a top list: long only where bumps are shared."""
+    return TOP_CACHE_TIMEOUT if get_redis() is not None else LOCAL_TOP_CACHE_TIMEOUT
@@ -0,0 +1,25 @@
+"""
+Access to the shared Redis connection behind the default cache.
+
+Redis-backed features call get_redis() and fall back to the database when it
+returns None (REDIS_URL unset, e.g. local development and tests).
+"""
+
+import logging
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def get_redis():
+    backend = settings.CACHES.get("default", {}).get("BACKEND", "")
+    if not backend.startswith("django_redis."):
+        return None
+    try:
+        from django_redis import get_redis_connection
+
+        return get_redis_connection("default")
+    except Exception as e:
+        logger.warning("Redis connection unavailable: %s", e)
+        return None
@@ -229,6 +229,7 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "allauth.account.middleware.AccountMiddleware",
+    "src.middleware.ActivityMiddleware",
 ]
 
 ROOT_URLCONF = "src.urls"
@@ -253,6 +254,26 @@ ASGI_APPLICATION = "src.asgi.application"
 
 CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
 
+# Shared Redis for caching and live data structures (leaderboards etc.).
+# Without REDIS_URL Django's local-memory cache is used and Redis-backed
+# features fall back to the database.
+REDIS_URL = env("REDIS_URL", default="")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": REDIS_URL,
+            "OPTIONS": {"CLIENT_CLASS": "django_redis.client.DefaultClient"},
+        }
+    }
+    # Share WebSocket groups across every ASGI worker and with Celery
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels_redis.core.RedisChannelLayer",
+            "CONFIG": {"hosts": [REDIS_URL]},
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -372,12 +393,46 @@ CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
 
+# Expo push API. EXPO_API_URL can point at a local fake server for load
+# tests; EXPO_PUSH_HTTP2 needs the optional h2 package (httpx[http2]).
+EXPO_API_URL = env("EXPO_API_URL", default="https://exp.host/--/api/v2")
+EXPO_ACCESS_TOKEN = env("EXPO_ACCESS_TOKEN", default="")
+EXPO_PUSH_HTTP2 = env.bool("EXPO_PUSH_HTTP2", default=False)
+EXPO_PUSH_CONCURRENCY = env.int("EXPO_PUSH_CONCURRENCY", default=4)
+
+# Nightly PlatformStats reconciliation takes the attempt / answer totals
+# from pg_class.reltuples estimates instead of COUNT(*) when enabled
+PLATFORM_STATS_ESTIMATE = env.bool("PLATFORM_STATS_ESTIMATE", default=False)
+
+# Read notifications older than this leave the inbox table, either moved
+# to notification_archive ("archive") or dropped ("delete")
+NOTIFICATION_RETENTION_DAYS = env.int("NOTIFICATION_RETENTION_DAYS", default=90)
+NOTIFICATION_RETENTION_POLICY = env("NOTIFICATION_RETENTION_POLICY", default="archive")
+
+# Notification delivery runs on its own worker (see Procfile) so slow Expo
+# calls never queue behind heavy ranking / calibration jobs
+CELERY_TASK_ROUTES = {
+    "src.tasks.dispatch_notifications": {"queue": "notifications"},
+    "src.tasks.check_push_receipts": {"queue": "notifications"},
+    "src.tasks.publish_unread_counts": {"queue": "notifications"},
+    "src.tasks.start_due_campaigns": {"queue": "notifications"},
+    "src.tasks.run_campaign": {"queue": "notifications"},
+}
+
 
 CELERY_BEAT_SCHEDULE = {
     "update-platform-stats-hourly": {
         "task": "src.tasks.update_platform_stats",
         "schedule": crontab(minute=0),
     },
+    "reconcile-platform-stats-nightly": {
+        "task": "src.tasks.reconcile_platform_stats",
+        "schedule": crontab(hour=2, minute=30),
+    },
+    "build-cohort-analytics-nightly": {
+        "task": "src.tasks.build_cohort_analytics",
+        "schedule": crontab(hour=2, minute=45),
+    },
     "create-daily-activity-midnight": {
         "task": "src.tasks.create_daily_activity",
         "schedule": crontab(hour=0, minute=0),
@@ -410,6 +465,42 @@ CELERY_BEAT_SCHEDULE = {
         "task": "src.tasks.send_daily_reminder",
         "schedule": crontab(hour=19, minute=30),  # 7:30 PM daily
     },
+    "calibrate-question-difficulty-nightly": {
+        "task": "src.tasks.calibrate_question_difficulty",
+        "schedule": crontab(hour=1, minute=30),
+    },
+    "analyze-distractors-nightly": {
+        "task": "src.tasks.analyze_distractors",
+        "schedule": crontab(hour=1, minute=0),
+    },
+    "sync-live-leaderboards": {
+        "task": "src.tasks.sync_live_leaderboards",
+        "schedule": crontab(minute="*/5"),
+    },
+    "refresh-global-ranks": {
+        "task": "src.tasks.refresh_global_ranks",
+        "schedule": crontab(minute="*/15"),
+    },
+    "dispatch-notifications": {
+        "task": "src.tasks.dispatch_notifications",
+        "schedule": crontab(),  # retries and anything a kick missed
+    },
+    "start-notification-campaigns": {
+        "task": "src.tasks.start_due_campaigns",
+        "schedule": crontab(),
+    },
+    "check-push-receipts": {
+        "task": "src.tasks.check_push_receipts",
+        "schedule": crontab(minute="*/15"),
+    },
+    "notification-retention-nightly": {
+        "task": "src.tasks.apply_notification_retention",
+        "schedule": crontab(hour=3, minute=15),
+    },
+    "reconcile-unread-counts-nightly": {
+        "task": "src.tasks.reconcile_unread_counts",
+        "schedule": crontab(hour=3, minute=30),
+    },
 }
 
 
@@ -1,19 +1,24 @@
 from django.contrib.auth.models import User
-from django.db.models import Avg, Count, Q
-from django.db.models.signals import post_save
+from django.db.models import Avg, Count, F, Q
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
 from src.models import (
+    Answer,
+    Category,
     Contribution,
     LeaderBoard,
     Notification,
+    PlatformStats,
     Question,
+    SubBranch,
     UserAnswer,
     UserAttempt,
     UserProfile,
     UserProgress,
     UserStatistics,
 )
+from src.services import leaderboard as live_leaderboard
 
 
 @receiver(post_save, sender=User)
@@ -47,6 +52,8 @@ def create_user_profile(sender, instance, created, **kwargs):
                 google_auth_user=instance,
                 email=instance.email,
                 full_name=f"{instance.first_name} {instance.last_name}".strip() or instance.username,
+                # A new user has nothing unread; no need to seed the counter
+                unread_notifications=0,
             )
     else:
         # User updated - sync profile if it exists
@@ -67,6 +74,9 @@ def handle_user_answer_save(sender, instance, created, **kwargs):
     """
     Update Question stats and UserProgress when an answer is saved.
     """
+    if created:
+        PlatformStats.adjust(total_answers_submitted=1)
+
     question = instance.question
     question_counts = question.user_responses.filter(is_skipped=False).aggregate(
         attempted=Count("id"),
@@ -129,6 +139,26 @@ def handle_user_answer_save(sender, instance, created, **kwargs):
     user_stats.save()
 
 
+@receiver(post_delete, sender=UserAnswer)
+def release_answer_selection(sender, instance, **kwargs):
+    """
+    Keep Answer.selection_count in step when a response is deleted
+    (including cascades from attempt deletion).
+    """
+    if instance.selected_answer_id:
+        Answer.objects.filter(pk=instance.selected_answer_id).update(
+            selection_count=F("selection_count") - 1
+        )
+
+
+@receiver(post_delete, sender=Question)
+def release_question_status(sender, instance, **kwargs):
+    """
+    Keep the PlatformStats per-status question counters in step on delete.
+    """
+    PlatformStats.question_status_changed(instance.status, None)
+
+
 @receiver(post_save, sender=Contribution)
 def handle_contribution_save(sender, instance, created, **kwargs):
     """
@@ -168,19 +198,31 @@ def handle_user_attempt_save(sender, instance, created, **kwargs):
     """
     Update LeaderBoard and Stats when attempt is completed.
     """
+    if created:
+        PlatformStats.adjust(total_mock_tests_taken=1)
+
+    # complete_attempt() saves twice (results with update_fields, then the
+    # status change); only the save that writes the status counts.
+    update_fields = kwargs.get("update_fields")
+    if update_fields is not None and "status" not in update_fields:
+        return
+
     if instance.status == "COMPLETED" and not created:
         # Skip leaderboard/stats if user answered zero questions (quit early)
         answered_count = instance.user_answers.filter(is_skipped=False).count()
         if answered_count == 0:
             return
 
-        # Update LeaderBoard
+        # Update LeaderBoard: live Redis boards when available, SQL otherwise
         if instance.mock_test and instance.mock_test.branch:
-            LeaderBoard.update_score(
-                user=instance.user,
-                branch=instance.mock_test.branch,
-                score_delta=instance.score_obtained,
-            )
+            if live_leaderboard.is_enabled():
+                live_leaderboard.record_attempt(instance)
+            else:
+                LeaderBoard.update_score(
+                    user=instance.user,
+                    branch=instance.mock_test.branch,
+                    score_delta=instance.score_obtained,
+                )
 
         # Update Stats
         user_stats, _ = UserStatistics.objects.get_or_create(user=instance.user)
@@ -198,17 +240,16 @@ def handle_user_attempt_save(sender, instance, created, **kwargs):
 @receiver(post_save, sender=Question)
 def handle_question_save(sender, instance, created, **kwargs):
     """
-    Update PlatformStats when question becomes public.
+    Update PlatformStats on creation and status transitions.
     Notify contributor when their question is created.
     """
-    from django.db.models import F
-
-    from src.models.platform_stats import PlatformStats
-
-    if instance.status == "PUBLIC":
-        PlatformStats.objects.filter(id=1).update(
-            total_questions_public=F("total_questions_public") + 1
-        )
+    old_status = (
+        None if created else getattr(instance, "_saved_status", instance.status)
+    )
+    PlatformStats.question_status_changed(old_status, instance.status)
+    instance._saved_status = instance.status
+    if created:
+        PlatformStats.adjust(total_contributions_this_month=1, questions_added_today=1)
 
     if created and instance.created_by:
         # Increment questions_contributed counter
@@ -229,3 +270,28 @@ def handle_question_save(sender, instance, created, **kwargs):
             message_np=f"तपाईंको प्रश्न '{instance.question_text_en[:50]}' समीक्षाको लागि पेश गरिएको छ।",
             related_question=instance,
         )
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=SubBranch)
+@receiver(post_save, sender=UserProfile)
+def schedule_image_derivatives(sender, instance, **kwargs):
+    """
+    Queue WebP/JPEG derivative generation when an image field points at a new file.
+    Runs after commit so the worker sees the saved row.
+    """
+    from django.db import transaction
+
+    from src.services.images import IMAGE_DERIVATIVE_FIELDS, needs_derivatives
+    from src.tasks import generate_image_derivatives
+
+    model_label = sender._meta.label
+    for field_name in IMAGE_DERIVATIVE_FIELDS.get(model_label, []):
+        if not needs_derivatives(instance, field_name):
+            continue
+        transaction.on_commit(
+            lambda field_name=field_name: generate_image_derivatives.delay(
+                model_label, instance.pk, field_name
+            )
+        )
@@ -2,7 +2,7 @@ import logging
 
 from django.core.management import call_command
 
-from celery import shared_task
+from celery import group, shared_task
 from src.models import Branch, DailyActivity, LeaderBoard, PlatformStats
 
 logger = logging.getLogger(__name__)
@@ -11,20 +11,38 @@ logger = logging.getLogger(__name__)
 @shared_task
 def update_platform_stats():
     """
-    Refresh platform-wide statistics counters
+    Refresh the time-windowed platform statistics (all-time counters are
+    maintained incrementally)
     """
     logger.info("Starting platform stats update")
     PlatformStats.scheduled_update()
     logger.info("Platform stats update completed")
 
 
+@shared_task
+def reconcile_platform_stats():
+    """
+    Heavy task: Recount every platform counter to repair delta drift
+    """
+    logger.info("Starting platform stats reconciliation")
+    PlatformStats.reconcile()
+    logger.info("Platform stats reconciliation completed")
+
+
 @shared_task
 def create_daily_activity():
     """
-    Snapshot daily metrics at midnight
+    Finalise the local day that just ended. Runs at local midnight, when
+    today has no activity yet; record_today_activity() is for intraday
+    refreshes.
     """
-    logger.info("Creating daily activity snapshot")
-    DailyActivity.record_today_activity()
+    from datetime import timedelta
+
+    from django.utils import timezone
+
+    yesterday = timezone.localdate() - timedelta(days=1)
+    logger.info("Creating daily activity snapshot for %s", yesterday)
+    DailyActivity.rebuild(yesterday, yesterday)
     logger.info("Daily activity snapshot completed")
 
 
@@ -41,16 +59,30 @@ def update_user_streaks():
 @shared_task
 def recalculate_rankings():
     """
-    Heavy task: Recalculate leaderboards
+    Heavy task: Recalculate leaderboards, fanned out as one task per branch
+    so the run takes as long as the largest branch rather than the sum.
+    Skipped while live (Redis) boards are on: sync_live_leaderboards owns
+    the LeaderBoard table then.
     """
-    logger.info("Starting leaderboard recalculation")
-    branches = Branch.objects.filter(is_active=True)
-    count = 0
-    for branch in branches:
-        LeaderBoard.recalculate_rankings("WEEKLY", branch=branch)
-        LeaderBoard.recalculate_rankings("MONTHLY", branch=branch)
-        count += 1
-    logger.info("Leaderboard recalculation completed for %d branches", count)
+    from src.services import leaderboard as live_leaderboard
+
+    if live_leaderboard.is_enabled():
+        logger.info("Live leaderboards enabled; skipping SQL recalculation")
+        return
+    branch_ids = list(
+        Branch.objects.filter(is_active=True).values_list("id", flat=True)
+    )
+    logger.info("Starting leaderboard recalculation for %d branches", len(branch_ids))
+    group(recalculate_branch_rankings.s(branch_id) for branch_id in branch_ids)()
+
+
+@shared_task
+def recalculate_branch_rankings(branch_id):
+    """
+    Recalculate every period / sub-branch board of one branch in one pass
+    """
+    boards = LeaderBoard.recalculate_branch(branch_id)
+    logger.info("Recalculated %d leaderboards for branch %s", boards, branch_id)
 
 
 @shared_task
@@ -69,6 +101,7 @@ def monthly_maintenance():
     Perform monthly maintenance tasks:
     - Reset stats
     - Clean up old weekly leaderboard entries
+    - Prune leaderboard snapshots beyond the kept history
     - Generate top contributor shoutout notifications
     """
     from datetime import timedelta
@@ -76,7 +109,7 @@ def monthly_maintenance():
     from django.utils import timezone
 
     from src.models import Notification
-    from src.models.analytics import Contribution
+    from src.models.analytics import Contribution, LeaderBoardSnapshot
 
     logger.info("Starting monthly maintenance")
 
@@ -94,7 +127,11 @@ def monthly_maintenance():
     ).delete()
     logger.info("Cleaned up %d old weekly leaderboard entries", deleted_count)
 
-    # 3. Generate top contributor shoutout
+    # 3. Prune leaderboard snapshots older than the history the API serves
+    pruned = LeaderBoardSnapshot.prune()
+    logger.info("Pruned %d old leaderboard snapshots", pruned)
+
+    # 4. Generate top contributor shoutout
     now = timezone.now()
     top_contributors = Contribution.get_top_contributors(
         year=now.year, month=now.month, limit=5
@@ -108,7 +145,7 @@ def monthly_maintenance():
             message_en="Congratulations! You're one of the top contributors this month. Keep it up!",
             message_np="बधाई छ! तपाईं यस महिनाको शीर्ष योगदानकर्ता मध्ये एक हुनुहुन्छ। जारी राख्नुहोस्!",
         )
-        logger.info("Top contributor notifications sent to %d users", len(list(top_contributors)))
+        logger.info("Top contributor notifications queued for %d users", len(top_contributors))
 
     logger.info("Monthly maintenance completed")
 
@@ -117,9 +154,14 @@ def monthly_maintenance():
 def send_weekly_summary():
     """
     Create in-app weekly summary notifications for active users.
+
+    Users are walked in keyset-ordered chunks; each chunk's weekly answered /
+    correct counts come from one grouped aggregate, and the notifications are
+    bulk inserted through the outbox, which batches the pushes.
     """
     from datetime import timedelta
 
+    from django.db.models import Count, Q
     from django.utils import timezone
 
     from src.models import Notification, UserStatistics
@@ -129,44 +171,60 @@ def send_weekly_summary():
 
     two_weeks_ago = (timezone.now() - timedelta(days=14)).date()
     one_week_ago = timezone.now() - timedelta(days=7)
+    chunk_size = Notification.BULK_CHUNK_SIZE
 
     active_stats = UserStatistics.objects.filter(
         last_activity_date__gte=two_weeks_ago,
-    ).select_related("user")
-
-    count = 0
-    for stats in active_stats:
-        weekly_answers = UserAnswer.objects.filter(
-            user_attempt__user=stats.user,
-            user_attempt__created_at__gte=one_week_ago,
-        ).count()
-
-        weekly_correct = UserAnswer.objects.filter(
-            user_attempt__user=stats.user,
-            user_attempt__created_at__gte=one_week_ago,
-            is_correct=True,
-        ).count()
-
-        msg_en = (
-            f"This week: {weekly_answers} questions answered, "
-            f"{weekly_correct} correct. "
-            f"Current streak: {stats.study_streak_days} days."
-        )
-        msg_np = (
-            f"यो हप्ता: {weekly_answers} प्रश्नहरू उत्तर दिइयो, "
-            f"{weekly_correct} सही। "
-            f"हालको स्ट्रिक: {stats.study_streak_days} दिन।"
-        )
-
-        Notification.objects.create(
-            user=stats.user,
-            notification_type="GENERAL",
-            title_en="Your Weekly Summary",
-            title_np="तपाईंको साप्ताहिक सारांश",
-            message_en=msg_en,
-            message_np=msg_np,
-        )
-        count += 1
+    ).order_by("user_id")
+
+    def summaries():
+        last_user_id = 0
+        while True:
+            chunk = list(
+                active_stats.filter(user_id__gt=last_user_id).values_list(
+                    "user_id", "study_streak_days"
+                )[:chunk_size]
+            )
+            if not chunk:
+                return
+            last_user_id = chunk[-1][0]
+
+            weekly = {
+                row["user_attempt__user_id"]: row
+                for row in UserAnswer.objects.filter(
+                    user_attempt__user_id__in=[user_id for user_id, _ in chunk],
+                    user_attempt__created_at__gte=one_week_ago,
+                )
+                .values("user_attempt__user_id")
+                .annotate(
+                    answered=Count("id"),
+                    correct=Count("id", filter=Q(is_correct=True)),
+                )
+                .order_by()
+            }
+
+            for user_id, streak in chunk:
+                row = weekly.get(user_id, {})
+                weekly_answers = row.get("answered", 0)
+                weekly_correct = row.get("correct", 0)
+                yield Notification(
+                    user_id=user_id,
+                    notification_type="GENERAL",
+                    title_en="Your Weekly Summary",
+                    title_np="तपाईंको साप्ताहिक सारांश",
+                    message_en=(
+                        f"This week: {weekly_answers} questions answered, "
+                        f"{weekly_correct} correct. "
+                        f"Current streak: {streak} days."
+                    ),
+                    message_np=(
+                        f"यो हप्ता: {weekly_answers} प्रश्नहरू उत्तर दिइयो, "
+                        f"{weekly_correct} सही। "
+                        f"हालको स्ट्रिक: {streak} दिन।"
+                    ),
+                )
+
+    count = Notification.enqueue_bulk(summaries(), chunk_size=chunk_size)
 
     logger.info("Weekly summaries sent to %d users", count)
 
@@ -175,6 +233,7 @@ def send_weekly_summary():
 def check_streak_notifications():
     """
     Daily check to notify users whose streaks are about to break.
+    Notifications are bulk inserted and pushed by the outbox dispatcher.
     """
     from datetime import timedelta
 
@@ -186,23 +245,27 @@ def check_streak_notifications():
 
     yesterday = (timezone.now() - timedelta(days=1)).date()
 
-    at_risk = UserStatistics.objects.filter(
-        last_activity_date=yesterday,
-        study_streak_days__gte=3,
-    ).select_related("user")
+    at_risk = (
+        UserStatistics.objects.filter(
+            last_activity_date=yesterday,
+            study_streak_days__gte=3,
+        )
+        .values_list("user_id", "study_streak_days")
+        .iterator(chunk_size=Notification.BULK_CHUNK_SIZE)
+    )
 
-    count = 0
-    for stats in at_risk:
-        Notification.objects.create(
-            user=stats.user,
+    count = Notification.enqueue_bulk(
+        Notification(
+            user_id=user_id,
             notification_type="STREAK_ALERT",
             title_en="Don't lose your streak!",
             title_np="आफ्नो स्ट्रिक नगुमाउनुहोस्!",
-            message_en=f"You have a {stats.study_streak_days}-day streak. Practice today to keep it going!",
-            message_np=f"तपाईंको {stats.study_streak_days} दिनको स्ट्रिक छ। जारी राख्न आज अभ्यास गर्नुहोस्!",
+            message_en=f"You have a {streak}-day streak. Practice today to keep it going!",
+            message_np=f"तपाईंको {streak} दिनको स्ट्रिक छ। जारी राख्न आज अभ्यास गर्नुहोस्!",
             action_url="/practice/categories",
         )
-        count += 1
+        for user_id, streak in at_risk
+    )
 
     logger.info("Streak notifications sent to %d at-risk users", count)
 
@@ -212,32 +275,257 @@ def send_daily_reminder():
     """
     Send a daily push reminder to users who haven't practiced today.
     Runs in the evening to encourage last-chance practice.
+
+    Recipients are streamed from one query and pushed in chunks, each chunk
+    as concurrent 100-message Expo batches.
     """
     from datetime import timedelta
+    from itertools import islice
 
     from django.utils import timezone
 
-    from src.models import UserStatistics
-    from src.services.push import send_push_to_user
+    from src.models import Notification, UserStatistics
+    from src.services.push import deliver_messages
 
     logger.info("Starting daily reminder push notifications")
 
+    copy = {
+        "EN": (
+            "Time to practice!",
+            "A few minutes of daily practice makes a big difference. Start now!",
+        ),
+        "NP": (
+            "अभ्यासको समय भयो!",
+            "दैनिक केही मिनेटको अभ्यासले ठूलो फरक पार्छ। अहिले सुरु गर्नुहोस्!",
+        ),
+    }
+    data = {"type": "DAILY_REMINDER", "action_url": "/practice/categories"}
+
     today = timezone.now().date()
     # Users who were active recently but NOT today
-    inactive_today = UserStatistics.objects.filter(
-        last_activity_date__lt=today,
-        last_activity_date__gte=today - timedelta(days=7),
-    ).select_related("user", "user__profile")
+    recipients = (
+        UserStatistics.objects.filter(
+            last_activity_date__lt=today,
+            last_activity_date__gte=today - timedelta(days=7),
+            user__profile__push_notifications_enabled=True,
+            user__profile__expo_push_token__startswith="ExponentPushToken[",
+        )
+        .values_list(
+            "user__profile__expo_push_token", "user__profile__preferred_language"
+        )
+        .iterator(chunk_size=Notification.BULK_CHUNK_SIZE)
+    )
+    messages = (
+        {
+            "to": token,
+            "title": copy.get(language, copy["EN"])[0],
+            "body": copy.get(language, copy["EN"])[1],
+            "sound": "default",
+            "data": data,
+        }
+        for token, language in recipients
+    )
 
     count = 0
-    for stats in inactive_today:
-        sent = send_push_to_user(
-            user=stats.user,
-            title_en="Time to practice!",
-            body_en="A few minutes of daily practice makes a big difference. Start now!",
-            data={"type": "DAILY_REMINDER", "action_url": "/practice/categories"},
-        )
-        if sent:
-            count += 1
+    while chunk := list(islice(messages, Notification.BULK_CHUNK_SIZE)):
+        count += deliver_messages(chunk)["sent"]
 
     logger.info("Daily reminder push sent to %d users", count)
+
+
+@shared_task
+def start_due_campaigns():
+    """
+    Start notification campaigns whose send time has come (and restart
+    stalled ones)
+    """
+    from src.services.campaigns import start_due
+
+    for campaign_id in start_due():
+        run_campaign.delay(campaign_id)
+
+
+@shared_task
+def run_campaign(campaign_id):
+    """
+    Notify one minute's worth of a campaign's audience, then re-queue itself
+    a minute later until the audience is exhausted
+    """
+    from src.services.campaigns import TICK_INTERVAL, run_tick
+
+    summary = run_tick(campaign_id)
+    if summary and summary["more"]:
+        run_campaign.apply_async(
+            (campaign_id,), countdown=TICK_INTERVAL.total_seconds()
+        )
+
+
+@shared_task
+def build_cohort_analytics():
+    """
+    Heavy task: Rebuild signup-week cohort retention and funnel summaries
+    """
+    from src.services.cohorts import build_cohorts
+
+    logger.info("Starting cohort analytics build")
+    cohorts = build_cohorts()
+    logger.info("Cohort analytics built for %d cohorts", cohorts)
+
+
+@shared_task
+def generate_image_derivatives(model_label, pk, field_name):
+    """
+    Render fixed-width WebP/JPEG variants for an uploaded image field and
+    record them on the instance for srcset serialization.
+    """
+    from django.apps import apps
+
+    from src.services.images import (
+        delete_derivatives,
+        generate_derivatives,
+        needs_derivatives,
+        variants_field_name,
+    )
+
+    model = apps.get_model(model_label)
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None or not needs_derivatives(instance, field_name):
+        return
+
+    variants_field = variants_field_name(field_name)
+    field_file = getattr(instance, field_name)
+    old_variants = getattr(instance, variants_field) or {}
+
+    new_variants = {}
+    if field_file:
+        try:
+            new_variants = generate_derivatives(field_file)
+        except Exception as e:
+            logger.warning(
+                "Failed to generate derivatives for %s#%s.%s: %s",
+                model_label,
+                pk,
+                field_name,
+                e,
+            )
+            return
+
+    if old_variants:
+        delete_derivatives(field_file.storage, old_variants, keep=new_variants)
+
+    # .update() avoids re-triggering post_save for the instance
+    model.objects.filter(pk=pk).update(**{variants_field: new_variants})
+    logger.info(
+        "Generated %d image derivatives for %s#%s.%s",
+        sum(len(new_variants.get(k, {})) for k in ("webp", "jpeg")),
+        model_label,
+        pk,
+        field_name,
+    )
+
+
+@shared_task
+def calibrate_question_difficulty():
+    """
+    Heavy task: Fit item difficulty / user ability from response data
+    """
+    from src.services.calibration import calibrate
+
+    logger.info("Starting question difficulty calibration")
+    summary = calibrate()
+    logger.info(
+        "Question calibration completed: %d questions, %d users, %d responses",
+        summary["questions"],
+        summary["users"],
+        summary["responses"],
+    )
+
+
+@shared_task
+def analyze_distractors():
+    """
+    Flag questions whose distractors are never picked or beat the key
+    """
+    from src.services.distractors import flag_questions
+
+    logger.info("Starting distractor analysis")
+    summary = flag_questions()
+    logger.info("Distractor analysis completed: %s", summary)
+
+
+@shared_task
+def sync_live_leaderboards():
+    """
+    Persist the Redis live leaderboards to the LeaderBoard table
+    """
+    from src.services import leaderboard as live_leaderboard
+
+    if not live_leaderboard.is_enabled():
+        return
+    count = live_leaderboard.sync_to_database()
+    logger.info("Live leaderboard sync completed for %d boards", count)
+
+
+@shared_task
+def refresh_global_ranks():
+    """
+    Recompute precomputed global ranks on UserStatistics
+    """
+    from src.services.rankings import refresh_global_ranks as refresh
+
+    updated = refresh()
+    logger.info("Global rank refresh completed: %d users updated", updated)
+
+
+@shared_task
+def dispatch_notifications():
+    """
+    Deliver pending notification outbox entries (realtime + Expo push)
+    """
+    from src.services.notifications import dispatch_pending
+
+    if dispatch_pending()["more"]:
+        dispatch_notifications.delay()
+
+
+@shared_task
+def check_push_receipts():
+    """
+    Check Expo push receipts and clear tokens of unregistered devices
+    """
+    from src.services.push import check_receipts
+
+    check_receipts()
+
+
+@shared_task
+def publish_unread_counts(user_ids):
+    """
+    Push cached unread notification counts to connected sockets
+    """
+    from src.services.notifications import publish_unread_counts as publish
+
+    publish(user_ids)
+
+
+@shared_task
+def reconcile_unread_counts():
+    """
+    Repair drift in cached unread notification counters
+    """
+    from src.models import Notification
+
+    fixed = Notification.reconcile_unread_counts()
+    logger.info("Unread counter reconciliation completed: %d profiles fixed", fixed)
+
+
+@shared_task
+def apply_notification_retention():
+    """
+    Heavy task: archive or delete old read notifications in bounded batches
+    """
+    from src.services.notifications import apply_retention
+
+    if apply_retention()["more"]:
+        # Hit the per-run cap; continue rather than wait a day
+        apply_notification_retention.delay()
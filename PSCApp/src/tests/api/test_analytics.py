@@ -1,3 +1,4 @@
+from unittest.mock import MagicMock, patch
 from uuid import uuid4
 
 from django.contrib.auth.models import User
@@ -30,3 +31,62 @@ class AnalyticsApiTests(APITestCase):
         self.client.force_authenticate(user=self.admin)
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_active_users_counts_union_of_day_sketches(self):
+        url = reverse("dailyactivity-active-users")
+        self.client.force_authenticate(user=self.admin)
+
+        # No Redis: unknown rather than a wrong number
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data["dau"])
+
+        redis = MagicMock()
+        redis.pfcount.side_effect = lambda *keys: len(keys)
+        with patch("src.services.activity.get_redis", return_value=redis):
+            response = self.client.get(url, {"branch": 4})
+        self.assertEqual(
+            (response.data["dau"], response.data["wau"], response.data["mau"]),
+            (1, 7, 30),
+        )
+        self.assertTrue(redis.pfcount.call_args.args[0].endswith(":branch:4"))
+        # The admin's own request was recorded, once, on the way out
+        self.assertEqual(redis.pipeline.return_value.pfadd.call_count, 1)
+
+    def test_trend_picks_resolution_from_range(self):
+        from datetime import date, timedelta
+
+        from src.models.analytics import ActivityRollup, DailyActivity
+
+        url = reverse("dailyactivity-trend")
+        self.client.force_authenticate(user=self.admin)
+        start = date(2024, 1, 29)  # a Monday
+        for offset in range(10):
+            DailyActivity.objects.create(
+                date=start + timedelta(days=offset), new_users=1, active_users=offset
+            )
+        ActivityRollup.refresh(start, start + timedelta(days=9))
+
+        week = ActivityRollup.objects.get(period="WEEK", period_start=start)
+        self.assertEqual(
+            (week.days, week.new_users, week.active_users, week.peak_active_users),
+            (7, 7, 3, 6),
+        )
+        february = ActivityRollup.objects.get(
+            period="MONTH", period_start=date(2024, 2, 1)
+        )
+        self.assertEqual(february.new_users, 7)
+
+        response = self.client.get(url, {"days": 7})
+        self.assertEqual(response.data["resolution"], "DAY")
+        self.assertEqual(len(response.data["points"]), 7)
+        response = self.client.get(url, {"days": 365})
+        self.assertEqual(response.data["resolution"], "WEEK")
+        self.assertLessEqual(len(response.data["points"]), 54)
+        response = self.client.get(url, {"days": 3650})
+        self.assertEqual(response.data["resolution"], "MONTH")
+        self.assertLessEqual(len(response.data["points"]), 121)
+        self.assertEqual(
+            self.client.get(url, {"days": "x"}).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
@@ -5,6 +5,7 @@ from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient, APITestCase
 
+from src.models.analytics import LeaderBoard
 from src.models.branch import Branch, Category
 from src.models.mocktest import MockTest, MockTestQuestion
 from src.models.question_answer import Answer, Question
@@ -82,6 +83,15 @@ class AttemptApiTests(APITestCase):
         )  # 2 marks for correct answer
         self.assertEqual(response.data["status"], "COMPLETED")
 
+        # Completion is counted once even though the attempt is saved twice
+        entry = LeaderBoard.objects.get(
+            user=self.user, branch=self.branch, time_period="ALL_TIME"
+        )
+        self.assertEqual(entry.tests_completed, 1)
+        self.assertEqual(float(entry.total_score), 2.0)
+        stats = UserStatistics.objects.get(user=self.user)
+        self.assertEqual(stats.mock_tests_completed, 1)
+
     def test_skipped_answer_does_not_increment_questions_answered(self):
         attempt_id = self.test_start_attempt()
 
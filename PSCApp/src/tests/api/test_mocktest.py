@@ -60,3 +60,14 @@ class MockTestApiTests(APITestCase):
         self.assertEqual(test.test_questions.count(), 3)
         self.assertEqual(test.created_by, self.user)
         self.assertFalse(test.is_public)  # Generated should be private
+
+    def test_generate_rejects_non_list_difficulty_range(self):
+        url = reverse("mocktest-generate")
+        payload = {
+            "branch_id": self.branch.id,
+            "category_distribution": {str(self.category.id): 3},
+            "difficulty_range": "12",
+        }
+        response = self.client.post(url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(MockTest.objects.exists())
@@ -5,7 +5,7 @@ from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient, APITestCase
 
-from src.models.notification import Notification
+from src.models.notification import Notification, NotificationCampaign
 
 
 class NotificationApiTests(APITestCase):
@@ -27,7 +27,8 @@ class NotificationApiTests(APITestCase):
         url = reverse("notification-list")
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data["count"], 2)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertIsNone(response.data["next"])
 
     def test_unread_count(self):
         url = reverse("notification-unread-count")
@@ -45,3 +46,23 @@ class NotificationApiTests(APITestCase):
         url_unread = reverse("notification-unread-count")
         response = self.client.get(url_unread)
         self.assertEqual(response.data["unread_count"], 1)
+
+    def test_send_push_schedules_campaign(self):
+        url = reverse("notification-send-push")
+        body = {"title_en": "Exam news", "message_en": "Results are out"}
+        self.assertEqual(
+            self.client.post(url, body, format="json").status_code,
+            status.HTTP_403_FORBIDDEN,
+        )
+
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.post(url, {**body, "rate_per_minute": 50}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        campaign = NotificationCampaign.objects.get(id=response.data["campaign"]["id"])
+        self.assertEqual(
+            (campaign.status, campaign.rate_per_minute, campaign.created_by),
+            ("SCHEDULED", 50, self.user),
+        )
+        # Nothing is sent inside the request
+        self.assertEqual(Notification.objects.count(), 2)
@@ -1,10 +1,15 @@
 from uuid import uuid4
 
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient, APITestCase
 
+from src.models.branch import Branch, Category
+from src.models.platform_stats import PlatformStats
+from src.models.question_answer import Question
+
 
 class PlatformStatsTests(APITestCase):
     def setUp(self):
@@ -14,8 +19,48 @@ class PlatformStatsTests(APITestCase):
         )
         self.client = APIClient()
         self.client.force_authenticate(user=self.user)
+        cache.delete(PlatformStats.CACHE_KEY)
 
     def test_get_platform_stats(self):
         url = reverse("platform-stats-list")
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_counters_follow_question_writes_and_cache(self):
+        branch = Branch.objects.create(name_en="Stats Branch", slug="stats-branch")
+        category = Category.objects.create(
+            name_en="Stats Cat",
+            slug="stats-cat",
+            scope_type="UNIVERSAL",
+            target_branch=branch,
+        )
+        self.assertEqual(PlatformStats.get_solo().total_questions_public, 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            question = Question.objects.create(
+                question_text_en="Q?",
+                question_text_np="प्र?",
+                category=category,
+                status="PENDING_REVIEW",
+                created_by=self.user,
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            question = Question.objects.get(pk=question.pk)
+            question.status = "PUBLIC"
+            question.save()
+            question.save()  # no transition, no double count
+
+        stats = PlatformStats.objects.get(id=1)
+        self.assertEqual(
+            (stats.total_questions_public, stats.total_questions_pending), (1, 0)
+        )
+        self.assertEqual(stats.total_contributions_this_month, 1)
+
+        url = reverse("platform-stats-list")
+        self.assertEqual(self.client.get(url).data["total_questions_public"], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            Question.objects.filter(pk=question.pk).delete()
+        # Served from cache until it expires or stats are refreshed
+        self.assertEqual(self.client.get(url).data["total_questions_public"], 1)
+        PlatformStats.reconcile()
+        self.assertEqual(self.client.get(url).data["total_questions_public"], 0)
@@ -5,7 +5,12 @@ from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient, APITestCase
 
+from src.api.user_stats.views import rank_window
+from src.models.analytics import LeaderBoard
+from src.models.branch import Branch
 from src.models.user_stats import UserStatistics
+from src.services import leaderboard as live_leaderboard
+from src.services.rankings import refresh_global_ranks
 
 
 class UserStatsApiTests(APITestCase):
@@ -23,3 +28,263 @@ class UserStatsApiTests(APITestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(UserStatistics.objects.filter(user=self.user).exists())
+
+    def test_rankings_read_precomputed_ranks(self):
+        others = [
+            User.objects.create_user(
+                username=f"ranked{i}", email=f"ranked{i}_{uuid4().hex[:8]}@example.com"
+            )
+            for i in range(2)
+        ]
+        for user, answered in zip([self.user, *others], [5, 9, 5]):
+            stats, _ = UserStatistics.objects.get_or_create(user=user)
+            stats.questions_answered = answered
+            stats.correct_answers = answered - 1
+            stats.save()
+
+        refresh_global_ranks()
+
+        mine = UserStatistics.objects.get(user=self.user)
+        self.assertEqual(mine.answers_rank, 2)  # tied with ranked1
+        self.assertIsNotNone(mine.accuracy_rank)
+        self.assertEqual(
+            self.client.get(reverse("user-statistics-me")).data["answers_rank"], 2
+        )
+
+        response = self.client.get(reverse("rankings"), {"type": "answers"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [entry["rank"] for entry in response.data["top_users"]], [1, 2, 2]
+        )
+        self.assertEqual(response.data["my_entry"]["rank"], 2)
+
+
+    def test_top_list_cache_is_short_without_shared_cache(self):
+        from unittest.mock import patch
+
+        from src.services import rankings
+
+        # Generation bumps from a worker never reach a per-process cache
+        self.assertEqual(rankings.top_cache_timeout(), rankings.LOCAL_TOP_CACHE_TIMEOUT)
+        with patch("src.services.rankings.get_redis", return_value=object()):
+            self.assertEqual(rankings.top_cache_timeout(), rankings.TOP_CACHE_TIMEOUT)
+
+
+class LiveLeaderBoardApiTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="leader", email=f"leader_{uuid4().hex[:8]}@example.com"
+        )
+        self.branch = Branch.objects.create(name_en="B1", slug="b1")
+        LeaderBoard.objects.create(
+            user=self.user,
+            time_period="WEEKLY",
+            branch=self.branch,
+            rank=1,
+            total_score=10,
+            tests_completed=2,
+            accuracy_percentage=80,
+        )
+
+    def test_live_falls_back_to_stored_rankings_without_redis(self):
+        self.client.force_authenticate(user=self.user)
+        url = reverse("leaderboard-live")
+        response = self.client.get(url, {"branch": self.branch.id})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["source"], "database")
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["me"]["rank"], 1)
+
+    def test_around_me_returns_neighbours_from_stored_board(self):
+        for rank in range(2, 9):
+            user = User.objects.create_user(
+                username=f"near{rank}", email=f"near{rank}_{uuid4().hex[:8]}@example.com"
+            )
+            LeaderBoard.objects.create(
+                user=user,
+                time_period="WEEKLY",
+                branch=self.branch,
+                rank=rank,
+                total_score=10 - rank,
+                tests_completed=1,
+                accuracy_percentage=50,
+            )
+        LeaderBoard.objects.filter(user=self.user).update(rank=5, total_score=5.5)
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(
+            reverse("leaderboard-around-me"), {"branch": self.branch.id, "n": 2}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["source"], "database")
+        ranks = [row["rank"] for row in response.data["results"]]
+        self.assertEqual(ranks, [3, 4, 5, 5, 6])
+        self.assertEqual(float(response.data["results"][2]["total_score"]), 5.5)
+
+    def test_rank_window_splits_ties_by_id(self):
+        tied = []
+        for i in range(3):
+            user = User.objects.create_user(
+                username=f"tied{i}", email=f"tied{i}_{uuid4().hex[:8]}@example.com"
+            )
+            tied.append(
+                LeaderBoard.objects.create(
+                    user=user,
+                    time_period="WEEKLY",
+                    branch=self.branch,
+                    rank=2,
+                    total_score=5,
+                    tests_completed=1,
+                    accuracy_percentage=50,
+                )
+            )
+
+        board = LeaderBoard.objects.filter(time_period="WEEKLY", branch=self.branch)
+        rows = rank_window(board, "rank", tied[1], 2)
+
+        # rank 1 and the lower-id tie above, the higher-id tie below
+        self.assertEqual(
+            [row.pk for row in rows],
+            [board.get(user=self.user).pk, tied[0].pk, tied[1].pk, tied[2].pk],
+        )
+
+    def test_history_reads_rank_from_snapshots(self):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        from src.models.analytics import LeaderBoardSnapshot
+
+        rival = User.objects.create_user(
+            username="rival", email=f"rival_{uuid4().hex[:8]}@example.com"
+        )
+        last_week = timezone.now() - timedelta(days=7)
+        LeaderBoardSnapshot.record(
+            "WEEKLY",
+            self.branch.id,
+            None,
+            [
+                {"user_id": rival.id, "rank": 1, "total_score": 20},
+                {"user_id": self.user.id, "rank": 2, "total_score": 12.5},
+            ],
+            when=last_week,
+        )
+        # Recomputing this week's board snapshots it as well
+        LeaderBoard.replace_board(
+            "WEEKLY",
+            self.branch.id,
+            None,
+            [
+                {
+                    "user_id": self.user.id,
+                    "rank": 1,
+                    "total_score": 30,
+                    "tests_completed": 3,
+                    "accuracy_percentage": 75,
+                }
+            ],
+        )
+
+        # Rank change is measured against last week's final standings
+        entry = LeaderBoard.objects.get(user=self.user, time_period="WEEKLY")
+        self.assertEqual((entry.previous_rank, entry.get_rank_change()), (2, 1))
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(
+            reverse("leaderboard-history"), {"branch": self.branch.id}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(p["rank"], p["total_score"]) for p in response.data["results"]],
+            [(2, 12.5), (1, 30.0)],
+        )
+        self.assertEqual(response.data["results"][0]["board_size"], 2)
+
+    def test_snapshot_record_upserts_one_row_per_period(self):
+        from src.models.analytics import LeaderBoardSnapshot
+
+        for score in (10, 15):
+            LeaderBoardSnapshot.record(
+                "WEEKLY",
+                self.branch.id,
+                None,
+                [{"user_id": self.user.id, "rank": 1, "total_score": score}],
+            )
+
+        snapshot = LeaderBoardSnapshot.objects.get(branch=self.branch)
+        self.assertEqual(snapshot.lookup(self.user.id), (1, 15.0))
+
+    def test_snapshots_are_unique_per_branch_wide_board(self):
+        from django.db import IntegrityError, transaction
+
+        from src.models.analytics import LeaderBoardSnapshot
+
+        LeaderBoardSnapshot.record("WEEKLY", self.branch.id, None, [])
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            LeaderBoardSnapshot.objects.create(
+                time_period="WEEKLY",
+                branch=self.branch,
+                period_start=LeaderBoardSnapshot.period_key("WEEKLY"),
+                entries=b"",
+            )
+
+    def test_snapshot_prune_keeps_served_history(self):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        from src.models.analytics import LeaderBoardSnapshot
+
+        now = timezone.now()
+        for period, age in (
+            ("WEEKLY", timedelta(weeks=51)),
+            ("WEEKLY", timedelta(weeks=54)),
+            ("ALL_TIME", timedelta(days=10)),
+            ("ALL_TIME", timedelta(days=60)),
+        ):
+            LeaderBoardSnapshot.record(period, self.branch.id, None, [], when=now - age)
+
+        self.assertEqual(LeaderBoardSnapshot.prune(), 2)
+        self.assertEqual(
+            sorted(LeaderBoardSnapshot.objects.values_list("time_period", flat=True)),
+            ["ALL_TIME", "WEEKLY"],
+        )
+
+    def test_live_requires_branch(self):
+        response = self.client.get(reverse("leaderboard-live"))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_board_keys_round_trip(self):
+        key = live_leaderboard.board_key("WEEKLY", 3, 7, bucket="2026W42")
+        self.assertEqual(key, "lb:WEEKLY:2026W42:b3:s7")
+        self.assertEqual(
+            live_leaderboard.parse_board_key(key), ("WEEKLY", "2026W42", 3, 7)
+        )
+        self.assertEqual(
+            live_leaderboard.parse_board_key(live_leaderboard.board_key("ALL_TIME", 3)),
+            ("ALL_TIME", "all", 3, None),
+        )
+
+    def test_failed_live_record_releases_attempt_marker(self):
+        from types import SimpleNamespace
+        from unittest.mock import MagicMock, patch
+
+        redis = MagicMock()
+        redis.set.return_value = True
+        redis.pipeline.return_value.execute.side_effect = ConnectionError("down")
+        attempt = SimpleNamespace(
+            pk=9,
+            user_id=self.user.id,
+            mock_test=SimpleNamespace(branch_id=self.branch.id, sub_branch_id=None),
+            end_time=None,
+            start_time=None,
+            score_obtained=5,
+            percentage=50,
+        )
+
+        with patch("src.services.leaderboard.get_redis", return_value=redis):
+            self.assertFalse(live_leaderboard.record_attempt(attempt))
+        redis.delete.assert_called_once_with("lb:attempt:9")
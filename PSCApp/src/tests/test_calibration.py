@@ -0,0 +1,135 @@
+import os
+import tempfile
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from src.models.attempt_answer import UserAnswer, UserAttempt
+from src.models.branch import Category
+from src.models.question_answer import Answer, Question
+from src.models.user_stats import UserStatistics
+from src.services.calibration import (
+    RESPONSE_DTYPE,
+    calibrate,
+    extract_responses,
+    fit_rasch,
+    item_discrimination,
+)
+
+
+class RaschFitTests(TestCase):
+    def test_recovers_synthetic_parameters(self):
+        rng = np.random.default_rng(7)
+        n_users, n_items = 400, 30
+        true_ability = rng.normal(0, 1, n_users)
+        true_difficulty = np.linspace(-2, 2, n_items)
+
+        users = np.repeat(np.arange(n_users), n_items)
+        items = np.tile(np.arange(n_items), n_users)
+        p = 1 / (1 + np.exp(-(true_ability[users] - true_difficulty[items])))
+
+        responses = np.empty(len(users), dtype=RESPONSE_DTYPE)
+        responses["user"] = users
+        responses["item"] = items
+        responses["correct"] = rng.random(len(users)) < p
+
+        # Small chunks exercise the multi-pass accumulation
+        ability, difficulty, _, item_counts = fit_rasch(
+            responses, n_users, n_items, chunk_size=1000
+        )
+
+        self.assertTrue((item_counts == n_users).all())
+        self.assertGreater(np.corrcoef(difficulty, true_difficulty)[0, 1], 0.98)
+        self.assertGreater(np.corrcoef(ability, true_ability)[0, 1], 0.85)
+        self.assertAlmostEqual(difficulty.mean(), 0.0, places=6)
+
+        discrimination = item_discrimination(
+            responses, ability, n_items, chunk_size=1000
+        )
+        self.assertTrue((discrimination > 0).all())
+
+
+class CalibrateTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(
+            name_en="General", name_np="सामान्य", scope_type="UNIVERSAL"
+        )
+
+    def make_question(self, text):
+        question = Question.objects.create(
+            question_text_en=text,
+            question_text_np=text,
+            category=self.category,
+            explanation_en="-",
+            explanation_np="-",
+            status="PUBLIC",
+        )
+        right = Answer.objects.create(
+            question=question,
+            answer_text_en="A",
+            answer_text_np="A",
+            is_correct=True,
+            display_order=1,
+        )
+        wrong = Answer.objects.create(
+            question=question,
+            answer_text_en="B",
+            answer_text_np="B",
+            is_correct=False,
+            display_order=2,
+        )
+        return question, right, wrong
+
+    def test_calibrate_writes_difficulty_and_ability(self):
+        easy = self.make_question("Easy")
+        hard = self.make_question("Hard")
+
+        users = [User.objects.create_user(username=f"cal{i}") for i in range(6)]
+        for rank, user in enumerate(users):
+            attempt = UserAttempt.objects.create(
+                user=user, mode="PRACTICE", total_score=2
+            )
+            # Everyone gets the easy question; only the top two get the hard one
+            for question, right, wrong in (easy, hard):
+                correct = question == easy[0] or rank >= 4
+                UserAnswer.objects.create(
+                    user_attempt=attempt,
+                    question=question,
+                    selected_answer=right if correct else wrong,
+                )
+
+        summary = calibrate(chunk_size=5, min_item_responses=3, min_user_responses=2)
+        self.assertEqual(summary["responses"], 12)
+        self.assertEqual(summary["questions"], 2)
+
+        easy_q = Question.objects.get(pk=easy[0].pk)
+        hard_q = Question.objects.get(pk=hard[0].pk)
+        self.assertLess(easy_q.calibrated_difficulty, hard_q.calibrated_difficulty)
+        self.assertGreater(hard_q.discrimination, 0)
+
+        strong = UserStatistics.objects.get(user=users[-1]).ability_estimate
+        weak = UserStatistics.objects.get(user=users[0]).ability_estimate
+        self.assertGreater(strong, weak)
+
+    def test_extract_skips_ids_missing_from_snapshot(self):
+        first, right, _ = self.make_question("First")
+        late, late_right, _ = self.make_question("Created after the snapshot")
+        user = User.objects.create_user(username="snapshot")
+        attempt = UserAttempt.objects.create(user=user, mode="PRACTICE", total_score=2)
+        UserAnswer.objects.create(
+            user_attempt=attempt, question=first, selected_answer=right
+        )
+        UserAnswer.objects.create(
+            user_attempt=attempt, question=late, selected_answer=late_right
+        )
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "responses.bin")
+            written = extract_responses(path, np.array([user.id]), np.array([first.id]))
+            records = np.fromfile(path, dtype=RESPONSE_DTYPE)
+
+        self.assertEqual(written, 1)
+        self.assertEqual(
+            (records["user"].tolist(), records["item"].tolist()), ([0], [0])
+        )
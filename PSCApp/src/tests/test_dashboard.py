@@ -0,0 +1,31 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+
+class DashboardTabCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff = User.objects.create_user(
+            username="staff", email="staff@example.com", is_staff=True
+        )
+        self.member = User.objects.create_user(
+            username="member", email="member@example.com"
+        )
+        self.client.force_login(self.staff)
+
+    def counts(self):
+        response = self.client.get(reverse("dashboard:users"))
+        return response.context["total_count"], response.context["staff_count"]
+
+    def test_counters_are_cached_until_a_moderation_action(self):
+        self.assertEqual(self.counts(), (2, 1))
+
+        # Plain writes wait for the short TTL...
+        User.objects.create_user(username="late", email="late@example.com")
+        self.assertEqual(self.counts(), (2, 1))
+
+        # ...moderation actions refresh the counters immediately
+        self.client.post(reverse("dashboard:toggle_user_staff", args=[self.member.pk]))
+        self.assertEqual(self.counts(), (3, 2))
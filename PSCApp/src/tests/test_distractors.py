@@ -0,0 +1,106 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from src.models.attempt_answer import UserAnswer, UserAttempt
+from src.models.branch import Category
+from src.models.question_answer import Answer, Question
+from src.services.distractors import flag_questions, rebuild_selection_counts
+
+
+class DistractorAnalysisTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(
+            name_en="General", name_np="सामान्य", scope_type="UNIVERSAL"
+        )
+        self.question = Question.objects.create(
+            question_text_en="Capital of Nepal?",
+            question_text_np="नेपालको राजधानी?",
+            category=category,
+            explanation_en="-",
+            explanation_np="-",
+            status="PUBLIC",
+        )
+        self.options = [
+            Answer.objects.create(
+                question=self.question,
+                answer_text_en=text,
+                answer_text_np=text,
+                is_correct=index == 0,
+                display_order=index + 1,
+            )
+            for index, text in enumerate(["Kathmandu", "Pokhara", "Biratnagar"])
+        ]
+        self.user = User.objects.create_user(username="distractor")
+
+    def answer(self, option):
+        attempt = UserAttempt.objects.create(
+            user=self.user, mode="PRACTICE", total_score=1
+        )
+        return UserAnswer.objects.create(
+            user_attempt=attempt, question=self.question, selected_answer=option
+        )
+
+    def counts(self):
+        return [
+            option.selection_count
+            for option in Answer.objects.filter(question=self.question)
+        ]
+
+    def test_selection_counts_follow_saves_and_deletes(self):
+        key, pokhara, _ = self.options
+        response = self.answer(key)
+        self.assertEqual(self.counts(), [1, 0, 0])
+
+        # Changing the answer moves the selection
+        response = UserAnswer.objects.get(pk=response.pk)
+        response.selected_answer = pokhara
+        response.save()
+        self.assertEqual(self.counts(), [0, 1, 0])
+
+        # Saving an instance loaded without the field leaves counts alone
+        deferred = UserAnswer.objects.only("id", "time_taken_seconds").get(
+            pk=response.pk
+        )
+        deferred.time_taken_seconds = 12
+        deferred.save()
+        self.assertEqual(self.counts(), [0, 1, 0])
+
+        # Skipping releases it
+        response.selected_answer = None
+        response.save()
+        self.assertEqual(self.counts(), [0, 0, 0])
+
+        response.selected_answer = key
+        response.save()
+        response.user_attempt.delete()
+        self.assertEqual(self.counts(), [0, 0, 0])
+
+    def test_flags_distractor_beating_key(self):
+        key, pokhara, _ = self.options
+        for _ in range(2):
+            self.answer(key)
+        for _ in range(3):
+            self.answer(pokhara)
+
+        summary = flag_questions(min_selections=5)
+
+        self.question.refresh_from_db()
+        self.assertEqual(self.question.distractor_flag, "DISTRACTOR_BEATS_KEY")
+        self.assertEqual(summary["DISTRACTOR_BEATS_KEY"], 1)
+
+        distribution = self.question.get_answer_distribution()
+        self.assertEqual([row["count"] for row in distribution], [2, 3, 0])
+        self.assertAlmostEqual(distribution[1]["percentage"], 60.0)
+
+    def test_rebuild_repairs_drift(self):
+        key = self.options[0]
+        self.answer(key)
+        Answer.objects.filter(pk=key.pk).update(selection_count=42)
+
+        self.assertEqual(rebuild_selection_counts(), 1)
+        self.assertEqual(self.counts(), [1, 0, 0])
+
+        # Unused distractors (with enough data) are flagged
+        flag_questions(min_selections=1)
+        self.question.refresh_from_db()
+        self.assertEqual(self.question.distractor_flag, "UNUSED_DISTRACTOR")
@@ -0,0 +1,66 @@
+import io
+import shutil
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from src.api.branch.serializers import CategorySerializer
+from src.models.branch import Category
+from src.services.images import build_srcset
+from src.tasks import generate_image_derivatives
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def make_png(width, height):
+    buffer = io.BytesIO()
+    Image.new("RGBA", (width, height), (200, 30, 30, 128)).save(buffer, format="PNG")
+    return SimpleUploadedFile("icon.png", buffer.getvalue(), content_type="image/png")
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ImageDerivativeTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_generates_fixed_width_variants(self):
+        category = Category.objects.create(
+            name_en="Maths",
+            name_np="गणित",
+            scope_type="UNIVERSAL",
+            icon=make_png(800, 400),
+        )
+        self.assertIsNone(build_srcset(category.icon, category.icon_variants))
+
+        generate_image_derivatives("src.Category", category.pk, "icon")
+        category.refresh_from_db()
+
+        variants = category.icon_variants
+        self.assertEqual(variants["source"], category.icon.name)
+        self.assertEqual(set(variants["webp"]), {"160", "320", "640"})
+        self.assertEqual(set(variants["jpeg"]), {"160", "320", "640"})
+
+        storage = category.icon.storage
+        with storage.open(variants["jpeg"]["320"]) as fh:
+            rendered = Image.open(fh)
+            self.assertEqual(rendered.format, "JPEG")
+            self.assertEqual(rendered.size, (320, 160))
+
+        data = CategorySerializer(category).data
+        self.assertTrue(data["icon_srcset"]["webp"]["160"].endswith("__w160.webp"))
+
+    def test_small_images_are_not_upscaled(self):
+        category = Category.objects.create(
+            name_en="Logic",
+            name_np="तर्क",
+            scope_type="UNIVERSAL",
+            icon=make_png(200, 200),
+        )
+        generate_image_derivatives("src.Category", category.pk, "icon")
+        category.refresh_from_db()
+
+        self.assertEqual(set(category.icon_variants["webp"]), {"160", "200"})
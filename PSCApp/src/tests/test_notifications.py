@@ -0,0 +1,328 @@
+import json
+from datetime import time, timedelta
+from functools import partial
+from unittest.mock import patch
+
+import httpx
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from src.models.notification import (
+    Notification,
+    NotificationArchive,
+    NotificationCampaign,
+    NotificationOutbox,
+    PushTicket,
+)
+from src.models.user import UserProfile
+from src.services.campaigns import run_tick, start_due
+from src.services.fake_expo import FakeExpo
+from src.services.notifications import apply_retention, dispatch_pending
+from src.services.push import ExpoPushClient, check_receipts, send_push_messages
+
+TOKEN = "ExponentPushToken[abc]"
+
+
+class NotificationOutboxTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="outbox", email="outbox@example.com"
+        )
+
+    def notify(self):
+        return Notification.objects.create(
+            user=self.user,
+            notification_type="GENERAL",
+            title_en="Hello",
+            message_en="World",
+        )
+
+    def enable_push(self):
+        UserProfile.objects.filter(google_auth_user=self.user).update(
+            expo_push_token=TOKEN, push_notifications_enabled=True
+        )
+
+    def test_create_writes_outbox_and_dispatch_delivers(self):
+        notification = self.notify()
+        entry = NotificationOutbox.objects.get(notification=notification)
+        self.assertEqual(entry.status, "PENDING")
+
+        # No push token: only the realtime event is needed
+        self.assertEqual(dispatch_pending()["sent"], 1)
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, "SENT")
+        self.assertTrue(entry.realtime_done and entry.push_done)
+
+    def unread(self):
+        return UserProfile.objects.get(google_auth_user=self.user).unread_notifications
+
+    def test_unread_counter_follows_create_read_and_delete(self):
+        first, second, third = self.notify(), self.notify(), self.notify()
+        self.assertEqual(self.unread(), 3)
+
+        first.mark_as_read()
+        first.mark_as_read()  # already read: no double decrement
+        self.assertEqual(self.unread(), 2)
+
+        second.delete()
+        self.assertEqual(self.unread(), 1)
+        self.assertEqual(Notification.mark_all_as_read(self.user), 1)
+        self.assertEqual(Notification.get_unread_count(self.user), 0)
+
+        # Drift (e.g. raw updates) is repaired by reconciliation
+        Notification.objects.filter(pk=third.pk).update(is_read=False)
+        self.assertEqual(Notification.reconcile_unread_counts(), 1)
+        self.assertEqual(self.unread(), 1)
+
+    def test_uncounted_profile_is_seeded_on_first_read(self):
+        # Profiles that predate the counter hold NULL, not a wrong 0
+        UserProfile.objects.filter(google_auth_user=self.user).update(
+            unread_notifications=None
+        )
+        first, _ = self.notify(), self.notify()
+        self.assertIsNone(self.unread())
+
+        fresh = Notification.objects.select_related("user__profile").get(pk=first.pk)
+        self.assertEqual(fresh.realtime_payload()["unread_count"], 2)
+        self.assertEqual(self.unread(), 2)
+        first.mark_as_read()
+        self.assertEqual(Notification.get_unread_count(self.user), 1)
+
+    @patch("src.tasks.publish_unread_counts.delay")
+    def test_bulk_delete_releases_unread_in_one_update(self, publish):
+        for _ in range(3):
+            self.notify()
+        self.notify().mark_as_read()
+        publish.reset_mock()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            deleted, _ = Notification.objects.filter(user=self.user).delete()
+
+        self.assertEqual(self.unread(), 0)
+        self.assertEqual(deleted, 8)  # with their outbox rows
+        publish.assert_called_once_with([self.user.id])
+
+    def test_retention_archives_old_read_notifications(self):
+        old_read, old_unread, recent_read = self.notify(), self.notify(), self.notify()
+        Notification.objects.filter(pk__in=[old_read.pk, old_unread.pk]).update(
+            created_at=timezone.now() - timedelta(days=120)
+        )
+        Notification.objects.filter(pk__in=[old_read.pk, recent_read.pk]).update(
+            is_read=True
+        )
+
+        summary = apply_retention(days=90, policy="archive", batch_size=1)
+
+        self.assertEqual(summary["notifications"], 1)
+        self.assertFalse(summary["more"])
+        self.assertEqual(
+            set(Notification.objects.values_list("pk", flat=True)),
+            {old_unread.pk, recent_read.pk},
+        )
+        archived = NotificationArchive.objects.get()
+        self.assertEqual(
+            (archived.original_id, archived.user_id), (old_read.pk, self.user.id)
+        )
+        self.assertFalse(
+            NotificationOutbox.objects.filter(notification_id=old_read.pk).exists()
+        )
+
+    @patch("src.services.presence.online_users", return_value=set())
+    def test_offline_users_skip_realtime(self, online_users):
+        self.notify()
+        summary = dispatch_pending()
+        self.assertEqual(
+            (summary["realtime_skipped"], summary["realtime_sent"]), (1, 0)
+        )
+        self.assertEqual(NotificationOutbox.objects.get().status, "SENT")
+        online_users.assert_called_once()
+
+    @patch("src.services.notifications.send_push_messages")
+    def test_push_failures_back_off_or_finish(self, send):
+        self.enable_push()
+        retried = self.notify()
+        dropped = self.notify()
+        send.return_value = [
+            {"status": "error", "message": "timeout", "transport": True},
+            {
+                "status": "error",
+                "message": "not registered",
+                "details": {"error": "DeviceNotRegistered"},
+            },
+        ]
+
+        summary = dispatch_pending()
+
+        self.assertEqual(
+            (summary["sent"], summary["retrying"], summary["failed"]), (1, 1, 0)
+        )
+        self.assertEqual((summary["push_errors"], summary["push_rejected"]), (1, 1))
+        self.assertEqual(len(send.call_args.args[0]), 2)
+        entry = NotificationOutbox.objects.get(notification=retried)
+        self.assertEqual((entry.status, entry.attempts), ("PENDING", 1))
+        self.assertTrue(entry.realtime_done)
+        self.assertFalse(entry.push_done)
+        self.assertEqual(
+            NotificationOutbox.objects.get(notification=dropped).status, "SENT"
+        )
+
+        # Not due yet, so a second pass leaves it alone
+        self.assertEqual(dispatch_pending()["retrying"], 0)
+
+    def test_bulk_notifications_go_through_outbox(self):
+        others = [
+            User.objects.create_user(username=f"bulk{i}", email=f"bulk{i}@example.com")
+            for i in range(3)
+        ]
+        created = Notification.create_bulk_notifications(
+            users=User.objects.filter(id__in=[u.id for u in others]),
+            notification_type="GENERAL",
+            title_en="Broadcast",
+            title_np="प्रसारण",
+            message_en="Hi",
+            message_np="नमस्ते",
+        )
+
+        self.assertEqual(created, 3)
+        self.assertEqual(NotificationOutbox.objects.filter(status="PENDING").count(), 3)
+        summary = dispatch_pending(batch_size=2)
+        self.assertEqual(
+            (summary["sent"], summary["realtime_sent"], summary["push_skipped"]),
+            (3, 3, 3),
+        )
+        self.assertFalse(summary["more"])
+
+
+class NotificationCampaignTests(TestCase):
+    def test_campaign_runs_at_capped_rate_and_defers_quiet_users(self):
+        users = [
+            User.objects.create_user(username=f"camp{i}", email=f"camp{i}@example.com")
+            for i in range(3)
+        ]
+        now = timezone.now()
+        local = timezone.localtime(now)
+        # Second user is inside a quiet window that ends in an hour
+        UserProfile.objects.filter(google_auth_user=users[1]).update(
+            quiet_hours_start=(local - timedelta(hours=1)).time(),
+            quiet_hours_end=(local + timedelta(hours=1)).time().replace(second=0),
+        )
+        UserProfile.objects.filter(google_auth_user=users[2]).update(
+            quiet_hours_start=time(0, 0), quiet_hours_end=time(0, 0)
+        )
+        campaign = NotificationCampaign.objects.create(
+            title_en="Exam",
+            message_en="Soon",
+            user_ids=[u.id for u in users],
+            send_at=now + timedelta(minutes=5),
+            rate_per_minute=2,
+        )
+
+        self.assertEqual(start_due(now), [])
+        self.assertEqual(start_due(now + timedelta(minutes=5)), [campaign.id])
+
+        first = run_tick(campaign.id, now + timedelta(minutes=5))
+        self.assertEqual(
+            (first["sent"], first["deferred"], first["more"]), (2, 1, True)
+        )
+        # Too soon for the next tick: the rate cap holds
+        self.assertIsNone(run_tick(campaign.id, now + timedelta(minutes=5, seconds=10)))
+        deferred = NotificationOutbox.objects.get(notification__user=users[1])
+        self.assertGreater(deferred.next_attempt_at, now + timedelta(minutes=30))
+
+        last = run_tick(campaign.id, now + timedelta(minutes=6))
+        self.assertEqual((last["sent"], last["more"]), (1, False))
+        campaign.refresh_from_db()
+        self.assertEqual((campaign.status, campaign.sent_count), ("COMPLETED", 3))
+        self.assertEqual(
+            Notification.objects.filter(title_en="Exam").count(), len(users)
+        )
+
+
+class FastRetryClient(ExpoPushClient):
+    BACKOFF_BASE = 0.01
+
+
+class ExpoPushClientTests(TestCase):
+    def test_batches_and_retries_rate_limited_requests(self):
+        calls = []
+
+        def expo(request):
+            batch = json.loads(request.content)
+            calls.append(len(batch))
+            if len(calls) == 1:
+                return httpx.Response(429, headers={"Retry-After": "0"})
+            return httpx.Response(
+                200, json={"data": [{"status": "ok", "id": "t"} for _ in batch]}
+            )
+
+        messages = [{"to": TOKEN, "title": "t", "body": "b"}] * 150
+        with patch("src.services.push.ExpoPushClient", FastRetryClient):
+            tickets = send_push_messages(
+                messages, concurrency=1, transport=httpx.MockTransport(expo)
+            )
+
+        self.assertEqual(len(tickets), 150)
+        self.assertTrue(all(ticket["status"] == "ok" for ticket in tickets))
+        self.assertEqual(sorted(calls), [50, 100, 100])
+
+    def test_receipts_clear_unregistered_tokens(self):
+        user = User.objects.create_user(username="receipt", email="r@example.com")
+        UserProfile.objects.filter(google_auth_user=user).update(expo_push_token=TOKEN)
+        PushTicket.objects.create(ticket_id="dead", token=TOKEN)
+        PushTicket.objects.create(ticket_id="fresh", token=TOKEN)
+        PushTicket.objects.filter(ticket_id="dead").update(
+            created_at=timezone.now() - timedelta(minutes=30)
+        )
+
+        def expo(request):
+            self.assertEqual(json.loads(request.content), {"ids": ["dead"]})
+            return httpx.Response(
+                200,
+                json={
+                    "data": {
+                        "dead": {
+                            "status": "error",
+                            "message": "gone",
+                            "details": {"error": "DeviceNotRegistered"},
+                        }
+                    }
+                },
+            )
+
+        summary = check_receipts(transport=httpx.MockTransport(expo))
+
+        self.assertEqual((summary["checked"], summary["pruned"]), (1, 1))
+        self.assertIsNone(
+            UserProfile.objects.get(google_auth_user=user).expo_push_token
+        )
+        self.assertEqual(
+            list(PushTicket.objects.values_list("ticket_id", flat=True)), ["fresh"]
+        )
+
+    def test_dispatch_against_fake_expo_prunes_dead_device(self):
+        user = User.objects.create_user(username="fake", email="fake@example.com")
+        dead_token = "ExponentPushToken[unregistered-1]"
+        UserProfile.objects.filter(google_auth_user=user).update(
+            expo_push_token=dead_token
+        )
+        Notification.objects.create(
+            user=user, notification_type="GENERAL", title_en="Hi", message_en="!"
+        )
+        fake = FakeExpo(throttle_rate=0.5, seed=1)
+        transport = httpx.ASGITransport(app=fake)
+
+        with patch(
+            "src.services.notifications.send_push_messages",
+            partial(send_push_messages, transport=transport),
+        ), patch("src.services.push.ExpoPushClient", FastRetryClient):
+            summary = dispatch_pending()
+        self.assertEqual(summary["push_sent"], 1)
+        self.assertEqual(fake.stats["messages"], 1)
+
+        PushTicket.objects.update(created_at=timezone.now() - timedelta(minutes=20))
+        with patch("src.services.push.ExpoPushClient", FastRetryClient):
+            check_receipts(transport=transport)
+        self.assertIsNone(
+            UserProfile.objects.get(google_auth_user=user).expo_push_token
+        )
@@ -1,10 +1,13 @@
+from datetime import timedelta
+from io import StringIO
 from uuid import uuid4
 
 from django.contrib.auth.models import User
+from django.core.management import call_command
 from django.test import TestCase
 from django.utils import timezone
 
-from src.models.analytics import LeaderBoard
+from src.models.analytics import DailyActivity, LeaderBoard
 from src.models.attempt_answer import UserAnswer, UserAttempt
 from src.models.branch import Branch, Category, SubBranch
 from src.models.mocktest import MockTest, MockTestQuestion
@@ -174,9 +177,14 @@ class Phase1LogicTests(TestCase):
             id=1
         )  # Ensure singleton exists if code assumes it ID 1
 
-        # Create data
-        Question.objects.create(category=self.category, status="PUBLIC", is_public=True)
-        UserAttempt.objects.create(user=self.user, status="COMPLETED", total_score=10.0)
+        # Create data; counters move by deltas once the writes commit
+        with self.captureOnCommitCallbacks(execute=True):
+            Question.objects.create(
+                category=self.category, status="PUBLIC", is_public=True
+            )
+            UserAttempt.objects.create(
+                user=self.user, status="COMPLETED", total_score=10.0
+            )
 
         PlatformStats.scheduled_update()
 
@@ -185,7 +193,7 @@ class Phase1LogicTests(TestCase):
         self.assertGreaterEqual(stats.total_mock_tests_taken, 1)
 
     def test_leaderboard_recalculation(self):
-        """Test LeaderBoard.recalculate_rankings"""
+        """Test LeaderBoard.recalculate_branch"""
         # Create 2 users with attempts
         email2 = f"u2_{uuid4().hex[:8]}@e.com"
         user2 = User.objects.create_user(username="user2_lb", email=email2)
@@ -197,8 +205,16 @@ class Phase1LogicTests(TestCase):
             total_questions=1,
         )
 
+        # Only attempts with answered questions are ranked
+        question = Question.objects.create(
+            category=self.category, status="PUBLIC", is_public=True
+        )
+        answer = Answer.objects.create(
+            question=question, answer_text_en="A", is_correct=True, display_order=1
+        )
+
         # User 1: Score 10
-        UserAttempt.objects.create(
+        attempt1 = UserAttempt.objects.create(
             user=self.user,
             mock_test=mt,
             status="COMPLETED",
@@ -206,9 +222,12 @@ class Phase1LogicTests(TestCase):
             start_time=timezone.now(),
             total_score=20,
         )
+        UserAnswer.objects.create(
+            user_attempt=attempt1, question=question, selected_answer=answer
+        )
 
         # User 2: Score 20
-        UserAttempt.objects.create(
+        attempt2 = UserAttempt.objects.create(
             user=user2,
             mock_test=mt,
             status="COMPLETED",
@@ -216,9 +235,12 @@ class Phase1LogicTests(TestCase):
             start_time=timezone.now(),
             total_score=20,
         )
+        UserAnswer.objects.create(
+            user_attempt=attempt2, question=question, selected_answer=answer
+        )
 
         # Recalculate
-        LeaderBoard.recalculate_rankings("WEEKLY", branch=self.branch)
+        LeaderBoard.recalculate_branch(self.branch.id, ["WEEKLY"])
 
         # Check ranks
         lb1 = LeaderBoard.objects.get(
@@ -230,3 +252,167 @@ class Phase1LogicTests(TestCase):
 
         self.assertEqual(lb2.rank, 1)  # Higher score
         self.assertEqual(lb1.rank, 2)
+
+        # User 1 overtakes: rows are updated in place
+        attempt3 = UserAttempt.objects.create(
+            user=self.user,
+            mock_test=mt,
+            status="COMPLETED",
+            score_obtained=15,
+            start_time=timezone.now(),
+            total_score=20,
+        )
+        UserAnswer.objects.create(
+            user_attempt=attempt3, question=question, selected_answer=answer
+        )
+        LeaderBoard.recalculate_branch(self.branch.id, ["WEEKLY"])
+
+        updated = LeaderBoard.objects.get(pk=lb1.pk)
+        self.assertEqual(updated.rank, 1)
+        self.assertEqual(updated.tests_completed, 2)
+        # previous_rank is last period's rank, not the last recalculation's
+        self.assertIsNone(updated.previous_rank)
+
+        # An unchanged board is not rewritten
+        LeaderBoard.recalculate_branch(self.branch.id, ["WEEKLY"])
+        self.assertEqual(
+            LeaderBoard.objects.get(pk=lb1.pk).last_updated, updated.last_updated
+        )
+
+    def test_rank_ties_use_exact_accuracy(self):
+        """Averages that only match after rounding do not share a rank"""
+        from decimal import Decimal
+
+        entries = LeaderBoard._rank_totals(
+            {
+                1: [Decimal(10), 3, Decimal("200.00")],  # 66.666...
+                2: [Decimal(10), 1, Decimal("66.67")],
+                3: [Decimal(10), 2, Decimal("133.34")],  # 66.67
+            }
+        )
+
+        self.assertEqual(
+            [(e["user_id"], e["rank"]) for e in entries], [(2, 1), (3, 1), (1, 3)]
+        )
+        self.assertEqual(
+            {e["accuracy_percentage"] for e in entries}, {Decimal("66.67")}
+        )
+
+    def test_daily_activity_backfill(self):
+        """Backfill writes one row per day, including empty days, and is rerunnable"""
+        today = timezone.localdate()
+        three_days_ago = timezone.now() - timedelta(days=3)
+        attempt = UserAttempt.objects.create(
+            user=self.user, status="COMPLETED", total_score=1.0
+        )
+        UserAttempt.objects.filter(pk=attempt.pk).update(start_time=three_days_ago)
+        User.objects.filter(pk=self.user.pk).update(date_joined=three_days_ago)
+
+        for _ in range(2):
+            call_command(
+                "backfill_daily_activity",
+                "--from",
+                str(today - timedelta(days=4)),
+                "--to",
+                str(today),
+                stdout=StringIO(),
+            )
+
+        self.assertEqual(DailyActivity.objects.count(), 5)
+        day = DailyActivity.objects.get(date=timezone.localdate(three_days_ago))
+        self.assertEqual(
+            (day.new_users, day.mock_tests_taken, day.active_users), (1, 1, 1)
+        )
+        self.assertEqual(
+            DailyActivity.objects.get(date=today - timedelta(days=4)).active_users, 0
+        )
+
+    def test_daily_activity_uses_local_day(self):
+        """Today's row is the local date, counted from local midnight"""
+        from datetime import datetime
+        from datetime import timezone as dt_timezone
+        from unittest.mock import patch
+
+        # 01:45 on the 20th in Kathmandu is still the 19th in UTC
+        now = datetime(2026, 10, 19, 20, 0, tzinfo=dt_timezone.utc)
+        User.objects.filter(pk=self.user.pk).update(
+            date_joined=now - timedelta(hours=1)
+        )
+        User.objects.create_user(
+            username="late",
+            email="late@example.com",
+            date_joined=now - timedelta(hours=2),
+        )
+
+        with patch("django.utils.timezone.now", return_value=now):
+            DailyActivity.record_today_activity()
+
+        day = DailyActivity.objects.get()
+        self.assertEqual(str(day.date), "2026-10-20")
+        self.assertEqual(day.new_users, 1)
+
+    def test_midnight_task_finalises_previous_day(self):
+        """The midnight job writes the day that just ended, not the new one"""
+        from datetime import datetime
+        from datetime import timezone as dt_timezone
+        from unittest.mock import patch
+
+        from src.tasks import create_daily_activity
+
+        # 00:00:30 on the 20th in Kathmandu (UTC+05:45)
+        now = datetime(2026, 10, 19, 18, 15, 30, tzinfo=dt_timezone.utc)
+        User.objects.filter(pk=self.user.pk).update(
+            date_joined=now - timedelta(hours=1)
+        )
+        attempt = UserAttempt.objects.create(
+            user=self.user, status="COMPLETED", total_score=1.0
+        )
+        UserAttempt.objects.filter(pk=attempt.pk).update(
+            start_time=now - timedelta(hours=2)
+        )
+
+        with patch("django.utils.timezone.now", return_value=now):
+            create_daily_activity()
+
+        day = DailyActivity.objects.get()
+        self.assertEqual(str(day.date), "2026-10-19")
+        self.assertEqual(
+            (day.new_users, day.mock_tests_taken, day.active_users), (1, 1, 1)
+        )
+
+    def test_cohort_analytics(self):
+        """Cohorts group users by signup week with a strict funnel and retention"""
+        from src.models.analytics import CohortSummary
+        from src.services.cohorts import build_cohorts
+
+        two_weeks_ago = timezone.now() - timedelta(weeks=2)
+        User.objects.filter(pk=self.user.pk).update(date_joined=two_weeks_ago)
+        mock_test = MockTest.objects.create(
+            title_en="Cohort Test",
+            title_np="Cohort Test",
+            branch=self.branch,
+            total_questions=1,
+        )
+        for started, mock in ((two_weeks_ago, mock_test), (timezone.now(), None)):
+            attempt = UserAttempt.objects.create(
+                user=self.user, mock_test=mock, status="COMPLETED", total_score=1.0
+            )
+            UserAttempt.objects.filter(pk=attempt.pk).update(start_time=started)
+        User.objects.create_user(username="cohort2", email="cohort2@example.com")
+
+        self.assertEqual(build_cohorts(), 2)
+
+        old = CohortSummary.objects.order_by("cohort_week").first()
+        self.assertEqual(old.cohort_week.weekday(), 0)
+        self.assertEqual(
+            (
+                old.users,
+                old.first_attempt,
+                old.completed_mock_test,
+                old.reached_streak_7,
+            ),
+            (1, 1, 1, 0),
+        )
+        self.assertEqual(old.retention, [1, 0, 1])
+        new = CohortSummary.objects.order_by("cohort_week").last()
+        self.assertEqual((new.users, new.first_attempt, new.retention), (1, 0, [0]))
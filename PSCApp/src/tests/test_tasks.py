@@ -2,7 +2,7 @@ from datetime import timedelta
 from uuid import uuid4
 
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils import timezone
 
 from src.celery import app
@@ -89,6 +89,50 @@ class ScheduledTasksTests(TestCase):
         ).count()
         self.assertEqual(notif_count, 0)
 
+    def test_send_daily_reminder_batches_by_language(self):
+        """Reminders go out in one batched send, in each user's language"""
+        from unittest.mock import patch
+
+        from src.models import UserStatistics
+        from src.models.user import UserProfile
+        from src.tasks import send_daily_reminder
+
+        yesterday = (timezone.now() - timedelta(days=1)).date()
+        for i, (language, token) in enumerate(
+            [
+                ("EN", "ExponentPushToken[en]"),
+                ("NP", "ExponentPushToken[np]"),
+                ("EN", None),
+            ]
+        ):
+            user = User.objects.create_user(
+                username=f"reminder_{i}_{uuid4().hex[:6]}",
+                email=f"reminder{i}@example.com",
+                password="testpass",
+            )
+            UserProfile.objects.filter(google_auth_user=user).update(
+                preferred_language=language, expo_push_token=token
+            )
+            stats, _ = UserStatistics.objects.get_or_create(user=user)
+            stats.last_activity_date = yesterday
+            stats.save()
+
+        with patch(
+            "src.services.push.send_push_messages",
+            side_effect=lambda messages: [{"status": "ok"} for _ in messages],
+        ) as send:
+            send_daily_reminder()
+
+        send.assert_called_once()
+        titles = {m["to"]: m["title"] for m in send.call_args.args[0]}
+        self.assertEqual(
+            titles,
+            {
+                "ExponentPushToken[en]": "Time to practice!",
+                "ExponentPushToken[np]": "अभ्यासको समय भयो!",
+            },
+        )
+
     def test_send_weekly_summary(self):
         """Test weekly summary task creates notifications for active users"""
         from src.models import Notification, UserStatistics
@@ -227,3 +271,70 @@ class ScheduledTasksTests(TestCase):
         self.assertFalse(LeaderBoard.objects.filter(pk=old_entry.pk).exists())
         # Recent monthly entry should remain
         self.assertTrue(LeaderBoard.objects.filter(pk=recent_entry.pk).exists())
+
+    def test_recalculate_rankings_builds_all_boards(self):
+        """Ranking run covers sub-branch and ALL_TIME boards per branch"""
+        from src.models.analytics import LeaderBoard
+        from src.models.attempt_answer import UserAnswer, UserAttempt
+        from src.models.branch import Branch, Category, SubBranch
+        from src.models.mocktest import MockTest
+        from src.models.question_answer import Answer, Question
+        from src.tasks import recalculate_rankings
+
+        branch = Branch.objects.create(name_en="Rank Branch", slug="rank-branch")
+        sub = SubBranch.objects.create(
+            name_en="Rank Sub", slug="rank-sub", branch=branch
+        )
+        category = Category.objects.create(name_en="Rank Cat", slug="rank-cat")
+        question = Question.objects.create(
+            question_text_en="Q?", category=category, status="PUBLIC"
+        )
+        answer = Answer.objects.create(
+            question=question, answer_text_en="A", is_correct=True, display_order=1
+        )
+        branch_test = MockTest.objects.create(
+            title_en="Branch test", branch=branch, total_questions=1
+        )
+        sub_test = MockTest.objects.create(
+            title_en="Sub test", branch=branch, sub_branch=sub, total_questions=1
+        )
+
+        def complete(user, mock_test, score, days_ago=0):
+            attempt = UserAttempt.objects.create(
+                user=user,
+                mock_test=mock_test,
+                status="COMPLETED",
+                total_score=10,
+                score_obtained=score,
+                percentage=score * 10,
+            )
+            UserAttempt.objects.filter(pk=attempt.pk).update(
+                start_time=timezone.now() - timedelta(days=days_ago)
+            )
+            UserAnswer.objects.create(
+                user_attempt=attempt, question=question, selected_answer=answer
+            )
+
+        alice = User.objects.create_user(username=f"alice_{uuid4().hex[:6]}")
+        bob = User.objects.create_user(username=f"bob_{uuid4().hex[:6]}")
+        complete(alice, sub_test, 6)
+        complete(bob, branch_test, 8)
+        complete(alice, branch_test, 9, days_ago=60)
+
+        # Run the per-branch group inline
+        with override_settings(CELERY_TASK_ALWAYS_EAGER=True):
+            recalculate_rankings()
+
+        def board(period, sub_branch=None):
+            return list(
+                LeaderBoard.objects.filter(
+                    branch=branch, time_period=period, sub_branch=sub_branch
+                )
+                .order_by("rank")
+                .values_list("user_id", "rank", "total_score")
+            )
+
+        self.assertEqual(board("WEEKLY"), [(bob.id, 1, 8), (alice.id, 2, 6)])
+        self.assertEqual(board("WEEKLY", sub), [(alice.id, 1, 6)])
+        self.assertEqual(board("ALL_TIME"), [(alice.id, 1, 15), (bob.id, 2, 8)])
+        self.assertEqual(board("ALL_TIME", sub), [(alice.id, 1, 6)])